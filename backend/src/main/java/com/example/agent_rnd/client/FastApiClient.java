@@ -10,6 +10,7 @@ import org.springframework.stereotype.Component;
 import org.springframework.web.multipart.MultipartFile;
 import org.springframework.web.reactive.function.BodyInserters;
 import org.springframework.web.reactive.function.client.WebClient;
+import reactor.core.publisher.Flux;
 import reactor.core.publisher.Mono;
 
 import java.util.LinkedHashMap;
@@ -108,6 +109,50 @@ public class FastApiClient {
         }
     }
 
+    // ✅ /parse/stream (multipart → NDJSON)
+    // 레코드 순서: meta → page(페이지마다) 또는 content(docx) → end / error
+    // 호출자가 구독하면서 페이지가 도착하는 대로 처리할 수 있다.
+    @SuppressWarnings({"unchecked", "rawtypes"})
+    public Flux<Map<String, Object>> parseFileStream(MultipartFile file) {
+        try {
+            MultipartBodyBuilder builder = new MultipartBodyBuilder();
+            builder.part("file", new ByteArrayResource(file.getBytes()) {
+                        @Override
+                        public String getFilename() {
+                            return file.getOriginalFilename() == null ? "upload.bin" : file.getOriginalFilename();
+                        }
+                    })
+                    .contentType(MediaType.APPLICATION_OCTET_STREAM);
+
+            Flux<Map> records = webClient.post()
+                    .uri(fastApiBaseUrl + "/parse/stream")
+                    .contentType(MediaType.MULTIPART_FORM_DATA)
+                    .accept(MediaType.APPLICATION_NDJSON)
+                    .body(BodyInserters.fromMultipartData(builder.build()))
+                    .retrieve()
+                    .onStatus(s -> s.isError(), resp ->
+                            resp.bodyToMono(String.class)
+                                    .defaultIfEmpty("")
+                                    .flatMap(msg -> Mono.error(new IllegalStateException(
+                                            "FastAPI /parse/stream 실패: HTTP " + resp.statusCode().value() + " / " + msg
+                                    )))
+                    )
+                    .bodyToFlux(Map.class);
+
+            return records.map(r -> (Map<String, Object>) r)
+                    .handle((record, sink) -> {
+                        if ("error".equals(record.get("type"))) {
+                            sink.error(new IllegalStateException("FastAPI /parse/stream 파싱 실패: " + record.get("error")));
+                        } else {
+                            sink.next(record);
+                        }
+                    });
+        } catch (Exception e) {
+            log.error("FastAPI /parse/stream 호출 실패", e);
+            return Flux.error(new IllegalStateException("FastAPI /parse/stream 호출 실패: " + e.getMessage(), e));
+        }
+    }
+
     // ---------------- helper ----------------
 
     private Map<String, Object> postJson(String path, Map<String, Object> body) {
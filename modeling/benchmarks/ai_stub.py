@@ -0,0 +1,525 @@
+# benchmarks/ai_stub.py
+"""
+Gemini / Gamma / Chroma 스텁 서버 (오프라인 벤치마크용)
+
+실제 서비스 코드가 그대로 붙을 수 있도록 각 API 의 HTTP 형식을 흉내 낸다.
+  - Gemini : POST /v1beta/models/<model>:generateContent, GET /v1beta/models
+             (google-genai 는 GOOGLE_GEMINI_BASE_URL 로 주소를 바꿀 수 있다)
+             응답 지연(latency ± jitter)과 429(RESOURCE_EXHAUSTED, "Please retry in Ns") 주입 지원
+  - Gamma  : /v1.0/themes, POST /v1.0/generations, GET /v1.0/generations/<id>,
+             완료 후 exportUrl → /files/<id>.pptx (benchmarks/fixtures 의 PPTX)
+  - Chroma : chromadb==0.5.5 HttpClient 가 쓰는 /api/v1 일부 (tenant/database 확인, get_collection,
+             count, query, get). 문서는 컬렉션별로 고정 생성, 점수는 결정적 가짜 거리
+
+응답 본문은 프롬프트 키워드 규칙으로 고른다 (DEFAULT_RULES, --responses 로 JSON 규칙 추가).
+
+    python -m benchmarks.ai_stub --port 8790 --latency 0.5 --rate-429 0.05
+    # 앱 쪽 환경변수 (출력되는 export 줄 참고)
+    GOOGLE_GEMINI_BASE_URL=http://127.0.0.1:8790 GAMMA_API_BASE=http://127.0.0.1:8790/v1.0 \
+    CHROMA_HOST=127.0.0.1 CHROMA_PORT=8790 LAW_CHROMA_HOST=127.0.0.1 LAW_CHROMA_PORT=8790
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.fixtures import SECTIONS, build_pptx_bytes
+
+# =========================================================
+# Gemini 응답 규칙: 프롬프트에 match 문자열이 있으면 text 를 돌려준다 (위에서부터 첫 일치)
+# =========================================================
+_SLIDE_BLOCK = (
+    "SLIDE\n"
+    "SECTION: {section}\n"
+    "TITLE: {section} 핵심 추진 전략 {n}\n"
+    "KEY_MESSAGE: 데이터 기반 공정 최적화, 현장 실증, 생산성 향상\n"
+    "BULLETS:\n"
+    "- 제조 데이터 수집 체계 구축\n"
+    "- AI 기반 공정 이상 탐지 모델\n"
+    "- 실증 라인 적용 및 효과 검증\n"
+    "EVIDENCE:\n"
+    "- type: 수치\n"
+    "  text: 생산성 15% 향상 목표\n"
+    "ENDSLIDE\n"
+)
+
+
+def _json_text(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False)
+
+
+DEFAULT_RULES: List[Dict[str, str]] = [
+    # Step 1: 자격요건 자동 판정 / 심층 분석 / 기관소개 요약 (main_notice, notice_llm)
+    {"match": "자동 판정하라", "text": _json_text({
+        "title": "자격요건 자동 판정 결과",
+        "overall_eligibility": {"status": "확인 필요", "summary": "스텁 판정 결과입니다."},
+        "judgments": [{
+            "id": 1, "category": "신청주체 유형", "requirement_text": "중소기업",
+            "judgment": "가능", "reason": "사업보고서상 중소기업", "related_law": "중소기업기본법 제2조",
+            "company_info_used": "기업 규모", "quote_from_announcement": "중소기업", "additional_action": None,
+        }],
+        "warning_items": [], "missing_info": [], "recommendations": [],
+    })},
+    {"match": "실무 기반 전략 리포트를 JSON", "text": _json_text({
+        "title": "공고문 실무 분석 리포트",
+        "research_intent": {"policy_background": "스텁 정책 배경", "target_issues": ["제조 생산성"]},
+        "evaluation_weight_analysis": {"summary": "스텁 배점 분석", "high_weight_items": [
+            {"item": "기술성", "points": 30, "strategy": "정량 목표 제시"},
+        ]},
+        "mandatory_vs_optional": {"mandatory": ["중소기업"], "optional_bonus": ["벤처기업"]},
+        "critical_focus_areas": [{"area": "기술 완성도", "why_important": "배점 최대", "action_items": ["실증 계획"]}],
+        "quantitative_targets": {
+            "research_goals": ["생산성 15% 향상"], "performance_indicators": ["TRL 7"],
+            "deliverables": ["시제품 1대"], "commercialization": ["3년 내 매출 10억"],
+            "mandatory_requirements": ["박사급 연구원 1명"],
+        },
+    })},
+    {"match": "기관소개 슬라이드용 요약 JSON", "text": _json_text({
+        "company_name": "스텁 주식회사", "company_type": "중소기업", "employees": "50명",
+        "one_line_intro": "제조 AI 전문 기업", "core_competency": ["공정 데이터 분석"],
+        "key_achievements": ["스마트공장 구축"], "evidence": ["사업보고서"],
+    })},
+    # Step 2: 차별화 전략 보고서 (search_llm.summarize_report)
+    {"match": "차별화 전략 수립", "text": _json_text({
+        "summary_opinion": "스텁 분석 결과입니다.",
+        "track_a_comparison": [{"year": "2024", "ministry": "과학기술정보통신부", "title": "스텁 전략", "similarity": "중", "difference": "적용 분야가 다름"}],
+        "track_b_comparison": [],
+        "strategies": ["전략 1: 현장 실증 중심 차별화"],
+    })},
+    # Step 4: 발표 대본 + 예상 Q&A (script_llm.generate_script_and_qna)
+    {"match": "실전 발표용 리포트", "text": _json_text({
+        "slides": [{"page": i + 1, "title": f"{s} {i + 1}", "script": f"{s} 슬라이드 발표 대본입니다."} for i, s in enumerate(SECTIONS)],
+        "qna": [{"question": "기술적 차별성은 무엇입니까?", "answer": "현장 실증 데이터 기반입니다.", "tips": "수치로 답변"}],
+    })},
+    # Step 3 (PPT)
+    {"match": "key_message_keywords", "text": _json_text({
+        "title": "핵심 추진 전략",
+        "key_message_keywords": ["공정 최적화", "현장 실증", "생산성 향상"],
+        "bullets": ["제조 데이터 수집 체계", "AI 이상 탐지 모델", "실증 라인 검증"],
+        "evidence": [{"type": "수치", "text": "생산성 15% 향상"}],
+    })},
+    {"match": "섹션 분류기", "text": json.dumps({"items": []})},
+    {"match": "[섹션:", "text": "{slides}"},
+]
+DEFAULT_JSON_TEXT = "{}"
+DEFAULT_TEXT = "스텁 응답입니다."
+
+# 흰색 PNG (이미지 생성 응답)
+def _png_bytes(w: int = 64, h: int = 64) -> bytes:
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    raw = b"".join(b"\x00" + b"\xff\xff\xff" * w for _ in range(h))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+_PNG_B64 = base64.b64encode(_png_bytes()).decode("ascii")
+
+
+class StubConfig:
+    def __init__(
+        self,
+        *,
+        latency_sec: float = 0.3,
+        jitter: float = 0.3,
+        rate_429: float = 0.0,
+        retry_after_sec: int = 1,
+        gamma_latency_sec: float = 0.05,
+        gamma_polls: int = 3,
+        pptx_slides: int = 12,
+        chroma_docs: int = 200,
+        rules: Optional[List[Dict[str, str]]] = None,
+        seed: int = 0,
+    ):
+        self.latency_sec = latency_sec
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after_sec = retry_after_sec
+        self.gamma_latency_sec = gamma_latency_sec
+        self.gamma_polls = gamma_polls
+        self.chroma_docs = chroma_docs
+        self.rules = list(rules or []) + DEFAULT_RULES
+        self.pptx_bytes = build_pptx_bytes(pptx_slides)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.generations: Dict[str, int] = {}
+        self.collections: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, int] = {}
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def gemini_delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency_sec * self._rng.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def inject_429(self) -> bool:
+        with self._lock:
+            return self.rate_429 > 0 and self._rng.random() < self.rate_429
+
+    def gemini_text(self, prompt: str, json_mode: bool) -> str:
+        for rule in self.rules:
+            if rule.get("match") and rule["match"] in prompt:
+                text = rule.get("text") or ""
+                if "{slides}" in text:
+                    m = re.search(r"\[섹션:\s*([^\]]+)\]", prompt)
+                    section = (m.group(1).strip() if m else SECTIONS[1])
+                    text = text.replace("{slides}", "".join(_SLIDE_BLOCK.format(section=section, n=i + 1) for i in range(3)))
+                return text
+        return DEFAULT_JSON_TEXT if json_mode else DEFAULT_TEXT
+
+    # ---------------- Chroma ----------------
+    def collection(self, name: str) -> Dict[str, Any]:
+        with self._lock:
+            col = self.collections.get(name)
+            if col is None:
+                col = {"id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"stub-chroma/{name}")), "name": name, "docs": self._docs(name)}
+                self.collections[name] = col
+            return col
+
+    def collection_by_id(self, cid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for col in self.collections.values():
+                if col["id"] == cid:
+                    return col
+        return None
+
+    def _docs(self, name: str) -> List[Tuple[str, str, Dict[str, Any]]]:
+        agencies = ["과학기술정보통신부", "산업통상자원부", "중소벤처기업부", "보건복지부"]
+        docs = []
+        for i in range(self.chroma_docs):
+            meta = {
+                "law_name": f"스텁 법령 {i % 20}",
+                "law_type": "법률",
+                "regulation_type": "시행령",
+                "regulation_number": str(i % 20),
+                "article_number": f"제{i % 30 + 1}조",
+                "article_title": "지원 대상",
+                "full_reference": f"스텁 법령 {i % 20} 제{i % 30 + 1}조",
+                "agency_norm": agencies[i % len(agencies)],
+                "title": f"{name} 문서 {i}",
+            }
+            doc = f"passage: [paragraph#{i}] {SECTIONS[i % len(SECTIONS)]} 관련 지원 요건과 평가 기준 {i}. " * 3
+            docs.append((f"{name}-{i}", doc, meta))
+        return docs
+
+
+def _match_where(meta: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    for key, cond in (where or {}).items():
+        if key == "$and":
+            if not all(_match_where(meta, w) for w in cond):
+                return False
+            continue
+        if key == "$or":
+            if not any(_match_where(meta, w) for w in cond):
+                return False
+            continue
+        value = meta.get(key)
+        if isinstance(cond, dict):
+            if "$in" in cond and value not in cond["$in"]:
+                return False
+            if "$nin" in cond and value in cond["$nin"]:
+                return False
+            if "$eq" in cond and value != cond["$eq"]:
+                return False
+            if "$ne" in cond and value == cond["$ne"]:
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _prompt_text(body: Dict[str, Any]) -> str:
+    texts: List[str] = []
+    for content in body.get("contents") or []:
+        for part in (content or {}).get("parts") or []:
+            if isinstance(part, dict) and isinstance(part.get("text"), str):
+                texts.append(part["text"])
+    return "\n".join(texts)
+
+
+def make_handler(cfg: StubConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        # ---------------- 공통 ----------------
+        def _body(self) -> Dict[str, Any]:
+            n = int(self.headers.get("Content-Length") or 0)
+            if not n:
+                return {}
+            try:
+                return json.loads(self.rfile.read(n) or b"{}")
+            except ValueError:
+                return {}
+
+        def _send(self, status: int, payload: Any, content_type: str = "application/json") -> None:
+            body = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):  # noqa: N802
+            url = urlparse(self.path)
+            path, qs = url.path, parse_qs(url.query)
+            if path == "/stub/stats":
+                return self._send(200, dict(cfg.counters))
+            if path.startswith("/v1beta/models"):
+                return self._gemini_models()
+            if path.startswith("/v1.0/"):
+                return self._gamma_get(path)
+            if path.startswith("/files/"):
+                cfg.count("gamma.download")
+                return self._send(200, cfg.pptx_bytes, "application/vnd.openxmlformats-officedocument.presentationml.presentation")
+            if path.startswith("/api/v1"):
+                return self._chroma_get(path, qs)
+            self._send(404, {"error": f"unknown path {path}"})
+
+        def do_POST(self):  # noqa: N802
+            path = urlparse(self.path).path
+            body = self._body()
+            if path.startswith("/v1beta/models/") and path.endswith(":generateContent"):
+                return self._gemini_generate(path, body)
+            if path == "/v1.0/generations":
+                return self._gamma_start(body)
+            if path.startswith("/api/v1/collections/"):
+                return self._chroma_post(path, body)
+            self._send(404, {"error": f"unknown path {path}"})
+
+        def log_message(self, *args):
+            pass
+
+        # ---------------- Gemini ----------------
+        def _gemini_models(self) -> None:
+            cfg.count("gemini.models")
+            models = [
+                {"name": "models/gemini-2.5-flash", "supportedGenerationMethods": ["generateContent"]},
+                {"name": "models/gemini-2.5-flash-image", "supportedGenerationMethods": ["generateContent"]},
+            ]
+            self._send(200, {"models": models})
+
+        def _gemini_generate(self, path: str, body: Dict[str, Any]) -> None:
+            time.sleep(cfg.gemini_delay())
+            if cfg.inject_429():
+                cfg.count("gemini.429")
+                return self._send(429, {"error": {
+                    "code": 429,
+                    "message": f"Resource has been exhausted (stub). Please retry in {cfg.retry_after_sec}s.",
+                    "status": "RESOURCE_EXHAUSTED",
+                }})
+
+            gen_cfg = body.get("generationConfig") or {}
+            prompt = _prompt_text(body)
+            if "IMAGE" in [str(m).upper() for m in gen_cfg.get("responseModalities") or []]:
+                cfg.count("gemini.image")
+                parts = [{"inlineData": {"mimeType": "image/png", "data": _PNG_B64}}]
+                out_chars = 0
+            else:
+                cfg.count("gemini.text")
+                text = cfg.gemini_text(prompt, gen_cfg.get("responseMimeType") == "application/json")
+                parts = [{"text": text}]
+                out_chars = len(text)
+            in_tokens, out_tokens = max(1, len(prompt) // 4), max(1, out_chars // 4)
+            self._send(200, {
+                "candidates": [{"content": {"role": "model", "parts": parts}, "finishReason": "STOP", "index": 0}],
+                "usageMetadata": {"promptTokenCount": in_tokens, "candidatesTokenCount": out_tokens, "totalTokenCount": in_tokens + out_tokens},
+                "modelVersion": path.split("/models/", 1)[1].split(":", 1)[0],
+            })
+
+        # ---------------- Gamma ----------------
+        def _gamma_start(self, body: Dict[str, Any]) -> None:
+            time.sleep(cfg.gamma_latency_sec)
+            cfg.count("gamma.start")
+            gid = uuid.uuid4().hex[:12]
+            with cfg._lock:
+                cfg.generations[gid] = 0
+            self._send(201, {"generationId": gid})
+
+        def _gamma_get(self, path: str) -> None:
+            time.sleep(cfg.gamma_latency_sec)
+            if path.startswith("/v1.0/themes"):
+                cfg.count("gamma.themes")
+                return self._send(200, {"data": [{"id": "stub-theme", "name": "Stub"}], "hasMore": False})
+            gid = path.rsplit("/", 1)[-1]
+            cfg.count("gamma.poll")
+            with cfg._lock:
+                if gid not in cfg.generations:
+                    return self._send(404, {"error": "generation not found"})
+                cfg.generations[gid] += 1
+                polls = cfg.generations[gid]
+            if polls < cfg.gamma_polls:
+                return self._send(200, {"generationId": gid, "status": "pending"})
+            host = self.headers.get("Host") or f"127.0.0.1:{self.server.server_address[1]}"
+            self._send(200, {
+                "generationId": gid,
+                "status": "completed",
+                "gammaUrl": f"http://{host}/gamma/{gid}",
+                "exportUrl": f"http://{host}/files/{gid}.pptx",
+            })
+
+        # ---------------- Chroma (/api/v1, chromadb 0.5.x) ----------------
+        def _collection_model(self, col: Dict[str, Any]) -> Dict[str, Any]:
+            return {
+                "id": col["id"],
+                "name": col["name"],
+                "metadata": {"ingest_version": "stub"},
+                "configuration_json": {
+                    "hnsw_configuration": {
+                        "space": "cosine", "ef_construction": 100, "ef_search": 10, "num_threads": 1,
+                        "M": 16, "resize_factor": 1.2, "batch_size": 100, "sync_threshold": 1000,
+                        "_type": "HNSWConfigurationInternal",
+                    },
+                    "_type": "CollectionConfigurationInternal",
+                },
+                "dimension": None,
+                "tenant": "default_tenant",
+                "database": "default_database",
+                "version": 0,
+            }
+
+        def _chroma_get(self, path: str, qs: Dict[str, List[str]]) -> None:
+            cfg.count("chroma.get")
+            parts = path[len("/api/v1"):].strip("/").split("/")
+            if parts == [""] or parts == ["heartbeat"]:
+                return self._send(200, {"nanosecond heartbeat": time.time_ns()})
+            if parts == ["version"]:
+                return self._send(200, "0.5.5")
+            if parts == ["pre-flight-checks"]:
+                return self._send(200, {"max_batch_size": 5461})
+            if parts[0] == "tenants":
+                return self._send(200, {"name": parts[1]})
+            if parts[0] == "databases":
+                return self._send(200, {"id": str(uuid.uuid5(uuid.NAMESPACE_URL, parts[1])), "name": parts[1], "tenant": (qs.get("tenant") or ["default_tenant"])[0]})
+            if parts == ["collections"]:
+                return self._send(200, [self._collection_model(c) for c in list(cfg.collections.values())])
+            if parts[0] == "collections" and len(parts) == 3 and parts[2] == "count":
+                col = cfg.collection_by_id(parts[1])
+                return self._send(200, len(col["docs"]) if col else 0)
+            if parts[0] == "collections" and len(parts) == 2:
+                return self._send(200, self._collection_model(cfg.collection(parts[1])))
+            self._send(404, {"error": f"unknown chroma path {path}"})
+
+        def _chroma_post(self, path: str, body: Dict[str, Any]) -> None:
+            parts = path[len("/api/v1"):].strip("/").split("/")
+            col = cfg.collection_by_id(parts[1]) if len(parts) >= 3 else None
+            if col is None:
+                return self._send(404, {"error": "collection not found"})
+            include = body.get("include") or ["metadatas", "documents", "distances"]
+            docs = [d for d in col["docs"] if _match_where(d[2], body.get("where"))]
+
+            if parts[2] == "get":
+                cfg.count("chroma.get_records")
+                offset, limit = int(body.get("offset") or 0), body.get("limit")
+                rows = docs[offset: offset + int(limit)] if limit else docs[offset:]
+                return self._send(200, {
+                    "ids": [r[0] for r in rows],
+                    "documents": [r[1] for r in rows] if "documents" in include else None,
+                    "metadatas": [r[2] for r in rows] if "metadatas" in include else None,
+                    "embeddings": None, "uris": None, "data": None, "included": include,
+                })
+            if parts[2] == "query":
+                cfg.count("chroma.query")
+                n = int(body.get("n_results") or 10)
+                out: Dict[str, List[Any]] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+                for qi, emb in enumerate(body.get("query_embeddings") or []):
+                    # 결정적 가짜 거리: 쿼리 벡터 앞부분 + 문서 번호로 섞어서 정렬
+                    seed = int(abs(sum((emb or [0.0])[:8])) * 1e6) + qi
+                    ranked = sorted(docs, key=lambda d: zlib.crc32(f"{seed}:{d[0]}".encode("utf-8")))[:n]
+                    out["ids"].append([d[0] for d in ranked])
+                    out["documents"].append([d[1] for d in ranked])
+                    out["metadatas"].append([d[2] for d in ranked])
+                    out["distances"].append([round(0.1 + 0.05 * i, 4) for i in range(len(ranked))])
+                return self._send(200, {
+                    "ids": out["ids"],
+                    "documents": out["documents"] if "documents" in include else None,
+                    "metadatas": out["metadatas"] if "metadatas" in include else None,
+                    "distances": out["distances"] if "distances" in include else None,
+                    "embeddings": None, "uris": None, "data": None, "included": include,
+                })
+            self._send(404, {"error": f"unknown chroma path {path}"})
+
+    return Handler
+
+
+def start_stub(cfg: Optional[StubConfig] = None, port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """백그라운드 스레드로 서버 시작 → (server, base_url). 끝나면 server.shutdown()"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(cfg or StubConfig()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="ai-stub", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def stub_env(base_url: str) -> Dict[str, str]:
+    """스텁에 붙기 위한 앱 환경변수"""
+    port = base_url.rsplit(":", 1)[1]
+    return {
+        "GOOGLE_API_KEY": "stub-key",   # PPT 생성 (llm_utils, section_split, 이미지)
+        "GEMINI_API_KEY": "stub-key",   # Step 1/2/4 (main_notice, notice_llm, search_llm, script_llm)
+        "GOOGLE_GEMINI_BASE_URL": base_url,
+        "GAMMA_API_KEY": "stub-key",
+        "GAMMA_API_BASE": f"{base_url}/v1.0",
+        "CHROMA_HOST": "127.0.0.1",
+        "CHROMA_PORT": port,
+        "LAW_CHROMA_HOST": "127.0.0.1",
+        "LAW_CHROMA_PORT": port,
+    }
+
+
+def load_rules(path: str) -> List[Dict[str, str]]:
+    """[{"match": "...", "text": "..."}] 형식 JSON"""
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    if not isinstance(rules, list):
+        raise ValueError(f"응답 규칙은 리스트여야 합니다: {path}")
+    return rules
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gemini/Gamma/Chroma 스텁 서버")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--latency", type=float, default=0.3, help="Gemini 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.3, help="지연 ± 비율")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="429 주입 확률 (0~1)")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 메시지의 retry in N초")
+    parser.add_argument("--gamma-latency", type=float, default=0.05)
+    parser.add_argument("--gamma-polls", type=int, default=3, help="완료까지 폴링 횟수")
+    parser.add_argument("--responses", default="", help="추가 응답 규칙 JSON 파일")
+    args = parser.parse_args()
+
+    cfg = StubConfig(
+        latency_sec=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        retry_after_sec=args.retry_after,
+        gamma_latency_sec=args.gamma_latency,
+        gamma_polls=args.gamma_polls,
+        rules=load_rules(args.responses) if args.responses else None,
+    )
+    server, url = start_stub(cfg, args.port)
+    print(f"stub: {url} (latency={args.latency}s, 429 rate={args.rate_429})")
+    for k, v in stub_env(url).items():
+        print(f"export {k}={v}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,308 @@
+# benchmarks/bench_pipeline.py
+"""
+파이프라인 벤치마크: /parse, Step 1~4, PPT 노드별 시간 (처리량 + p50/p95)
+
+외부 API 는 benchmarks/ai_stub.py 스텁으로 대체한다 (Gemini 지연/429 주입, Gamma 폴링, Chroma 검색).
+입력 파일은 benchmarks/fixtures.py 로 매번 같은 내용으로 만든다.
+
+in-process (기본) : 이 프로세스에서 스텁을 띄우고 환경변수를 스텁으로 돌린 뒤 각 단계 함수를 직접 호출
+--api URL        : 이미 떠 있는 FastAPI 서버에 HTTP 로 요청 (서버는 ai_stub 의 export 환경변수로 실행)
+
+PPT(step3) 는 run_ppt_generation 의 실행 trace(<deck>.trace.json)에서 노드별 시간도 모은다.
+Step 1 은 공고/사업보고서를 DB 에서 읽으므로 --notice-id 를 줄 때만 실행한다.
+
+    cd modeling
+    python -m benchmarks.bench_pipeline --scenarios parse step2 step3 step4 --iterations 5 --concurrency 2 \
+        --latency 0.3 --rate-429 0.05 --json-out tmp/bench.json
+    # 배포 전 회귀 확인: 성공 0건, 오류 증가, 기준 결과보다 p95 가 20% 넘게 느려지면 exit 1
+    python -m benchmarks.bench_pipeline --baseline tmp/bench_base.json --max-regression 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.ai_stub import StubConfig, load_rules, start_stub, stub_env
+from benchmarks.fixtures import write_fixtures
+
+SCENARIOS = ("parse", "step1", "step2", "step3", "step4")
+
+
+def percentile(values: List[float], p: float) -> float:
+    """선형 보간 백분위 (p: 0~100)"""
+    if not values:
+        return 0.0
+    xs = sorted(values)
+    k = (len(xs) - 1) * p / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(xs) - 1)
+    return xs[lo] + (xs[hi] - xs[lo]) * (k - lo)
+
+
+def summarize(samples: List[float], errors: int, elapsed_sec: float) -> Dict[str, Any]:
+    return {
+        "n": len(samples) + errors,
+        "ok": len(samples),
+        "errors": errors,
+        "throughput_per_min": round(len(samples) / elapsed_sec * 60, 2) if elapsed_sec else 0.0,
+        "p50_sec": round(percentile(samples, 50), 3),
+        "p95_sec": round(percentile(samples, 95), 3),
+        "max_sec": round(max(samples), 3) if samples else 0.0,
+    }
+
+
+def run_repeated(fn: Callable[[int], Any], iterations: int, concurrency: int) -> Dict[str, Any]:
+    """fn(i) 를 iterations 번 (동시 concurrency) 실행 → 요약 + 각 실행 결과"""
+    samples: List[float] = []
+    outputs: List[Any] = []
+    errors: List[str] = []
+
+    def one(i: int) -> None:
+        t0 = time.perf_counter()
+        try:
+            out = fn(i)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            return
+        samples.append(time.perf_counter() - t0)
+        outputs.append(out)
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        for i in range(iterations):
+            one(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+            list(pool.map(one, range(iterations)))
+    summary = summarize(samples, len(errors), time.perf_counter() - started)
+    if errors:
+        summary["first_error"] = errors[0][:300]
+    return {"summary": summary, "outputs": outputs}
+
+
+# =========================================================
+# 시나리오 (in-process)
+# =========================================================
+def _parse_inprocess(fixtures: Dict[str, str]) -> Callable[[int], Any]:
+    from utils.document_parsing import extract_text_from_pdf, parse_docx_to_blocks
+
+    def run(i: int) -> Any:
+        # /parse 와 같은 함수. pdf/docx 번갈아
+        if i % 2 == 0:
+            return len(extract_text_from_pdf(fixtures["pdf"]))
+        return len(parse_docx_to_blocks(fixtures["docx"], "tmp", save_media=False))
+
+    return run
+
+
+def _step1_inprocess(notice_id: int, company_id: int) -> Callable[[int], Any]:
+    from features.rfp_analysis_checklist.main_notice import run_notice_step1
+
+    return lambda i: run_notice_step1(notice_id=notice_id, company_id=company_id)
+
+
+def _step2_inprocess(notice_text: str) -> Callable[[int], Any]:
+    from features.rnd_search.main_search import main as run_search
+
+    return lambda i: run_search(notice_text=f"{notice_text} #{i}", ministry_name="과학기술정보통신부")
+
+
+def _step3_inprocess(fixtures: Dict[str, str], out_dir: str) -> Callable[[int], Any]:
+    from features.ppt_maker.main_ppt import run_ppt_generation
+
+    def run(i: int) -> Any:
+        final_state = run_ppt_generation(
+            source_path=fixtures["docx"],
+            output_dir=out_dir,
+            output_filename=f"bench_{i}.pptx",
+            render_mode="gamma",
+            gamma_theme="stub-theme",
+            gamma_timeout_sec=300,
+        )
+        if not final_state or not final_state.get("final_ppt_path"):
+            raise RuntimeError("PPT 생성 실패 (final_ppt_path 없음)")
+        return final_state.get("trace_path") or ""
+
+    return run
+
+
+def _step4_inprocess(fixtures: Dict[str, str], out_dir: str) -> Callable[[int], Any]:
+    from features.ppt_script.main_script import main as run_script_gen
+
+    def run(i: int) -> Any:
+        # 기본 출력(data/report/script_flow.json)은 동시 실행끼리 덮어쓰므로 실행마다 벤치 출력 폴더에 따로 쓴다
+        output_path = os.path.join(out_dir, f"script_flow_{i}.json")
+        result = run_script_gen(pptx_path=fixtures["pptx"], output_path=output_path)
+        if not result:
+            raise RuntimeError("스크립트 생성 실패")
+        return ""
+
+    return run
+
+
+# =========================================================
+# 시나리오 (--api, HTTP)
+# =========================================================
+def _api_call(api: str, scenario: str, fixtures: Dict[str, str], args: argparse.Namespace) -> Callable[[int], Any]:
+    import requests
+
+    def post_file(path: str, kind: str, data: Optional[Dict[str, Any]] = None) -> Any:
+        with open(fixtures[kind], "rb") as f:
+            r = requests.post(f"{api}{path}", files={"file": (os.path.basename(fixtures[kind]), f)}, data=data or {}, timeout=1800)
+        r.raise_for_status()
+        return r.json()
+
+    def run(i: int) -> Any:
+        if scenario == "parse":
+            return post_file("/parse", "pdf" if i % 2 == 0 else "docx")
+        if scenario == "step1":
+            r = requests.post(f"{api}/api/analyze/step1", json={"notice_id": args.notice_id, "company_id": args.company_id}, timeout=1800)
+        elif scenario == "step2":
+            r = requests.post(f"{api}/api/analyze/step2", json={"notice_text": f"{args.notice_text} #{i}", "ministry_name": "과학기술정보통신부"}, timeout=1800)
+        elif scenario == "step3":
+            return post_file("/api/analyze/step3", "docx")
+        else:
+            return post_file("/api/analyze/step4", "pptx")
+        r.raise_for_status()
+        return r.json()
+
+    return run
+
+
+def node_breakdown(trace_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+    """PPT 실행 trace 들에서 노드별 wall time 분포"""
+    per_node: Dict[str, List[float]] = {}
+    for path in trace_paths:
+        if not path or not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            trace = json.load(f)
+        for name, node in ((trace.get("summary") or {}).get("nodes") or {}).items():
+            if node.get("wall_sec"):
+                per_node.setdefault(name, []).append(float(node["wall_sec"]))
+    return {
+        name: {"n": len(xs), "p50_sec": round(percentile(xs, 50), 3), "p95_sec": round(percentile(xs, 95), 3)}
+        for name, xs in per_node.items()
+    }
+
+
+def compare_baseline(results: Dict[str, Any], baseline_path: str, max_regression: float) -> List[str]:
+    """baseline 대비 회귀 항목: 성공 0건, 오류 수 증가, p95 가 max_regression 비율 넘게 증가"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = []
+    for key, cur in results.items():
+        # 전부 실패하면 p95=0 이라 시간 비교로는 못 잡는다
+        if "ok" in cur and cur["ok"] == 0:
+            regressions.append(f"{key}: 성공 0건 (errors={cur.get('errors', 0)}, {cur.get('first_error', '')})")
+            continue
+        base = baseline.get(key)
+        if not base:
+            continue
+        if cur.get("errors", 0) > base.get("errors", 0):
+            regressions.append(f"{key}: errors {base.get('errors', 0)} -> {cur['errors']} ({cur.get('first_error', '')})")
+            continue
+        if not base.get("p95_sec") or not cur.get("p95_sec"):
+            continue
+        ratio = cur["p95_sec"] / base["p95_sec"] - 1
+        if ratio > max_regression:
+            regressions.append(f"{key}: p95 {base['p95_sec']}s -> {cur['p95_sec']}s (+{ratio * 100:.0f}%)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="파이프라인 벤치마크 (스텁 API)")
+    parser.add_argument("--scenarios", nargs="+", default=["parse", "step3"], choices=SCENARIOS)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--api", default="", help="FastAPI 서버 주소 (없으면 in-process)")
+    parser.add_argument("--stub-url", default="", help="이미 떠 있는 ai_stub 주소 (없으면 새로 띄움)")
+    parser.add_argument("--latency", type=float, default=0.3, help="스텁 Gemini 지연(초)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="스텁 429 주입 확률")
+    parser.add_argument("--gamma-polls", type=int, default=3)
+    parser.add_argument("--responses", default="", help="스텁 응답 규칙 JSON")
+    parser.add_argument("--fixtures-dir", default=os.path.join("tmp", "bench_fixtures"))
+    parser.add_argument("--pdf-pages", type=int, default=10)
+    parser.add_argument("--notice-id", type=int, default=0, help="Step 1 용 공고 ID (DB 필요)")
+    parser.add_argument("--company-id", type=int, default=1)
+    parser.add_argument("--notice-text", default="인공지능 기반 제조 공정 최적화 기술 개발 및 실증 지원 사업")
+    parser.add_argument("--parse-cache", action="store_true", help="in-process 파싱 캐시 사용 (기본: 끄고 매번 새로 파싱)")
+    parser.add_argument("--json-out", default="")
+    parser.add_argument("--baseline", default="", help="비교할 이전 --json-out 결과")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    fixtures = write_fixtures(args.fixtures_dir, pdf_pages=args.pdf_pages)
+    out_dir = os.path.join("tmp", "bench_output")
+
+    server = None
+    stub_url = args.stub_url
+    if not stub_url and not args.api:
+        cfg = StubConfig(
+            latency_sec=args.latency,
+            rate_429=args.rate_429,
+            gamma_polls=args.gamma_polls,
+            rules=load_rules(args.responses) if args.responses else None,
+        )
+        server, stub_url = start_stub(cfg)
+    if stub_url:
+        # 서비스 모듈 import 전에 설정해야 한다 (GAMMA_API_BASE 등은 import 시점에 읽음)
+        os.environ.update(stub_env(stub_url))
+        print(f"stub={stub_url}")
+
+    if not args.api and not args.parse_cache:
+        os.environ["PARSE_CACHE_ENABLED"] = "0"
+
+    results: Dict[str, Any] = {}
+    try:
+        for scenario in args.scenarios:
+            if scenario == "step1" and not args.notice_id:
+                print("step1: skip (--notice-id 필요, 공고/사업보고서 DB 조회)")
+                continue
+            if args.api:
+                fn = _api_call(args.api.rstrip("/"), scenario, fixtures, args)
+            elif scenario == "parse":
+                fn = _parse_inprocess(fixtures)
+            elif scenario == "step1":
+                fn = _step1_inprocess(args.notice_id, args.company_id)
+            elif scenario == "step2":
+                fn = _step2_inprocess(args.notice_text)
+            elif scenario == "step3":
+                fn = _step3_inprocess(fixtures, out_dir)
+            else:
+                fn = _step4_inprocess(fixtures, out_dir)
+
+            run = run_repeated(fn, args.iterations, args.concurrency)
+            results[scenario] = run["summary"]
+            print(f"{scenario}: " + " ".join(f"{k}={v}" for k, v in run["summary"].items()))
+
+            if scenario == "step3" and not args.api:
+                for name, stats in node_breakdown(run["outputs"]).items():
+                    results[f"step3.{name}"] = stats
+                    print(f"  node {name}: " + " ".join(f"{k}={v}" for k, v in stats.items()))
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    if args.json_out:
+        os.makedirs(os.path.dirname(args.json_out) or ".", exist_ok=True)
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"saved: {args.json_out}")
+
+    if args.baseline:
+        regressions = compare_baseline(results, args.baseline, args.max_regression)
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"baseline OK (오류 증가 없음, p95 +{args.max_regression * 100:.0f}% 이내)")
+
+
+if __name__ == "__main__":
+    main()
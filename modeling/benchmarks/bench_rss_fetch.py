@@ -0,0 +1,56 @@
+# benchmarks/bench_rss_fetch.py
+"""
+RSS 수집 벤치마크: 순차(workers=1) vs 동시 요청
+
+로컬 스텁 서버(benchmarks/bizinfo_stub.py)를 띄워 네트워크 없이 측정한다.
+writer_sec 으로 페이지당 DB 적재 시간을 흉내 내면 back-pressure 동작도 볼 수 있다.
+
+    cd modeling
+    python -m benchmarks.bench_rss_fetch --total 3000 --page-unit 100 --latency 0.2 --workers 1 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.bizinfo_stub import start_stub
+from utils.bizinfo_rss import build_session, iter_rss_pages
+
+
+def run_once(base_url: str, page_unit: int, workers: int, writer_sec: float) -> dict:
+    session = build_session(pool_size=max(1, workers))
+    started = time.perf_counter()
+    pages = rows = 0
+    for _, raw_count, _, page_rows in iter_rss_pages(session, base_url, "stub-key", page_unit=page_unit, workers=workers):
+        pages += 1
+        rows += len(page_rows)
+        if writer_sec:
+            time.sleep(writer_sec)  # DB writer 흉내
+    return {"workers": workers, "pages": pages, "tech_rows": rows, "elapsed_sec": round(time.perf_counter() - started, 3)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="bizinfo RSS 수집 벤치마크")
+    parser.add_argument("--total", type=int, default=3000)
+    parser.add_argument("--page-unit", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.2, help="스텁 응답 지연(초)")
+    parser.add_argument("--writer-sec", type=float, default=0.0, help="페이지당 DB 적재 시간 흉내(초)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    server, base_url = start_stub(args.total, args.latency)
+    try:
+        print(f"stub={base_url} totCnt={args.total} pageUnit={args.page_unit} latency={args.latency}s")
+        baseline = None
+        for workers in args.workers:
+            result = run_once(base_url, args.page_unit, workers, args.writer_sec)
+            baseline = baseline or result["elapsed_sec"]
+            speedup = baseline / result["elapsed_sec"] if result["elapsed_sec"] else 0.0
+            print(" ".join(f"{k}={v}" for k, v in result.items()) + f" speedup={speedup:.1f}x")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bizinfo_stub.py
+"""
+기업마당 RSS 스텁 서버 (오프라인 벤치마크용)
+
+pageIndex / pageUnit 쿼리에 맞춰 totCnt 건의 가짜 공고 RSS 를 돌려준다.
+각 응답은 latency_sec 만큼 지연시켜 실제 API 의 네트워크 대기를 흉내 낸다.
+
+    python -m benchmarks.bizinfo_stub --port 8765 --total 3000 --latency 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+
+def render_page(page_index: int, page_unit: int, total: int) -> str:
+    start = (page_index - 1) * page_unit
+    items = []
+    for i in range(start, min(start + page_unit, total)):
+        # 절반 정도만 기술 분류 (실제 피드처럼 필터링이 일어나도록)
+        lcategory = "기술" if i % 2 == 0 else "경영"
+        items.append(
+            "<item>"
+            f"<seq>PBLN_{i:06d}</seq>"
+            f"<title>{escape(f'스텁 공고 {i}')}</title>"
+            f"<link>https://example.invalid/notice/{i}</link>"
+            "<author>중소벤처기업부</author>"
+            "<excInsttNm>중소기업기술정보진흥원</excInsttNm>"
+            f"<description>{escape('<p>지원 대상 및 내용</p>' * 20)}</description>"
+            "<pubDate>2024-01-01</pubDate>"
+            "<reqstDt>20240101 ~ 20240131</reqstDt>"
+            "<trgetNm>중소기업</trgetNm>"
+            f"<lcategory>{lcategory}</lcategory>"
+            f"<printFileNm>공고문_{i}.pdf</printFileNm>"
+            f"<printFlpthNm>/files/print/{i}</printFlpthNm>"
+            f"<fileNm>신청서_{i}.hwp@요약_{i}.pdf</fileNm>"
+            f"<flpthNm>/files/a/{i}@/files/b/{i}</flpthNm>"
+            "<hashtags>AI,R&amp;D,중소기업</hashtags>"
+            f"<totCnt>{total}</totCnt>"
+            "</item>"
+        )
+    return f'<?xml version="1.0" encoding="UTF-8"?><rss><channel>{"".join(items)}</channel></rss>'
+
+
+def make_handler(total: int, latency_sec: float):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            qs = parse_qs(urlparse(self.path).query)
+            page_index = int(qs.get("pageIndex", ["1"])[0])
+            page_unit = int(qs.get("pageUnit", ["100"])[0])
+            if latency_sec:
+                time.sleep(latency_sec)
+            body = render_page(page_index, page_unit, total).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/xml; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_stub(total: int = 3000, latency_sec: float = 0.2, port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """백그라운드 스레드로 서버 시작 → (server, base_url). 끝나면 server.shutdown()"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(total, latency_sec))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="bizinfo-stub", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/rss"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="기업마당 RSS 스텁 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--total", type=int, default=3000)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server, url = start_stub(args.total, args.latency, args.port)
+    print(f"stub RSS: {url} (totCnt={args.total}, latency={args.latency}s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
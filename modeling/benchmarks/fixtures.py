@@ -0,0 +1,189 @@
+# benchmarks/fixtures.py
+"""
+벤치마크용 입력 파일 생성 (PDF / DOCX / PPTX)
+
+바이너리 fixture 를 저장소에 두지 않고 매번 같은 내용으로 만들어 쓴다 (내용이 고정이라 결과 비교 가능).
+  - PDF  : 표준 Helvetica 텍스트 페이지 (pdfplumber 파싱 부하용, 영문)
+  - DOCX : 국가 R&D 제안서 섹션 제목/본문/표 (Step 3 입력, 섹션 분할이 실제로 일어나도록 한글)
+  - PPTX : 제목 + 글머리 슬라이드 (Gamma export 스텁 응답, Step 4 입력)
+
+    python -m benchmarks.fixtures --out tmp/bench_fixtures --pdf-pages 20 --slides 12
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import zipfile
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+SECTIONS: List[str] = [
+    "기관 소개",
+    "연구 개요",
+    "연구 필요성",
+    "연구 목표",
+    "연구 내용",
+    "추진 계획",
+    "활용방안 및 기대효과",
+    "사업화 전략 및 계획",
+]
+
+
+def section_paragraphs(section: str, n: int = 6) -> List[str]:
+    return [
+        f"{section} 관련 세부 내용 {i + 1}: 인공지능 기반 제조 공정 최적화 기술을 개발하고 "
+        f"현장 데이터로 검증하여 생산성 {10 + i}% 향상을 목표로 한다."
+        for i in range(n)
+    ]
+
+
+# =========================================================
+# PDF
+# =========================================================
+def build_pdf_bytes(pages: int = 10, lines_per_page: int = 40) -> bytes:
+    """텍스트만 있는 최소 PDF (외부 라이브러리 없이 작성)"""
+    objects: List[bytes] = []
+
+    def add(obj: str | bytes) -> int:
+        objects.append(obj.encode("latin-1") if isinstance(obj, str) else obj)
+        return len(objects)
+
+    font_id = add("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add("")  # 자리만 잡고 마지막에 채운다
+    page_ids: List[int] = []
+    for p in range(pages):
+        lines = [f"BT /F1 10 Tf 50 {800 - i * 18} Td (Page {p + 1} line {i + 1}: R&D notice eligibility budget schedule) Tj ET" for i in range(lines_per_page)]
+        stream = "\n".join(lines).encode("latin-1")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(
+            add(
+                f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 595 842] "
+                f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+            )
+        )
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>".encode("latin-1")
+    catalog_id = add(f"<< /Type /Catalog /Pages {pages_id} 0 R >>")
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % i + obj + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for off in offsets:
+        out.write(b"%010d 00000 n \n" % off)
+    out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref))
+    return out.getvalue()
+
+
+# =========================================================
+# DOCX
+# =========================================================
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    "</Relationships>"
+)
+_DOCX_DOC_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"></Relationships>'
+)
+
+
+def _w_p(text: str) -> str:
+    return f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(text)}</w:t></w:r></w:p>"
+
+
+def _w_table(rows: List[List[str]]) -> str:
+    cells = "".join(
+        "<w:tr>" + "".join(f"<w:tc>{_w_p(c)}</w:tc>" for c in row) + "</w:tr>"
+        for row in rows
+    )
+    return f"<w:tbl>{cells}</w:tbl>"
+
+
+def build_docx_bytes(paragraphs_per_section: int = 6) -> bytes:
+    body: List[str] = [_w_p("AI 기반 제조 공정 최적화 플랫폼 개발 사업계획서")]
+    for i, section in enumerate(SECTIONS, 1):
+        body.append(_w_p(f"{i}. {section}"))
+        body.extend(_w_p(t) for t in section_paragraphs(section, paragraphs_per_section))
+        if section in ("추진 계획", "연구 목표"):
+            body.append(_w_table([["구분", "1차년도", "2차년도"], ["목표", "데이터 수집", "현장 실증"], ["예산", "3억", "4억"]]))
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{''.join(body)}</w:body></w:document>"
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        z.writestr("_rels/.rels", _DOCX_RELS)
+        z.writestr("word/_rels/document.xml.rels", _DOCX_DOC_RELS)
+        z.writestr("word/document.xml", document)
+    return out.getvalue()
+
+
+# =========================================================
+# PPTX
+# =========================================================
+def build_pptx_bytes(slides: int = 12) -> bytes:
+    from pptx import Presentation
+
+    prs = Presentation()
+    for i in range(slides):
+        section = SECTIONS[i % len(SECTIONS)]
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = f"{section} {i + 1}"
+        body = slide.placeholders[1].text_frame
+        body.text = section_paragraphs(section, 1)[0]
+        for t in section_paragraphs(section, 3)[1:]:
+            body.add_paragraph().text = t
+    out = io.BytesIO()
+    prs.save(out)
+    return out.getvalue()
+
+
+def write_fixtures(out_dir: str, pdf_pages: int = 10, slides: int = 12) -> Dict[str, str]:
+    """fixture 파일을 out_dir 에 쓰고 {종류: 경로} 반환"""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {
+        "pdf": os.path.join(out_dir, f"notice_{pdf_pages}p.pdf"),
+        "docx": os.path.join(out_dir, "proposal.docx"),
+        "pptx": os.path.join(out_dir, f"deck_{slides}.pptx"),
+    }
+    with open(paths["pdf"], "wb") as f:
+        f.write(build_pdf_bytes(pdf_pages))
+    with open(paths["docx"], "wb") as f:
+        f.write(build_docx_bytes())
+    with open(paths["pptx"], "wb") as f:
+        f.write(build_pptx_bytes(slides))
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="벤치마크 fixture 생성")
+    parser.add_argument("--out", default=os.path.join("tmp", "bench_fixtures"))
+    parser.add_argument("--pdf-pages", type=int, default=10)
+    parser.add_argument("--slides", type=int, default=12)
+    args = parser.parse_args()
+    for kind, path in write_fixtures(args.out, args.pdf_pages, args.slides).items():
+        print(f"{kind}: {path} ({os.path.getsize(path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
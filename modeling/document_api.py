@@ -1,101 +1,22 @@
 #document_api.py
-import requests
-import xml.etree.ElementTree as ET
+import time
 import pymysql
-from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
 
 from config import API_KEY, BASE_URL, DB_CONFIG
+from utils.bizinfo_rss import (
+    BIZINFO_FETCH_WORKERS,
+    build_session,
+    iter_rss_pages,
+)
+from utils.bizinfo_rss import fetch_page as _fetch_rss_page
 
 
-def get_text(item, tag):
-    el = item.find(tag)
-    if el is None or el.text is None:
-        return ""
-    return el.text.strip()
-
 def safe(v):
     return v if v is not None else ""
 
 
-def build_session():
-    session = requests.Session()
-    retry = Retry(
-        total=5,
-        connect=5,
-        read=3,
-        backoff_factor=0.7,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET"],
-        raise_on_status=False,
-    )
-    session.mount("https://", HTTPAdapter(max_retries=retry))
-    session.headers.update({"User-Agent": "bizinfo-ingest/1.0"})
-    return session
-
-
-def lcategory_is_tech(lcat):
-    if not lcat:
-        return False
-    parts = [p.strip() for p in lcat.replace("|", "@").split("@")]
-    return "기술" in parts
-
-
 def fetch_page(session, api_key, page_index=1, page_unit=100):
-    params = {
-        "crtfcKey": api_key,
-        "dataType": "rss",
-        "pageIndex": page_index,
-        "pageUnit": page_unit,
-        "searchCnt": page_unit,
-    }
-
-    r = session.get(BASE_URL, params=params, timeout=(5, 30))
-    r.raise_for_status()
-
-    root = ET.fromstring(r.text)
-    channel = root.find("channel")
-    if channel is None:
-        raise ValueError("RSS channel 없음")
-
-    raw_items = channel.findall("item")
-    raw_count = len(raw_items)
-
-    tot_cnt = None
-    rows = []
-
-    for it in raw_items:
-        seq = get_text(it, "seq")
-        if not seq:
-            continue
-
-        lcat = get_text(it, "lcategory")
-        if not lcategory_is_tech(lcat):
-            continue
-
-        if tot_cnt is None:
-            tc = get_text(it, "totCnt")
-            if tc and tc.isdigit():
-                tot_cnt = int(tc)
-
-        rows.append({
-            "seq": seq,
-            "title": get_text(it, "title"),
-            "link": get_text(it, "link"),
-            "author": get_text(it, "author"),
-            "exc_instt_nm": get_text(it, "excInsttNm"),
-            "description": get_text(it, "description"),
-            "pub_date": get_text(it, "pubDate"),
-            "reqst_dt": get_text(it, "reqstDt"),
-            "trget_nm": get_text(it, "trgetNm"),
-            "print_flpth_nm": get_text(it, "printFlpthNm"),
-            "print_file_nm": get_text(it, "printFileNm"),
-            "flpth_nm": get_text(it, "flpthNm"),
-            "file_nm": get_text(it, "fileNm"),
-            "hash_tags": get_text(it, "hashtags"),
-        })
-
-    return raw_count, tot_cnt, rows
+    return _fetch_rss_page(session, BASE_URL, api_key, page_index=page_index, page_unit=page_unit)
 
 
 def parse_hashtags(hash_tags_str):
@@ -131,153 +52,189 @@ def parse_files(print_file_nm_str, print_flpth_nm_str):
     return list(zip(file_names, file_paths))
 
 
-def ingest_to_db(api_key, page_unit=100, max_pages=None):
-    session = build_session()
+NOTICE_COLUMNS = (
+    "seq", "title", "link", "author", "exc_instt_nm",
+    "description", "pub_date", "reqst_dt", "trget_nm",
+)
+
+
+def notice_files_of(notice):
+    """본문파일 + 첨부파일 [(파일명, 경로), ...]"""
+    print_files = parse_files(safe(notice.get("print_file_nm")), safe(notice.get("print_flpth_nm")))
+    attach_files = parse_files(safe(notice.get("file_nm")), safe(notice.get("flpth_nm")))
+    return print_files + attach_files
+
+
+def print_notice_debug(notice, files, hashtags):
+    # verbose=True 일 때만 공고별 상세 로그
+    print(f"\n{'='*60}")
+    print(f"🔍 공고 seq={notice['seq']} 파일 정보")
+    print(f"{'='*60}")
+    print(f"📌 제목: {safe(notice.get('title'))[:50]}...")
+    print(f"📄 본문파일명: [{safe(notice.get('print_file_nm'))}]")
+    print(f"📂 본문경로: [{safe(notice.get('print_flpth_nm'))}]")
+    print(f"📎 첨부파일명: [{safe(notice.get('file_nm'))}]")
+    print(f"📂 첨부경로: [{safe(notice.get('flpth_nm'))}]")
+    print(f"✅ 총 파일: {len(files)}개")
+    for i, (fname, _) in enumerate(files, 1):
+        print(f"   파일 {i}: {fname}")
+    print(f"🏷️  원본 해시태그: [{safe(notice.get('hash_tags'))}]")
+    print(f"✅ 파싱된 해시태그: {len(hashtags)}개 {hashtags}")
+    print(f"{'='*60}\n")
+
+
+def find_existing_seqs(cursor, seqs):
+    """이미 적재된 seq 집합 (페이지당 IN 쿼리 1회)"""
+    if not seqs:
+        return set()
+    placeholders = ",".join(["%s"] * len(seqs))
+    cursor.execute(f"SELECT seq FROM project_notices WHERE seq IN ({placeholders})", list(seqs))
+    return {str(row[0]) for row in cursor.fetchall()}
+
+
+def insert_notices_bulk(cursor, notices):
+    """
+    한 페이지의 신규 공고를 일괄 INSERT 하고 {seq: notice_id} 반환
+
+    multi-row INSERT 의 AUTO_INCREMENT 값이 연속이라는 보장이 없으므로
+    (innodb_autoinc_lock_mode=2) lastrowid 로 계산하지 않고 seq 로 다시 조회한다.
+    """
+    if not notices:
+        return {}
+
+    cursor.executemany(
+        f"""
+        INSERT INTO project_notices ({", ".join(NOTICE_COLUMNS)})
+        VALUES ({", ".join(["%s"] * len(NOTICE_COLUMNS))})
+        """,
+        [tuple(safe(n.get(col)) for col in NOTICE_COLUMNS) for n in notices],
+    )
+
+    seqs = [n["seq"] for n in notices]
+    placeholders = ",".join(["%s"] * len(seqs))
+    cursor.execute(f"SELECT seq, notice_id FROM project_notices WHERE seq IN ({placeholders})", seqs)
+    return {str(seq): notice_id for seq, notice_id in cursor.fetchall()}
+
+
+def ingest_page_bulk(cursor, rows, seen_seq, verbose=False):
+    """
+    RSS 한 페이지 적재: 존재 확인 1회 + 공고/파일/해시태그 각각 executemany 1회
+    (pymysql 의 executemany 는 INSERT ... VALUES 를 multi-row INSERT 로 묶어 보낸다)
+    """
+    page_rows = []
+    for notice in rows:
+        seq = notice["seq"]
+        if seq in seen_seq:
+            continue
+        seen_seq.add(seq)
+        page_rows.append(notice)
+
+    existing = find_existing_seqs(cursor, [n["seq"] for n in page_rows])
+    new_rows = [n for n in page_rows if n["seq"] not in existing]
+    id_by_seq = insert_notices_bulk(cursor, new_rows)
+
+    file_params = []
+    tag_params = []
+    for notice in new_rows:
+        notice_id = id_by_seq[notice["seq"]]
+        files = notice_files_of(notice)
+        hashtags = parse_hashtags(safe(notice.get("hash_tags")))
+        if verbose:
+            print_notice_debug(notice, files, hashtags)
+        file_params.extend((notice_id, file_name, file_path) for file_name, file_path in files)
+        tag_params.extend((notice_id, tag) for tag in hashtags)
+
+    if file_params:
+        cursor.executemany(
+            """
+            INSERT INTO notice_files (
+                notice_id, print_file_nm, print_flpth_nm
+            )
+            VALUES (%s, %s, %s)
+            """,
+            file_params,
+        )
+    if tag_params:
+        cursor.executemany(
+            """
+            INSERT INTO notice_hashtags (
+                notice_id, tag_name
+            )
+            VALUES (%s, %s)
+            """,
+            tag_params,
+        )
+
+    return {
+        "new": len(new_rows),
+        "existing": len(existing),
+        "duplicates": len(rows) - len(page_rows),
+        "files": len(file_params),
+        "hashtags": len(tag_params),
+    }
+
+
+def ingest_to_db(api_key, page_unit=100, max_pages=None, verbose=False, fetch_workers=BIZINFO_FETCH_WORKERS):
+    """
+    bizinfo RSS → project_notices / notice_files / notice_hashtags
+
+    페이지 단위로 한 트랜잭션 (페이지 적재 중 오류가 나면 그 페이지만 rollback 후 중단).
+    진행 상황은 페이지당 한 줄로 출력한다. verbose=True 면 공고별 상세 로그도 출력.
+    RSS 는 1페이지 이후 fetch_workers 개 스레드로 동시에 받아온다.
+    적재·커밋 순서는 페이지 번호 순이 아니라 받아오기가 끝난 순서다 (1페이지만 항상 먼저).
+    중간에 실패하면 그보다 뒤 번호 페이지가 이미 커밋돼 있을 수 있다 (seq 기준 중복은 건너뛰므로 재실행하면 된다).
+    """
+    session = build_session(pool_size=max(1, fetch_workers))
     conn = pymysql.connect(**DB_CONFIG)
 
+    started = time.perf_counter()
+    totals = {"pages": 0, "raw": 0, "tech": 0, "new": 0, "existing": 0, "duplicates": 0, "files": 0, "hashtags": 0}
+    db_sec = 0.0
+
     try:
-        with conn.cursor() as cursor:
-            page = 1
+        # DB_CONFIG 의 cursorclass 와 무관하게 tuple 커서 사용 (seq 매핑에서 row[0] 접근)
+        with conn.cursor(pymysql.cursors.Cursor) as cursor:
             tot_cnt_seen = None
-            inserted = 0
             seen_seq = set()
 
-            while True:
-                raw_count, tot_cnt, rows = fetch_page(
-                    session,
-                    api_key=api_key,
-                    page_index=page,
-                    page_unit=page_unit,
-                )
-
+            for page, raw_count, tot_cnt, rows in iter_rss_pages(
+                session,
+                BASE_URL,
+                api_key,
+                page_unit=page_unit,
+                max_pages=max_pages,
+                workers=fetch_workers,
+            ):
                 if tot_cnt_seen is None and tot_cnt is not None:
                     tot_cnt_seen = tot_cnt
 
+                db_started = time.perf_counter()
+                try:
+                    stats = ingest_page_bulk(cursor, rows, seen_seq, verbose=verbose)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                page_db_sec = time.perf_counter() - db_started
+                db_sec += page_db_sec
+
+                totals["pages"] += 1
+                totals["raw"] += raw_count
+                totals["tech"] += len(rows)
+                for key in ("new", "existing", "duplicates", "files", "hashtags"):
+                    totals[key] += stats[key]
+
                 print(
-                    f"page={page} raw_items={raw_count} "
-                    f"tech_items={len(rows)} totCnt={tot_cnt_seen}"
+                    f"page={page} raw_items={raw_count} tech_items={len(rows)} "
+                    f"new={stats['new']} existing={stats['existing']} files={stats['files']} "
+                    f"hashtags={stats['hashtags']} db={page_db_sec * 1000:.0f}ms totCnt={tot_cnt_seen}"
                 )
 
-                if raw_count == 0:
-                    break
-
-                for notice in rows:
-                    seq = notice["seq"]
-                    if seq in seen_seq:
-                        continue
-                    seen_seq.add(seq)
-
-                    cursor.execute(
-                        "SELECT 1 FROM project_notices WHERE seq = %s",
-                        (seq,),
-                    )
-                    if cursor.fetchone():
-                        continue
-
-                    # ✅ 1. project_notices 테이블에 기본 정보만 INSERT
-                    sql = """
-                        INSERT INTO project_notices (
-                            seq, title, link, author, exc_instt_nm,
-                            description, pub_date, reqst_dt, trget_nm
-                        )
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """
-
-                    cursor.execute(
-                        sql,
-                        (
-                            safe(seq),
-                            safe(notice.get("title")),
-                            safe(notice.get("link")),
-                            safe(notice.get("author")),
-                            safe(notice.get("exc_instt_nm")),
-                            safe(notice.get("description")),
-                            safe(notice.get("pub_date")),
-                            safe(notice.get("reqst_dt")),
-                            safe(notice.get("trget_nm")),
-                        ),
-                    )
-
-                    notice_id = cursor.lastrowid
-
-                    # ✅ 2. notice_files 테이블에 파일 정보 INSERT
-                    print_file_nm_str = safe(notice.get("print_file_nm"))
-                    print_flpth_nm_str = safe(notice.get("print_flpth_nm"))
-                    file_nm_str = safe(notice.get("file_nm"))
-                    flpth_nm_str = safe(notice.get("flpth_nm"))
-
-                    # 🔥 디버깅 로그
-                    print(f"\n{'='*60}")
-                    print(f"🔍 공고 seq={seq} 파일 정보")
-                    print(f"{'='*60}")
-                    print(f"📌 제목: {notice.get('title')[:50]}...")
-                    print(f"📄 본문파일명: [{print_file_nm_str}]")
-                    print(f"📂 본문경로: [{print_flpth_nm_str}]")
-                    print(f"📎 첨부파일명: [{file_nm_str}]")
-                    print(f"📂 첨부경로: [{flpth_nm_str}]")
-
-                    print_files = parse_files(print_file_nm_str, print_flpth_nm_str)
-                    attach_files = parse_files(file_nm_str, flpth_nm_str)
-                    all_files = print_files + attach_files
-
-                    print(f"✅ 본문파일: {len(print_files)}개")
-                    print(f"✅ 첨부파일: {len(attach_files)}개")
-                    print(f"✅ 총 파일: {len(all_files)}개")
-                    
-                    if all_files:
-                        for i, (fname, fpath) in enumerate(all_files, 1):
-                            print(f"   파일 {i}: {fname}")
-                    else:
-                        print(f"   ⚠️ 파일 없음")
-                    
-                    for file_name, file_path in all_files:
-                        sql_file = """
-                            INSERT INTO notice_files (
-                                notice_id, print_file_nm, print_flpth_nm
-                            )
-                            VALUES (%s, %s, %s)
-                        """
-                        cursor.execute(sql_file, (notice_id, file_name, file_path))
-
-                    # ✅ 3. notice_hashtags 테이블에 해시태그 INSERT
-                    hash_tags_str = safe(notice.get("hash_tags"))
-                    
-                    # 🔥 해시태그 디버깅 로그 추가
-                    print(f"🏷️  원본 해시태그: [{hash_tags_str}]")
-                    
-                    hashtags = parse_hashtags(hash_tags_str)
-                    
-                    print(f"✅ 파싱된 해시태그: {len(hashtags)}개")
-                    if hashtags:
-                        for i, tag in enumerate(hashtags, 1):
-                            print(f"   태그 {i}: {tag}")
-                    else:
-                        print(f"   ⚠️ 해시태그 없음")
-                    print(f"{'='*60}\n")
-
-                    for tag in hashtags:
-                        if tag:
-                            sql_hashtag = """
-                                INSERT INTO notice_hashtags (
-                                    notice_id, tag_name
-                                )
-                                VALUES (%s, %s)
-                            """
-                            cursor.execute(sql_hashtag, (notice_id, tag))
-
-                    inserted += 1
-
-                conn.commit()
-
-                if max_pages is not None and page >= max_pages:
-                    break
-                if tot_cnt_seen is not None and page * page_unit >= tot_cnt_seen:
-                    break
-
-                page += 1
-
-            print(f"\nDB에 새로 적재된 기술 공고: {inserted}건")
-            return inserted
+            totals["db_sec"] = round(db_sec, 3)
+            totals["elapsed_sec"] = round(time.perf_counter() - started, 3)
+            print(f"\nDB에 새로 적재된 기술 공고: {totals['new']}건")
+            print("ingest_summary " + " ".join(f"{k}={v}" for k, v in totals.items()))
+            return totals["new"]
 
     finally:
         conn.close()
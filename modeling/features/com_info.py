@@ -294,7 +294,6 @@ import sys
 import json
 from pathlib import Path
 from dotenv import load_dotenv
-import mysql.connector
 from datetime import datetime
 
 # ---------------------------------------------------------
@@ -305,6 +304,7 @@ project_root = os.path.dirname(current_dir)                # .../modeling (루
 sys.path.append(project_root)
 
 # 파싱 모듈 import
+from utils.db_pool import get_connection
 from utils.document_parsing import extract_text_from_pdf
 from utils.section import SectionSplitter
 
@@ -315,14 +315,8 @@ load_dotenv()
 # DB 연결
 # =========================================================
 def get_db_conn():
-    """MySQL 커넥션 생성"""
-    return mysql.connector.connect(
-        host=os.environ["DB_HOST"],
-        port=int(os.environ.get("DB_PORT", "3306")),
-        user=os.environ["DB_USER"],
-        password=os.environ["DB_PASSWORD"],
-        database=os.environ["DB_NAME"],
-    )
+    """MySQL 커넥션 (공용 커넥션 풀에서 빌림, close() 시 반납)"""
+    return get_connection()
 
 # =========================================================
 # 1단계: PDF 파싱
@@ -4,16 +4,22 @@ import argparse
 import json
 import os
 import re
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
 from langgraph.graph import END, START, StateGraph
 
 from features.ppt_maker.nodes_code.extract_text_node import extract_text as extract_text_node
-from features.ppt_maker.nodes_code.gamma_generation_node import gamma_generation_node
+from features.ppt_maker.nodes_code.gamma_generation_node import (
+    apply_gamma_result,
+    gamma_generation_node,
+    submit_gamma_generation,
+)
 from features.ppt_maker.nodes_code.merge_deck_node import merge_deck_node
 from features.ppt_maker.nodes_code.postprocess_diagrams import postprocess_diagrams_node
+from features.ppt_maker.nodes_code.run_trace import finish_run_trace, start_run_trace, trace_future_node, traced_node
 from features.ppt_maker.nodes_code.section_deck_generation_node import section_deck_generation_node
 from features.ppt_maker.nodes_code.section_split_node import section_split_node
 from features.ppt_maker.nodes_code.state import GraphState
@@ -189,11 +195,23 @@ def _save_deck_checkpoint(deck: Dict[str, Any], output_dir: str) -> str:
     return path
 
 
-def build_graph(*, skip_to_gamma: bool = False, prepare_only: bool = False, render_mode: str = "gamma"):
+def build_graph(
+    *,
+    skip_to_gamma: bool = False,
+    prepare_only: bool = False,
+    render_mode: str = "gamma",
+    postprocess_only: bool = False,
+):
     workflow = StateGraph(GraphState)
-    workflow.add_node("make_pptx", gamma_generation_node)
-    workflow.add_node("make_template_pptx", template_render_node)
-    workflow.add_node("postprocess", postprocess_diagrams_node)
+    workflow.add_node("make_pptx", traced_node("make_pptx", gamma_generation_node))
+    workflow.add_node("make_template_pptx", traced_node("make_template_pptx", template_render_node))
+    workflow.add_node("postprocess", traced_node("postprocess", postprocess_diagrams_node))
+
+    if postprocess_only:
+        # Gamma 렌더를 스케줄러 future 로 따로 기다린 뒤 후처리만 이어서 실행 (begin_ppt_generation)
+        workflow.add_edge(START, "postprocess")
+        workflow.add_edge("postprocess", END)
+        return workflow.compile()
 
     if skip_to_gamma:
         start_node = "make_template_pptx" if render_mode == "template" else "make_pptx"
@@ -202,10 +220,10 @@ def build_graph(*, skip_to_gamma: bool = False, prepare_only: bool = False, rend
         workflow.add_edge("postprocess", END)
         return workflow.compile()
 
-    workflow.add_node("extract_text", extract_text_node)
-    workflow.add_node("split_sections", section_split_node)
-    workflow.add_node("make_sections", section_deck_generation_node)
-    workflow.add_node("merge_deck", merge_deck_node)
+    workflow.add_node("extract_text", traced_node("extract_text", extract_text_node))
+    workflow.add_node("split_sections", traced_node("split_sections", section_split_node))
+    workflow.add_node("make_sections", traced_node("make_sections", section_deck_generation_node))
+    workflow.add_node("merge_deck", traced_node("merge_deck", merge_deck_node))
 
     workflow.add_edge(START, "extract_text")
     workflow.add_edge("extract_text", "split_sections")
@@ -222,7 +240,87 @@ def build_graph(*, skip_to_gamma: bool = False, prepare_only: bool = False, rend
     return workflow.compile()
 
 
-def run_ppt_generation(
+def _report_success(trace: Any, final_state: Dict[str, Any], *, prepare_only: bool, output_dir: str) -> Dict[str, Any]:
+    trace_path = finish_run_trace(trace, final_state)
+    if trace_path:
+        final_state["trace_path"] = trace_path
+    print("\n" + "=" * 80)
+    print("PPT 생성 완료")
+    print("=" * 80)
+
+    if final_state.get("final_ppt_path"):
+        print(f"저장 경로: {final_state['final_ppt_path']}")
+    else:
+        print("최종 PPT 경로가 비어있습니다. 렌더 단계 실패 가능성이 있습니다.")
+
+    deck = final_state.get("deck_json") or {}
+    slides = deck.get("slides") or []
+    if prepare_only and deck:
+        _save_deck_checkpoint(deck, output_dir or "output")
+    print(f"\n슬라이드 수: {len(slides)}")
+    if slides:
+        print("슬라이드 미리보기 (앞 5개):")
+        for i, s in enumerate(slides[:5], 1):
+            title = s.get("slide_title") or s.get("title") or "(no title)"
+            section = s.get("section") or "(no section)"
+            img = s.get("image_needed")
+            print(f"  [{i}] [{section}] {title} (image_needed={img})")
+
+    return final_state
+
+
+def _report_failure(trace: Any, e: BaseException) -> None:
+    finish_run_trace(trace, error=f"{type(e).__name__}: {e}")
+    print(f"\n오류 발생: {e}")
+    import traceback
+
+    traceback.print_exception(type(e), e, e.__traceback__)
+    return None
+
+
+class PendingPptGeneration:
+    """
+    begin_ppt_generation 결과.
+
+    - gamma_future 가 None 이면 그래프가 이미 끝났고 finish() 는 최종 state(실패 시 None)를 돌려준다
+    - gamma_future 가 있으면 Gamma 생성/다운로드가 스케줄러 루프에서 진행 중.
+      future 가 끝난 뒤 finish() 를 부르면 저장 경로를 state 에 넣고 postprocess 를 실행해 마무리한다
+      (끝나기 전에 부르면 완료까지 기다린다)
+    """
+
+    def __init__(
+        self,
+        trace: Any,
+        state: Optional[Dict[str, Any]],
+        *,
+        prepare_only: bool = False,
+        output_dir: str = "",
+        gamma_future: Optional[Future] = None,
+        gamma_out_path: str = "",
+        error: Optional[BaseException] = None,
+    ):
+        self.trace = trace
+        self.state = state
+        self.prepare_only = prepare_only
+        self.output_dir = output_dir
+        self.gamma_future = gamma_future
+        self.gamma_out_path = gamma_out_path
+        self.error = error
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        if self.error is not None:
+            return _report_failure(self.trace, self.error)
+        state = self.state
+        if self.gamma_future is not None:
+            try:
+                self.gamma_future.result()
+                state = build_graph(postprocess_only=True).invoke(apply_gamma_result(state, self.gamma_out_path))
+            except Exception as e:
+                return _report_failure(self.trace, e)
+        return _report_success(self.trace, state, prepare_only=self.prepare_only, output_dir=self.output_dir)
+
+
+def begin_ppt_generation(
     *,
     source_path: str = "",
     rfp_text: str = "",
@@ -236,7 +334,13 @@ def run_ppt_generation(
     checkpoint_path: str = "",
     prepare_only: bool = False,
     render_mode: str = "gamma",
-):
+    park_gamma: bool = False,
+) -> PendingPptGeneration:
+    """
+    park_gamma=True 이고 Gamma 렌더면 Extract -> Merge 까지만 실행하고 Gamma 생성은 스케줄러 루프에 넘긴 채 돌아온다
+    (작업 큐가 future 완료 시 finish() 를 이어서 호출 → 워커 스레드를 Gamma 대기에 묶어두지 않음).
+    그 외에는 전체 그래프를 실행한 뒤 돌아온다.
+    """
     print("=" * 80)
     print("PPT 자동 생성 시작 (Extract -> Split -> Gemini -> Merge -> Render)")
     print("=" * 80)
@@ -266,7 +370,8 @@ def run_ppt_generation(
     elif BACKGROUND_PROFILE == "basic":
         effective_gamma_theme = os.environ.get("BASIC_GAMMA_THEME_ID") or effective_gamma_theme
 
-    app = build_graph(skip_to_gamma=skip_to_gamma, prepare_only=prepare_only, render_mode=render_mode)
+    park = park_gamma and render_mode == "gamma" and not prepare_only
+    app = None if park else build_graph(skip_to_gamma=skip_to_gamma, prepare_only=prepare_only, render_mode=render_mode)
 
     initial_state: Dict[str, Any] = {
         "source_path": source_path,
@@ -317,37 +422,60 @@ def run_ppt_generation(
             initial_state["source_path"] = ""
         print(f"[System] checkpoint loaded, skip to render: {checkpoint_path}")
 
-    try:
-        final_state = app.invoke(initial_state)
-        print("\n" + "=" * 80)
-        print("PPT 생성 완료")
-        print("=" * 80)
+    trace = start_run_trace(
+        output_dir or "output",
+        render_mode=render_mode,
+        notice_id=effective_notice_id,
+        source_path=source_path,
+        skip_to_render=skip_to_gamma,
+        prepare_only=prepare_only,
+    )
+    if trace is not None:
+        initial_state["trace_id"] = trace.run_id
 
-        if final_state.get("final_ppt_path"):
-            print(f"저장 경로: {final_state['final_ppt_path']}")
-        else:
-            print("최종 PPT 경로가 비어있습니다. 렌더 단계 실패 가능성이 있습니다.")
-
-        deck = final_state.get("deck_json") or {}
-        slides = deck.get("slides") or []
-        if prepare_only and deck:
-            _save_deck_checkpoint(deck, output_dir or "output")
-        print(f"\n슬라이드 수: {len(slides)}")
-        if slides:
-            print("슬라이드 미리보기 (앞 5개):")
-            for i, s in enumerate(slides[:5], 1):
-                title = s.get("slide_title") or s.get("title") or "(no title)"
-                section = s.get("section") or "(no section)"
-                img = s.get("image_needed")
-                print(f"  [{i}] [{section}] {title} (image_needed={img})")
-
-        return final_state
+    try:
+        if app is not None:
+            final_state = app.invoke(initial_state)
+            return PendingPptGeneration(trace, final_state, prepare_only=prepare_only, output_dir=output_dir)
+
+        # Extract -> Merge 까지만 이 스레드에서 실행하고, Gamma 생성/다운로드는 스케줄러 루프에 넘긴다
+        state = initial_state if skip_to_gamma else build_graph(prepare_only=True).invoke(initial_state)
+        gamma_future, out_path = submit_gamma_generation(state)
+        trace_future_node(state, "make_pptx", gamma_future)
+        return PendingPptGeneration(trace, state, output_dir=output_dir, gamma_future=gamma_future, gamma_out_path=out_path)
     except Exception as e:
-        print(f"\n오류 발생: {e}")
-        import traceback
+        return PendingPptGeneration(trace, None, error=e)
+
 
-        traceback.print_exc()
-        return None
+def run_ppt_generation(
+    *,
+    source_path: str = "",
+    rfp_text: str = "",
+    notice_id: str = "",
+    output_dir: str = "",
+    output_filename: str = "",
+    gemini_model: str = "",
+    gamma_theme: str = "cx5kqp1h6rwpfkj",
+    gamma_timeout_sec: int = 1800,
+    font_name: str = "",
+    checkpoint_path: str = "",
+    prepare_only: bool = False,
+    render_mode: str = "gamma",
+):
+    return begin_ppt_generation(
+        source_path=source_path,
+        rfp_text=rfp_text,
+        notice_id=notice_id,
+        output_dir=output_dir,
+        output_filename=output_filename,
+        gemini_model=gemini_model,
+        gamma_theme=gamma_theme,
+        gamma_timeout_sec=gamma_timeout_sec,
+        font_name=font_name,
+        checkpoint_path=checkpoint_path,
+        prepare_only=prepare_only,
+        render_mode=render_mode,
+    ).finish()
 
 
 def main():
@@ -0,0 +1,261 @@
+"""
+Gamma API 비동기 클라이언트 + 공용 폴링 스케줄러.
+
+- HTTP 는 httpx.AsyncClient 하나를 공유 (keep-alive 커넥션 재사용)
+- 생성 상태 폴링은 지수 증가 + jitter 간격 (GAMMA_POLL_INITIAL_SEC → GAMMA_POLL_MAX_SEC)
+- 완료 직후 export URL 이 늦게 붙는 경우도 같은 폴링 루프에서 최대 GAMMA_EXPORT_URL_WAIT_SEC 동안 기다린다
+- 다운로드는 스트리밍으로 임시 파일에 쓴 뒤 교체
+
+GammaScheduler 는 프로세스당 이벤트 루프 스레드 1개를 띄우고, 그 프로세스의 Step 3 작업들의
+생성/폴링/다운로드 코루틴을 그 루프에서 함께 돌린다. 공유되는 것은 HTTP 커넥션 풀과 폴링 타이머뿐이다.
+  - submit() 은 코루틴을 넘기고 바로 concurrent.futures.Future 를 돌려준다. Step 3 작업 큐(thread 실행)는
+    이 future 에 작업을 걸어 두고 워커를 반납한다 (utils/job_queue.Parked). Gamma 를 기다리는 동안
+    잡고 있는 스레드는 이 루프 스레드 하나뿐이다
+  - wait() 은 submit() 한 future 를 기다리는 동기 호출용 (LangGraph make_pptx 노드, 동기 엔드포인트)
+  - JOB_STEP3_EXECUTOR=process 면 워커 프로세스마다 스케줄러가 따로 생기고 wait() 으로 블록된다
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+import httpx
+
+# 벤치마크 스텁(benchmarks/ai_stub.py) 등으로 바꿀 때만 설정
+GAMMA_API_BASE = os.environ.get("GAMMA_API_BASE", "https://public-api.gamma.app/v1.0").rstrip("/")
+
+GAMMA_POLL_INITIAL_SEC = float(os.environ.get("GAMMA_POLL_INITIAL_SEC", "2"))
+GAMMA_POLL_MAX_SEC = float(os.environ.get("GAMMA_POLL_MAX_SEC", "15"))
+GAMMA_POLL_JITTER = float(os.environ.get("GAMMA_POLL_JITTER", "0.2"))
+GAMMA_EXPORT_URL_WAIT_SEC = float(os.environ.get("GAMMA_EXPORT_URL_WAIT_SEC", "45"))
+GAMMA_HTTP_MAX_CONNECTIONS = int(os.environ.get("GAMMA_HTTP_MAX_CONNECTIONS", "20"))
+
+COMPLETED_STATUSES = {"completed", "complete", "succeeded", "success"}
+FAILED_STATUSES = {"failed", "error"}
+
+T = TypeVar("T")
+
+
+def extract_export_url(d: Dict[str, Any]) -> str:
+    return (
+        d.get("exportUrl")
+        or d.get("pptxUrl")
+        or (d.get("exports") or {}).get("pptx")
+        or ""
+    )
+
+
+def poll_delays(
+    initial_sec: float = GAMMA_POLL_INITIAL_SEC,
+    max_sec: float = GAMMA_POLL_MAX_SEC,
+    jitter: float = GAMMA_POLL_JITTER,
+):
+    """initial, initial×1.5, ... (max_sec 상한) 에 ±jitter 비율을 곱한 대기 시간을 끝없이 yield"""
+    delay = max(0.1, initial_sec)
+    while True:
+        yield delay * random.uniform(1 - jitter, 1 + jitter)
+        delay = min(delay * 1.5, max_sec)
+
+
+# =========================================================
+# 클라이언트 (요청 단위, HTTP 세션은 스케줄러 공유)
+# =========================================================
+class GammaClient:
+    def __init__(self, api_key: str, http: httpx.AsyncClient, stats: Optional[Dict[str, int]] = None):
+        self.api_key = api_key
+        self.http = http
+        self.stats = stats if stats is not None else {}
+
+    def _headers(self) -> Dict[str, str]:
+        return {"X-API-KEY": self.api_key, "Content-Type": "application/json"}
+
+    def _count(self, key: str) -> None:
+        self.stats[key] = self.stats.get(key, 0) + 1
+
+    async def list_themes(self, *, query: str = "", limit: int = 50, max_pages: int = 5) -> List[Dict[str, Any]]:
+        themes: List[Dict[str, Any]] = []
+        after = ""
+        for _ in range(max_pages):
+            params: Dict[str, Any] = {"limit": int(limit)}
+            if query:
+                params["query"] = query
+            if after:
+                params["after"] = after
+            r = await self.http.get(f"{GAMMA_API_BASE}/themes", headers=self._headers(), params=params, timeout=60)
+            if r.status_code != 200:
+                raise RuntimeError(f"Gamma themes API error {r.status_code}: {r.text}")
+            payload = r.json() or {}
+            data = payload.get("data") or []
+            if isinstance(data, list):
+                themes.extend([x for x in data if isinstance(x, dict)])
+            if not payload.get("hasMore"):
+                break
+            after = str(payload.get("nextCursor") or "").strip()
+            if not after:
+                break
+        return themes
+
+    async def start_generation(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        r = await self.http.post(f"{GAMMA_API_BASE}/generations", headers=self._headers(), json=payload, timeout=60)
+        self._count("started")
+        if r.status_code not in (200, 201):
+            raise RuntimeError(f"Gamma API error {r.status_code}: {r.text}")
+        return r.json()
+
+    async def get_generation(self, generation_id: str) -> Dict[str, Any]:
+        r = await self.http.get(f"{GAMMA_API_BASE}/generations/{generation_id}", headers=self._headers(), timeout=60)
+        self._count("polls")
+        r.raise_for_status()
+        return r.json()
+
+    async def wait_for_generation(
+        self,
+        generation_id: str,
+        *,
+        timeout_sec: float,
+        export_url_wait_sec: float = GAMMA_EXPORT_URL_WAIT_SEC,
+    ) -> Dict[str, Any]:
+        """완료될 때까지 폴링. 완료 후 export URL 이 없으면 export_url_wait_sec 동안 더 기다린다"""
+        t0 = time.monotonic()
+        completed_at: Optional[float] = None
+        last: Dict[str, Any] = {}
+        delays = poll_delays()
+        while True:
+            last = await self.get_generation(generation_id)
+            status = (last.get("status") or "").lower()
+            if status in FAILED_STATUSES:
+                raise RuntimeError(f"Gamma generation failed: {last}")
+            if status in COMPLETED_STATUSES:
+                if extract_export_url(last):
+                    return last
+                if completed_at is None:
+                    completed_at = time.monotonic()
+                    delays = poll_delays(initial_sec=2.5, max_sec=5.0)
+                elif time.monotonic() - completed_at >= export_url_wait_sec:
+                    return last  # URL 없음 판단은 호출자에게
+            elif time.monotonic() - t0 >= timeout_sec:
+                raise TimeoutError(f"Gamma generation polling timeout ({timeout_sec}s). last={last}")
+            await asyncio.sleep(next(delays))
+
+    async def download(self, url: str, out_path: str, chunk_size: int = 1024 * 1024) -> int:
+        """스트리밍 다운로드 (임시 파일 → 교체). 받은 바이트 수 반환"""
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        tmp_path = f"{out_path}.part"
+        size = 0
+        try:
+            async with self.http.stream("GET", url, timeout=300, follow_redirects=True) as r:
+                r.raise_for_status()
+                # 파일 쓰기는 스레드로 (공유 루프에서 디스크 I/O 로 다른 작업의 폴링을 막지 않도록)
+                f = await asyncio.to_thread(open, tmp_path, "wb")
+                try:
+                    async for chunk in r.aiter_bytes(chunk_size):
+                        if chunk:
+                            await asyncio.to_thread(f.write, chunk)
+                            size += len(chunk)
+                finally:
+                    await asyncio.to_thread(f.close)
+            os.replace(tmp_path, out_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._count("downloads")
+        return size
+
+
+# =========================================================
+# 공용 스케줄러 (이벤트 루프 스레드 1개)
+# =========================================================
+class GammaScheduler:
+    def __init__(self, max_connections: int = GAMMA_HTTP_MAX_CONNECTIONS):
+        self.max_connections = max_connections
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {"jobs": 0, "failed": 0}
+        self._thread = threading.Thread(target=self._run_loop, name="gamma-scheduler", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        self._http = httpx.AsyncClient(limits=limits, timeout=60)
+        self._ready.set()
+        self._loop.run_forever()
+
+    def client(self, api_key: str) -> GammaClient:
+        return GammaClient(api_key, self._http, self.counters)
+
+    async def _tracked(self, coro: Awaitable[T]) -> T:
+        try:
+            return await coro
+        except BaseException:
+            self.counters["failed"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def submit(self, make_coro: Callable[[GammaClient], Awaitable[T]], api_key: str) -> "concurrent.futures.Future[T]":
+        """make_coro(client) 를 스케줄러 루프에 넘기고 바로 future 를 돌려준다 (호출 스레드를 잡지 않음)"""
+        with self._lock:
+            self._in_flight += 1
+            self.counters["jobs"] += 1
+        return asyncio.run_coroutine_threadsafe(self._tracked(make_coro(self.client(api_key))), self._loop)
+
+    def wait(self, future: "concurrent.futures.Future[T]") -> T:
+        """submit() 결과를 기다린다 (동기 호출자용). 기다리다 중단되면 코루틴도 취소"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("GammaScheduler.wait() 은 스케줄러 루프 안에서 호출할 수 없습니다.")
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"in_flight": self._in_flight, "max_connections": self.max_connections, **self.counters}
+
+    def close(self) -> None:
+        async def _shutdown() -> None:
+            if self._http is not None:
+                await self._http.aclose()
+
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(_shutdown(), self._loop).result(timeout=10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+
+
+_scheduler: Optional[GammaScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_gamma_scheduler() -> GammaScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = GammaScheduler()
+        return _scheduler
+
+
+def gamma_scheduler_stats() -> Dict[str, Any]:
+    # 아직 Gamma 를 한 번도 쓰지 않았으면 루프를 만들지 않는다
+    return _scheduler.stats() if _scheduler is not None else {"in_flight": 0, "jobs": 0}
+
+
+def close_gamma_scheduler() -> None:
+    global _scheduler
+    with _scheduler_lock:
+        scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        scheduler.close()
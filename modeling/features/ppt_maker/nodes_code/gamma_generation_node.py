@@ -2,16 +2,17 @@
 
 import os
 import re
+import threading
 import time
 import json
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
-import requests
+from .gamma_client import GammaClient, extract_export_url, get_gamma_scheduler
 
 
-GAMMA_API_BASE = "https://public-api.gamma.app/v1.0"
 def _save_checkpoint(state: dict) -> str:
     outdir = Path("output") / "checkpoints"
     outdir.mkdir(parents=True, exist_ok=True)
@@ -124,46 +125,7 @@ ABSOLUTE RULES:
     return header + "\n\n" + body
 
 
-def _gamma_headers(api_key: str) -> Dict[str, str]:
-    return {"X-API-KEY": api_key, "Content-Type": "application/json"}
-
-
-def _list_themes(
-    api_key: str,
-    *,
-    query: str = "",
-    limit: int = 50,
-    max_pages: int = 5,
-) -> List[Dict[str, Any]]:
-    themes: List[Dict[str, Any]] = []
-    after = ""
-    for _ in range(max_pages):
-        params: Dict[str, Any] = {"limit": int(limit)}
-        if query:
-            params["query"] = query
-        if after:
-            params["after"] = after
-        r = requests.get(
-            f"{GAMMA_API_BASE}/themes",
-            headers=_gamma_headers(api_key),
-            params=params,
-            timeout=60,
-        )
-        if r.status_code != 200:
-            raise RuntimeError(f"Gamma themes API error {r.status_code}: {r.text}")
-        payload = r.json() or {}
-        data = payload.get("data") or []
-        if isinstance(data, list):
-            themes.extend([x for x in data if isinstance(x, dict)])
-        if not payload.get("hasMore"):
-            break
-        after = str(payload.get("nextCursor") or "").strip()
-        if not after:
-            break
-    return themes
-
-
-def _resolve_theme_id(api_key: str, theme_input: Optional[str]) -> Optional[str]:
+async def _resolve_theme_id(client: GammaClient, theme_input: Optional[str]) -> Optional[str]:
     raw = str(theme_input or "").strip()
     if not raw:
         return None
@@ -171,7 +133,7 @@ def _resolve_theme_id(api_key: str, theme_input: Optional[str]) -> Optional[str]
     if re.fullmatch(r"[A-Za-z0-9_-]{8,}", raw):
         return raw
 
-    themes = _list_themes(api_key, query=raw, limit=50, max_pages=5)
+    themes = await client.list_themes(query=raw, limit=50, max_pages=5)
     if not themes:
         return None
 
@@ -181,8 +143,7 @@ def _resolve_theme_id(api_key: str, theme_input: Optional[str]) -> Optional[str]
     return str((themes[0] or {}).get("id") or "").strip() or None
 
 
-def _start_generation(
-    api_key: str,
+def _generation_payload(
     *,
     input_text: str,
     theme_id: Optional[str],
@@ -256,53 +217,74 @@ def _start_generation(
     if theme_id:
         payload["themeId"] = theme_id
 
-    url = f"{GAMMA_API_BASE}/generations"
-    r = requests.post(url, headers=_gamma_headers(api_key), json=payload, timeout=60)
-    if r.status_code not in (200, 201):
-        raise RuntimeError(f"Gamma API error {r.status_code}: {r.text}")
-    return r.json()
+    return payload
 
 
-def _poll_generation(api_key: str, generation_id: str, *, timeout_sec: int) -> Dict[str, Any]:
-    t0 = time.time()
-    last: Dict[str, Any] = {}
-    while time.time() - t0 < timeout_sec:
-        r = requests.get(f"{GAMMA_API_BASE}/generations/{generation_id}", headers=_gamma_headers(api_key), timeout=60)
-        r.raise_for_status()
-        last = r.json()
+async def _run_gamma(
+    client: GammaClient,
+    *,
+    input_text: str,
+    theme_input: Optional[str],
+    num_cards: int,
+    timeout_sec: int,
+    out_path: str,
+) -> Dict[str, Any]:
+    """테마 확인 → 생성 요청 → 완료 폴링(+export URL 대기) → 스트리밍 다운로드 (스케줄러 루프에서 실행)"""
+    theme_id = await _resolve_theme_id(client, theme_input)
+    if theme_input and not theme_id:
+        print(f"[WARN] Gamma theme not found: {theme_input} (proceeding without themeId)")
+    elif theme_id:
+        print(f"[INFO] Gamma themeId resolved: {theme_id}")
 
-        status = (last.get("status") or "").lower()
-        if status in {"completed", "complete", "succeeded", "success"}:
-            return last
-        if status in {"failed", "error"}:
-            raise RuntimeError(f"Gamma generation failed: {last}")
+    payload = _generation_payload(input_text=input_text, theme_id=theme_id, num_cards=num_cards)
+    gen = await client.start_generation(payload)
+    generation_id = gen.get("generationId") or gen.get("id")
+    if not generation_id:
+        raise RuntimeError(f"Gamma ?묐떟??generationId媛 ?놁뒿?덈떎: {gen}")
 
-        time.sleep(3)
+    done = await client.wait_for_generation(generation_id, timeout_sec=timeout_sec)
+    file_url = extract_export_url(done)
+    if not file_url:
+        raise RuntimeError(f"Gamma ?꾨즺 ?묐떟???ㅼ슫濡쒕뱶 URL???놁뒿?덈떎: {done}")
 
-    raise TimeoutError(f"Gamma generation polling timeout ({timeout_sec}s). last={last}")
+    t0 = time.monotonic()
+    size = await client.download(file_url, out_path)
+    print(f"[INFO] Gamma pptx downloaded: {out_path} ({size / 1024:.0f}KB, {time.monotonic() - t0:.1f}s)")
+    return done
 
 
-def _download_file(url: str, out_path: str) -> None:
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    with requests.get(url, stream=True, timeout=300) as r:
-        r.raise_for_status()
-        with open(out_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=1024 * 1024):
-                if chunk:
-                    f.write(chunk)
+# 다운로드가 끝나기 전까지는 파일이 없으므로, 동시에 진행 중인 Gamma 작업끼리 같은 경로를 고르지 않게 메모리로 예약
+_reserved_out_paths: set = set()
+_reserved_lock = threading.Lock()
 
 
 def _avoid_windows_lock(path: str) -> str:
     base, ext = os.path.splitext(path)
-    if not os.path.exists(path):
+
+    def taken(p: str) -> bool:
+        return os.path.exists(p) or p in _reserved_out_paths
+
+    if not taken(path):
         return path
     for i in range(1, 200):
         cand = f"{base} ({i}){ext}"
-        if not os.path.exists(cand):
+        if not taken(cand):
             return cand
     return f"{base}_{int(time.time())}{ext}"
 
 
+def _reserve_out_path(path: str) -> str:
+    with _reserved_lock:
+        path = _avoid_windows_lock(path)
+        _reserved_out_paths.add(path)
+    return path
+
+
+def _release_out_path(path: str) -> None:
+    with _reserved_lock:
+        _reserved_out_paths.discard(path)
+
+
 def _safe_filename(name: str) -> str:
     name = re.sub(r"[\\/:*?\"<>|]+", " ", str(name or ""))
     name = re.sub(r"\s+", " ", name).strip()
@@ -320,15 +302,16 @@ def _safe_filename(name: str) -> str:
     return name[:max_len].rstrip()
 
 
-def gamma_generation_node(state: Dict[str, Any]) -> Dict[str, Any]:
+def _gamma_job(state: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """state → (api_key, _run_gamma 인자)"""
     api_key = os.environ.get("GAMMA_API_KEY")
     if not api_key:
-        raise RuntimeError("GAMMA_API_KEY媛 ?놁뒿?덈떎. .env ?먮뒗 ?섍꼍蹂?섏뿉 ?ㅼ젙?섏꽭??")
+        raise RuntimeError("GAMMA_API_KEY媛 ?놁뒿?덈떎. .env ?먮뒗 ?섍꼍蹂?섏뿉 ?ㅼ젙?섏꽭??")
 
     deck = state.get("deck_json") or {}
     slides = deck.get("slides") or []
     if not slides:
-        raise RuntimeError("deck_json.slides媛 鍮꾩뼱?덉뒿?덈떎. merge_deck_node 寃곌낵瑜??뺤씤?섏꽭??")
+        raise RuntimeError("deck_json.slides媛 鍮꾩뼱?덉뒿?덈떎. merge_deck_node 寃곌낵瑜??뺤씤?섏꽭??")
 
     input_text = _slides_to_input_text(deck)
 
@@ -340,55 +323,45 @@ def gamma_generation_node(state: Dict[str, Any]) -> Dict[str, Any]:
     else:
         output_filename = (state.get("output_filename") or "").strip()
 
-    out_path = _avoid_windows_lock(os.path.join(output_dir, output_filename))
-
     timeout_sec = int(state.get("gamma_timeout_sec") or 600)
     theme_input = (state.get("gamma_theme_id") or state.get("gamma_theme") or "").strip() or None
-    theme_id = _resolve_theme_id(api_key, theme_input)
-    if theme_input and not theme_id:
-        print(f"[WARN] Gamma theme not found: {theme_input} (proceeding without themeId)")
-    elif theme_id:
-        print(f"[INFO] Gamma themeId resolved: {theme_id}")
-
     if state.get("save_checkpoint", False):
         _save_checkpoint(state)
 
+    # 예약은 Gamma future 가 끝날 때 submit_gamma_generation() 이 푼다
+    out_path = _reserve_out_path(os.path.join(output_dir, output_filename))
 
-    gen = _start_generation(api_key, input_text=input_text, theme_id=theme_id, num_cards=len(slides))
-    generation_id = gen.get("generationId") or gen.get("id")
-    if not generation_id:
-        raise RuntimeError(f"Gamma ?묐떟??generationId媛 ?놁뒿?덈떎: {gen}")
-
-    done = _poll_generation(api_key, generation_id, timeout_sec=timeout_sec)
+    return api_key, {
+        "input_text": input_text,
+        "theme_input": theme_input,
+        "num_cards": len(slides),
+        "timeout_sec": timeout_sec,
+        "out_path": out_path,
+    }
 
-    def _extract_url(d: Dict[str, Any]) -> str:
-        return (
-            d.get("exportUrl")
-            or d.get("pptxUrl")
-            or (d.get("exports") or {}).get("pptx")
-            or ""
-        )
 
-    file_url = _extract_url(done)
+def apply_gamma_result(state: Dict[str, Any], out_path: str) -> Dict[str, Any]:
+    state["final_ppt_path"] = out_path
+    state["gamma_ppt_path"] = out_path
+    return state
 
-    # ??completed 吏곹썑??URL????쾶 遺숇뒗 耳?댁뒪 ???理쒕? 45珥?
-    if not file_url:
-        t1 = time.time()
-        while time.time() - t1 < 45:
-            time.sleep(2.5)
-            r = requests.get(f"{GAMMA_API_BASE}/generations/{generation_id}", headers=_gamma_headers(api_key), timeout=60)
-            r.raise_for_status()
-            done2 = r.json()
-            file_url = _extract_url(done2)
-            if file_url:
-                done = done2
-                break
 
-    if not file_url:
-        raise RuntimeError(f"Gamma ?꾨즺 ?묐떟???ㅼ슫濡쒕뱶 URL???놁뒿?덈떎: {done}")
+def submit_gamma_generation(state: Dict[str, Any]) -> Tuple["Future[Dict[str, Any]]", str]:
+    """Gamma 생성/폴링/다운로드를 스케줄러 루프에 넘기고 바로 (future, 저장 경로) 를 돌려준다.
+    future 가 끝나면 apply_gamma_result(state, 저장 경로) 로 이어간다 (main_ppt.begin_ppt_generation)"""
+    api_key, job = _gamma_job(state)
+    out_path = job["out_path"]
+    try:
+        future = get_gamma_scheduler().submit(lambda client: _run_gamma(client, **job), api_key)
+    except BaseException:
+        _release_out_path(out_path)
+        raise
+    future.add_done_callback(lambda _f: _release_out_path(out_path))
+    return future, out_path
 
-    _download_file(file_url, out_path)
 
-    state["final_ppt_path"] = out_path
-    state["gamma_ppt_path"] = out_path
-    return state
+def gamma_generation_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    # HTTP/폴링은 공용 스케줄러 루프에서 (이 노드를 실행한 스레드는 완료까지 결과를 기다림)
+    future, out_path = submit_gamma_generation(state)
+    get_gamma_scheduler().wait(future)
+    return apply_gamma_result(state, out_path)
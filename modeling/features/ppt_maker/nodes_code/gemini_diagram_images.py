@@ -4,6 +4,9 @@ import argparse
 import base64
 import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -20,6 +23,15 @@ from pptx.enum.text import MSO_ANCHOR, MSO_AUTO_SIZE, PP_ALIGN
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 from pptx.util import Pt
 
+from utils.llm_gateway import llm_gateway
+
+from .image_cache import image_cache
+from .run_trace import bind_context, record_llm_call, count as trace_count
+
+# 개념 이미지 동시 생성 수 / 이미지 모델 목록 캐시 유지 시간
+GEMINI_IMAGE_CONCURRENCY = int(os.environ.get("GEMINI_IMAGE_CONCURRENCY", "3"))
+GEMINI_IMAGE_MODEL_CACHE_TTL_SEC = float(os.environ.get("GEMINI_IMAGE_MODEL_CACHE_TTL_SEC", "3600"))
+
 
 IMAGE_PROMPT_BASE = """
 public-funded national R&D presentation visual
@@ -222,46 +234,82 @@ def _extract_image_bytes(resp: Any) -> Optional[bytes]:
     return None
 
 
+_model_candidates_cache: Dict[str, Tuple[float, List[str]]] = {}
+_model_candidates_lock = threading.Lock()
+
+
+def _list_image_models(client: genai.Client) -> List[str]:
+    names: List[str] = []
+    for m in list(client.models.list()):
+        name = str(getattr(m, "name", "") or "").strip()
+        if not name:
+            continue
+        actions = list(getattr(m, "supported_actions", None) or [])
+        if "generateContent" not in actions:
+            continue
+        lk = name.lower()
+        if ("image" in lk) or ("imagen" in lk) or ("flash-exp-image-generation" in lk):
+            names.append(name)
+    return names
+
+
 def _discover_model_candidates(client: genai.Client, preferred: str) -> List[str]:
-    raw: List[str] = [preferred]
-    try:
-        for m in list(client.models.list()):
-            name = str(getattr(m, "name", "") or "").strip()
-            if not name:
-                continue
-            actions = list(getattr(m, "supported_actions", None) or [])
-            if "generateContent" not in actions:
-                continue
-            lk = name.lower()
-            if ("image" in lk) or ("imagen" in lk) or ("flash-exp-image-generation" in lk):
-                raw.append(name)
-    except Exception as e:
-        print(f"[WARN] model list failed, fallback static candidates: {e}")
-
-    raw.extend(
-        [
-            "models/gemini-2.5-flash-image",
-            "models/gemini-2.0-flash-exp-image-generation",
-            "models/gemini-2.5-flash-image-preview",
-            "models/gemini-2.0-flash-preview-image-generation",
-            "gemini-2.5-flash-image",
-            "gemini-2.0-flash-exp-image-generation",
-        ]
-    )
-    out: List[str] = []
-    for m in raw:
-        m = (m or "").strip()
-        if m and m not in out:
-            out.append(m)
-    return out
+    # 모델 목록 API 는 프로세스당 TTL 동안 한 번만 (실패한 결과는 캐시하지 않음)
+    with _model_candidates_lock:
+        cached = _model_candidates_cache.get(preferred)
+        if cached and time.monotonic() - cached[0] < GEMINI_IMAGE_MODEL_CACHE_TTL_SEC:
+            trace_count("image_model_list_cache_hits")
+            return list(cached[1])
+
+        raw: List[str] = [preferred]
+        listed = True
+        try:
+            raw.extend(_list_image_models(client))
+        except Exception as e:
+            listed = False
+            print(f"[WARN] model list failed, fallback static candidates: {e}")
+
+        raw.extend(
+            [
+                "models/gemini-2.5-flash-image",
+                "models/gemini-2.0-flash-exp-image-generation",
+                "models/gemini-2.5-flash-image-preview",
+                "models/gemini-2.0-flash-preview-image-generation",
+                "gemini-2.5-flash-image",
+                "gemini-2.0-flash-exp-image-generation",
+            ]
+        )
+        out: List[str] = []
+        for m in raw:
+            m = (m or "").strip()
+            if m and m not in out:
+                out.append(m)
+        if listed:
+            _model_candidates_cache[preferred] = (time.monotonic(), out)
+        return list(out)
 
 
 def _try_generate_with_config(client: genai.Client, model: str, prompt: str, mode: str) -> Optional[bytes]:
     if mode == "IMAGE_ONLY":
-        resp = client.models.generate_content(
-            model=model,
-            contents=prompt,
-            config=types.GenerateContentConfig(response_modalities=["IMAGE"], temperature=0.2),
+        start_unix, t0 = time.time(), time.perf_counter()
+        try:
+            # 재시도는 호출자(_generate_one_image)의 모델/시도 루프가 담당
+            resp = llm_gateway.generate_content(
+                client,
+                model=model,
+                contents=prompt,
+                config=types.GenerateContentConfig(response_modalities=["IMAGE"], temperature=0.2),
+                max_retries=1,
+            )
+        except Exception as e:
+            record_llm_call(
+                name="gemini.generate_image", model=model, start_unix=start_unix,
+                duration_sec=time.perf_counter() - t0, prompt=prompt, status="error", error=str(e)[:500],
+            )
+            raise
+        record_llm_call(
+            name="gemini.generate_image", model=model, start_unix=start_unix,
+            duration_sec=time.perf_counter() - t0, prompt=prompt, resp=resp,
         )
     else:
         return None
@@ -293,6 +341,50 @@ def _generate_one_image(
     return None
 
 
+def _generate_images(
+    client: genai.Client,
+    preferred: str,
+    jobs: List[Tuple[int, str, Path]],
+    *,
+    max_retries: int,
+    concurrency: int,
+) -> Dict[int, Optional[str]]:
+    """(slide idx, prompt, out_path) 목록 → {idx: 이미지 경로 or None}. 캐시 miss 만 동시에 생성"""
+    results: Dict[int, Optional[str]] = {}
+    pending: List[Tuple[int, str, Path, str]] = []
+    for idx, prompt, out_path in jobs:
+        key = image_cache.key_for(preferred, prompt)
+        if image_cache.copy_to(key, str(out_path)):
+            print(f"[INFO] Gemini image cache hit: slide {idx}")
+            trace_count("image_cache_hits")
+            results[idx] = str(out_path)
+        else:
+            trace_count("image_cache_misses")
+            pending.append((idx, prompt, out_path, key))
+    if not pending:
+        return results
+
+    model_candidates = _discover_model_candidates(client, preferred)
+    print(f"[INFO] Gemini image candidates: {model_candidates[:6]}{'...' if len(model_candidates) > 6 else ''}")
+
+    def run(job: Tuple[int, str, Path, str]) -> Tuple[int, Optional[str]]:
+        idx, prompt, out_path, key = job
+        img_path = _generate_one_image(client, model_candidates, prompt, out_path, max_retries=max_retries)
+        if img_path:
+            image_cache.put(key, Path(img_path).read_bytes())
+        return idx, img_path
+
+    started = time.perf_counter()
+    workers = max(1, min(concurrency, len(pending)))
+    if workers == 1:
+        results.update(run(job) for job in pending)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini-image") as pool:
+            results.update(pool.map(bind_context(run), pending))
+    print(f"[INFO] Gemini images generated: {len(pending)} (concurrency={workers}) {time.perf_counter() - started:.1f}s")
+    return results
+
+
 
 def _find_effect_slide_idx(deck_slides: List[Dict[str, Any]]) -> Optional[int]:
     for idx, spec in enumerate(deck_slides):
@@ -1173,10 +1265,16 @@ def _tighten_white_margins(image_path: str) -> None:
 
 
 def maybe_insert_generated_diagrams(
-    pptx_path: str,
+    pptx: Any,
     deck_json: Dict[str, Any],
     state: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, str]:
+    """
+    대상 슬라이드에 개념 이미지/고정 도식 삽입.
+
+    pptx 가 경로면 열어서 수정 후 저장, Presentation 객체면 그 객체만 수정한다
+    (후처리 파이프라인은 객체를 넘겨 열기/저장을 한 번씩만 한다).
+    """
     if not _enabled(state):
         print("[INFO] Gemini concept images: disabled")
         return {}
@@ -1192,7 +1290,8 @@ def maybe_insert_generated_diagrams(
         or os.environ.get("GEMINI_IMAGE_MODEL")
         or "models/gemini-2.5-flash-image"
     ).strip()
-    prs = Presentation(pptx_path)
+    pptx_path = str(pptx) if isinstance(pptx, (str, os.PathLike)) else None
+    prs = Presentation(pptx_path) if pptx_path is not None else pptx
     deck_slides = (deck_json or {}).get("slides") or []
     slide_count = len(prs.slides)
     if slide_count == 0:
@@ -1214,20 +1313,33 @@ def maybe_insert_generated_diagrams(
         return {}
 
     client = genai.Client(api_key=api_key)
-    model_candidates = _discover_model_candidates(client, preferred)
-    print(f"[INFO] Gemini image candidates: {model_candidates[:6]}{'...' if len(model_candidates) > 6 else ''}")
 
     deck_title = _norm((deck_json or {}).get("deck_title"))
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     out_dir = Path((state or {}).get("output_dir") or "output") / "generated_diagrams"
 
+    # 생성이 필요한 슬라이드의 이미지를 먼저 한꺼번에 준비 (캐시 → 나머지는 동시 생성)
+    image_jobs: List[Tuple[int, str, Path]] = []
+    for n, idx in enumerate(targets, 1):
+        spec = deck_slides[idx] if idx < len(deck_slides) and isinstance(deck_slides[idx], dict) else {}
+        prompt_type = _norm(spec.get("image_prompt_type")).lower()
+        if prompt_type in {"plan_orgchart_fixed", "system_architecture"}:
+            continue
+        prompt = _build_prompt(deck_title, _norm(spec.get("section")), _norm(spec.get("slide_title")), prompt_type=prompt_type)
+        image_jobs.append((idx, prompt, out_dir / f"concept_{n}_{ts}.png"))
+    image_paths = _generate_images(
+        client,
+        preferred,
+        image_jobs,
+        max_retries=int((state or {}).get("gemini_image_retry_count") or os.environ.get("GEMINI_IMAGE_RETRY_COUNT") or 1),
+        concurrency=int((state or {}).get("gemini_image_concurrency") or GEMINI_IMAGE_CONCURRENCY),
+    )
+
     generated: Dict[str, str] = {}
     inserted_count = 0
 
-    for n, idx in enumerate(targets, 1):
+    for idx in targets:
         spec = deck_slides[idx] if idx < len(deck_slides) and isinstance(deck_slides[idx], dict) else {}
-        section = _norm(spec.get("section"))
-        title = _norm(spec.get("slide_title"))
         prompt_type = _norm(spec.get("image_prompt_type")).lower()
         if prompt_type == "plan_orgchart_fixed":
             slide = prs.slides[idx]
@@ -1292,15 +1404,7 @@ def maybe_insert_generated_diagrams(
             spec["image_type"] = "none"
             continue
 
-        prompt = _build_prompt(deck_title, section, title, prompt_type=prompt_type)
-        out_path = out_dir / f"concept_{n}_{ts}.png"
-        img_path = _generate_one_image(
-            client,
-            model_candidates,
-            prompt,
-            out_path,
-            max_retries=int((state or {}).get("gemini_image_retry_count") or os.environ.get("GEMINI_IMAGE_RETRY_COUNT") or 1),
-        )
+        img_path = image_paths.get(idx)
         if not img_path:
             spec["layout"] = "text_only"
             spec["image_needed"] = False
@@ -1389,7 +1493,8 @@ def maybe_insert_generated_diagrams(
             spec["image_needed"] = False
             spec["image_type"] = "none"
 
-    prs.save(pptx_path)
+    if pptx_path is not None:
+        prs.save(pptx_path)
     print(f"[INFO] Gemini concept image insert result: inserted={inserted_count}")
     return generated
 
@@ -0,0 +1,151 @@
+"""
+Gemini 개념 이미지 캐시 (content-addressed, 디스크).
+
+키 = 요청 모델(gemini_image_model) + 정규화한 프롬프트(_build_prompt 결과, 공백 정리) SHA-256.
+같은 과제명/섹션/슬라이드 제목으로 덱을 다시 만들면 이전 PNG 를 복사해 쓰고 생성 호출을 생략한다.
+키의 모델은 실제로 PNG 를 만든 모델이 아니라 요청한 모델이다. 요청 모델이 실패해 후보 모델로
+대체 생성된 이미지도 요청 모델 키로 저장되므로, 이후 같은 요청은 그 대체 이미지를 재사용한다.
+
+- 원본 생성 바이트를 저장 (여백 정리 등 후처리는 복사본에만 적용)
+- 총 용량이 GEMINI_IMAGE_CACHE_MAX_MB 를 넘으면 가장 오래 안 쓴 파일부터 삭제 (mtime 기준)
+  용량은 저장할 때마다 증감으로 집계하고, 디렉터리 전체 순회는 첫 사용과 상한 초과 때만 한다
+- 프롬프트나 모델을 바꾸면 키가 달라지므로 별도 무효화는 필요 없음
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import threading
+import uuid
+from typing import Any, Dict, Optional
+
+GEMINI_IMAGE_CACHE_ENABLED = os.environ.get("GEMINI_IMAGE_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+GEMINI_IMAGE_CACHE_DIR = os.environ.get("GEMINI_IMAGE_CACHE_DIR", os.path.join("tmp", "gemini_image_cache"))
+GEMINI_IMAGE_CACHE_MAX_MB = float(os.environ.get("GEMINI_IMAGE_CACHE_MAX_MB", "256"))
+
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", str(prompt or "")).strip()
+
+
+class ImageCache:
+    def __init__(self, cache_dir: str, max_disk_bytes: int, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None  # 첫 사용 시 디렉터리 스캔
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+
+    def key_for(self, model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}|{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.png")
+
+    def copy_to(self, key: str, out_path: str) -> bool:
+        """캐시에 있으면 out_path 로 복사하고 True"""
+        if not self.enabled:
+            return False
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+            shutil.copyfile(path, out_path)
+            os.utime(path, None)  # LRU 갱신
+        except FileNotFoundError:
+            with self._lock:
+                self.counters["misses"] += 1
+            return False
+        except OSError as e:
+            print(f"[ImageCache] 캐시 읽기 실패, 무시: {path} ({e})")
+            with self._lock:
+                self.counters["errors"] += 1
+                self.counters["misses"] += 1
+            return False
+        with self._lock:
+            self.counters["hits"] += 1
+        return True
+
+    def put(self, key: str, data: bytes) -> None:
+        if not self.enabled or not data:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[ImageCache] 저장 실패: {path} ({e})")
+            with self._lock:
+                self.counters["errors"] += 1
+            return
+        with self._lock:
+            self.counters["stores"] += 1
+            self._disk_bytes = self._ensure_disk_bytes() - old_size + len(data)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict()
+
+    def _scan_disk_bytes(self) -> int:
+        total = 0
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".png"):
+                    try:
+                        total += os.path.getsize(os.path.join(root, name))
+                    except OSError:
+                        pass
+        return total
+
+    def _ensure_disk_bytes(self) -> int:
+        if self._disk_bytes is None:
+            self._disk_bytes = self._scan_disk_bytes()
+        return self._disk_bytes
+
+    def _evict(self) -> None:
+        entries = []
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".png"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _mtime, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.counters["evictions"] += 1
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "cache_dir": self.cache_dir,
+                **self.counters,
+                "disk_bytes": self._disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+            }
+
+
+image_cache = ImageCache(
+    cache_dir=GEMINI_IMAGE_CACHE_DIR,
+    max_disk_bytes=int(GEMINI_IMAGE_CACHE_MAX_MB * 1024 * 1024),
+    enabled=GEMINI_IMAGE_CACHE_ENABLED,
+)
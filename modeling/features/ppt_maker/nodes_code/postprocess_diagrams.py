@@ -1,8 +1,10 @@
 ﻿from __future__ import annotations
 
+import io
 import os
 import random
 import re
+import time
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 from pptx import Presentation
@@ -336,40 +338,38 @@ def _decorate_content_slides(prs: Presentation) -> None:
         _add_solid_rect(slide, left=0.0, top=0.0, width=0.08, height=7.5, rgb=(191, 217, 238))
 
 
-def _style_tables(prs: Presentation) -> None:
+def _style_table_shape(sh) -> None:
     # ???ㅻ뜑/蹂몃Ц ?됱긽 ?듭씪濡?媛?낆꽦 蹂닿컯
-    for slide in prs.slides:
-        for sh in slide.shapes:
-            if not getattr(sh, "has_table", False):
-                continue
-            tbl = sh.table
-            rows = len(tbl.rows)
-            cols = len(tbl.columns)
-            if rows <= 0 or cols <= 0:
-                continue
+    if not getattr(sh, "has_table", False):
+        return
+    tbl = sh.table
+    rows = len(tbl.rows)
+    cols = len(tbl.columns)
+    if rows <= 0 or cols <= 0:
+        return
 
-            for r in range(rows):
-                for c in range(cols):
-                    cell = tbl.cell(r, c)
-                    cell.fill.solid()
+    for r in range(rows):
+        for c in range(cols):
+            cell = tbl.cell(r, c)
+            cell.fill.solid()
+            if r == 0:
+                cell.fill.fore_color.rgb = RGBColor(34, 74, 122)    # header
+            elif r % 2 == 1:
+                cell.fill.fore_color.rgb = RGBColor(241, 246, 252)  # zebra1
+            else:
+                cell.fill.fore_color.rgb = RGBColor(250, 252, 255)  # zebra2
+
+            tf = cell.text_frame
+            tf.word_wrap = True
+            for p in tf.paragraphs:
+                for run in p.runs:
+                    run.font.color.rgb = RGBColor(255, 255, 255) if r == 0 else RGBColor(28, 33, 39)
                     if r == 0:
-                        cell.fill.fore_color.rgb = RGBColor(34, 74, 122)    # header
-                    elif r % 2 == 1:
-                        cell.fill.fore_color.rgb = RGBColor(241, 246, 252)  # zebra1
+                        run.font.bold = True
+                        run.font.size = Pt(11)
                     else:
-                        cell.fill.fore_color.rgb = RGBColor(250, 252, 255)  # zebra2
-
-                    tf = cell.text_frame
-                    tf.word_wrap = True
-                    for p in tf.paragraphs:
-                        for run in p.runs:
-                            run.font.color.rgb = RGBColor(255, 255, 255) if r == 0 else RGBColor(28, 33, 39)
-                            if r == 0:
-                                run.font.bold = True
-                                run.font.size = Pt(11)
-                            else:
-                                # 蹂몃Ц? ?고듃瑜?議곌툑 以꾩뿬 overflow ?꾪솕
-                                run.font.size = Pt(10)
+                        # 蹂몃Ц? ?고듃瑜?議곌툑 以꾩뿬 overflow ?꾪솕
+                        run.font.size = Pt(10)
 
 
 def _strip_formal_endings_text(text: str) -> str:
@@ -383,58 +383,42 @@ def _strip_formal_endings_text(text: str) -> str:
     return "\n".join(out_lines)
 
 
+def _shape_text_frames(sh):
+    """도형의 텍스트 프레임 (표는 셀마다 하나씩)"""
+    if getattr(sh, "has_text_frame", False):
+        yield sh.text_frame
+    if getattr(sh, "has_table", False):
+        tbl = sh.table
+        for r in range(len(tbl.rows)):
+            for c in range(len(tbl.columns)):
+                yield tbl.cell(r, c).text_frame
+
+
+def _strip_formal_endings_in_shape(sh) -> None:
+    for tf in _shape_text_frames(sh):
+        for p in tf.paragraphs:
+            if p.runs:
+                for run in p.runs:
+                    run.text = _strip_formal_endings_text(run.text or "")
+            else:
+                p.text = _strip_formal_endings_text(p.text or "")
+
+
 def _strip_formal_endings_in_presentation(prs: Presentation) -> None:
     for slide in prs.slides:
         for sh in slide.shapes:
-            if getattr(sh, "has_text_frame", False):
-                tf = sh.text_frame
-                for p in tf.paragraphs:
-                    if p.runs:
-                        for run in p.runs:
-                            run.text = _strip_formal_endings_text(run.text or "")
-                    else:
-                        p.text = _strip_formal_endings_text(p.text or "")
-            if getattr(sh, "has_table", False):
-                tbl = sh.table
-                for r in range(len(tbl.rows)):
-                    for c in range(len(tbl.columns)):
-                        cell = tbl.cell(r, c)
-                        tf = cell.text_frame
-                        for p in tf.paragraphs:
-                            if p.runs:
-                                for run in p.runs:
-                                    run.text = _strip_formal_endings_text(run.text or "")
-                            else:
-                                p.text = _strip_formal_endings_text(p.text or "")
-
-
-def _apply_font_name(prs: Presentation, font_name: str) -> None:
-    fn = _norm(font_name)
-    if not fn:
-        return
-    for slide in prs.slides:
-        for sh in slide.shapes:
-            if getattr(sh, "has_text_frame", False):
-                tf = sh.text_frame
-                for p in tf.paragraphs:
-                    if p.runs:
-                        for run in p.runs:
-                            run.font.name = fn
-                    else:
-                        r = p.add_run()
-                        r.font.name = fn
-            if getattr(sh, "has_table", False):
-                tbl = sh.table
-                for r_idx in range(len(tbl.rows)):
-                    for c_idx in range(len(tbl.columns)):
-                        cell = tbl.cell(r_idx, c_idx)
-                        for p in cell.text_frame.paragraphs:
-                            if p.runs:
-                                for run in p.runs:
-                                    run.font.name = fn
-                            else:
-                                r = p.add_run()
-                                r.font.name = fn
+            _strip_formal_endings_in_shape(sh)
+
+
+def _apply_font_name_to_shape(sh, fn: str) -> None:
+    for tf in _shape_text_frames(sh):
+        for p in tf.paragraphs:
+            if p.runs:
+                for run in p.runs:
+                    run.font.name = fn
+            else:
+                r = p.add_run()
+                r.font.name = fn
 
 
 def _slides_with_structured_visuals(deck_json: Dict[str, Any]) -> Set[int]:
@@ -563,35 +547,71 @@ def _trim_ending_slides(prs: Presentation) -> None:
             _delete_slide(prs, idx)
 
 
-def _remove_duplicate_text_shapes(prs: Presentation) -> int:
+def _is_duplicate_text_shape(sh, seen: Set[str]) -> bool:
+    """같은 슬라이드에 이미 나온 텍스트(10자 이상)면 True. 처음 보는 텍스트는 seen 에 추가"""
+    if not getattr(sh, "has_text_frame", False):
+        return False
+    t = _norm(sh.text_frame.text or "")
+    if not t:
+        return False
+    key = re.sub(r"\s+", " ", t).strip().lower()
+    if len(key) < 10:
+        return False
+    if key in seen:
+        return True
+    seen.add(key)
+    return False
+
+
+def _text_shape_pass(prs: Presentation, *, style_tables: bool, font_name: str) -> int:
+    """중복 텍스트 제거 + 표 스타일 + 글꼴 지정을 도형 순회 한 번으로 처리. 제거한 도형 수 반환"""
+    fn = _norm(font_name)
     removed = 0
     for slide in prs.slides:
         seen: Set[str] = set()
         for sh in list(slide.shapes):
-            if not getattr(sh, "has_text_frame", False):
-                continue
-            t = _norm(sh.text_frame.text or "")
-            if not t:
-                continue
-            key = re.sub(r"\s+", " ", t).strip().lower()
-            if len(key) < 10:
-                continue
-            if key in seen:
+            if _is_duplicate_text_shape(sh, seen):
                 _remove_shape(sh)
                 removed += 1
                 continue
-            seen.add(key)
+            if style_tables:
+                _style_table_shape(sh)
+            if fn:
+                _apply_font_name_to_shape(sh, fn)
     return removed
 
 
+class _PassTimer:
+    """후처리 단계별 소요 시간 기록 (같은 이름은 누적)"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._t0 = time.perf_counter()
+        self._last = self._t0
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.timings[name] = round(self.timings.get(name, 0.0) + now - self._last, 3)
+        self._last = now
+
+    def report(self) -> Dict[str, float]:
+        self.timings["total"] = round(time.perf_counter() - self._t0, 3)
+        print("[INFO] postprocess timings(s): " + ", ".join(f"{k}={v}" for k, v in self.timings.items()))
+        return self.timings
+
+
 def postprocess_diagrams(pptx_path: str, deck_json: Dict[str, Any], state: Optional[Dict[str, Any]] = None) -> str:
     """
     Gamma 寃곌낵 PPTX ?꾩쿂由?
     - ?쒖?/紐⑹감 媛뺤젣 ?ъ옉??(1~2踰??щ씪?대뱶)
     - AI ?대?吏/placeholder ?쒓굅 (?? ???꾪몴/?ㅼ씠?닿렇?⑥? 蹂댁〈)
     - ?붾뵫 ?щ씪?대뱶 ?뺣━
+
+    Presentation 은 한 번만 열고, 모든 단계가 메모리에서 이어받은 뒤 마지막에 한 번 저장한다.
     """
+    timer = _PassTimer()
     prs = Presentation(pptx_path)
+    timer.mark("load")
 
     # ??deck_json 湲곕컲?쇰줈 "洹몃┝ 蹂댁〈?댁빞 ?섎뒗 ?щ씪?대뱶" 怨꾩궛
     keep_picture_slide_idxs = _slides_with_structured_visuals(deck_json)
@@ -631,6 +651,7 @@ def postprocess_diagrams(pptx_path: str, deck_json: Dict[str, Any], state: Optio
         _decorate_cover_slide(prs.slides[0])
     if rewrite_cover and len(prs.slides) >= 1:
         _decorate_thanks_slide(prs.slides[-1])
+    timer.mark("cover_agenda")
 
     # 2) AI image ?뺣━(placeholder???대?吏 ?쎌엯 ????щ씪?대뱶?먯꽌 ?좎?)
     _remove_visual_placeholders(
@@ -639,16 +660,22 @@ def postprocess_diagrams(pptx_path: str, deck_json: Dict[str, Any], state: Optio
         keep_placeholder_slide_idxs=need_image_slide_idxs,
         remove_pictures=True,
     )
-    prs.save(pptx_path)
+    timer.mark("placeholders")
 
     # 2.2) placeholder ?곗꽑 ?대?吏 ?쎌엯
+    #      실패하면 중간까지 넣은 편집을 버리도록 메모리 스냅샷으로 되돌린다 (디스크 재로드 없이)
+    snapshot = io.BytesIO()
+    prs.save(snapshot)
+    timer.mark("snapshot")
     try:
-        image_paths = maybe_insert_generated_diagrams(pptx_path, deck_json, state=state)
+        image_paths = maybe_insert_generated_diagrams(prs, deck_json, state=state)
         if state is not None and image_paths:
             state["generated_diagram_images"] = image_paths
     except Exception as e:
         print(f"[WARN] diagram image generation skipped: {e}")
-    prs = Presentation(pptx_path)
+        snapshot.seek(0)
+        prs = Presentation(snapshot)
+    timer.mark("diagram_images")
 
     # 2.3) ?⑥? image placeholder ?뺣━ (?앹꽦??洹몃┝? 蹂댁〈)
     _remove_visual_placeholders(
@@ -657,17 +684,18 @@ def postprocess_diagrams(pptx_path: str, deck_json: Dict[str, Any], state: Optio
         keep_placeholder_slide_idxs=set(),
         remove_pictures=False,
     )
-    _remove_duplicate_text_shapes(prs)
+    timer.mark("placeholders")
     if apply_template:
         _decorate_content_slides(prs)
+        timer.mark("template")
 
-    # 2.5) table style (?좏깮)
-    if style_tables:
-        _style_tables(prs)
-    _apply_font_name(prs, (state or {}).get("font_name") or "")
+    # 2.5) 중복 텍스트 제거 + table style (선택) + 글꼴: 도형 순회 한 번
+    _text_shape_pass(prs, style_tables=style_tables, font_name=(state or {}).get("font_name") or "")
+    timer.mark("text_shapes")
     # 3) ?붾뵫 ?뺣━ (?좏깮)
     if trim_ending:
         _trim_ending_slides(prs)
+        timer.mark("trim_ending")
 
     if remove_background:
         removed = _remove_background_images(prs)
@@ -691,8 +719,14 @@ def postprocess_diagrams(pptx_path: str, deck_json: Dict[str, Any], state: Optio
                 f"[INFO] background image inserted: {n_bg} slides "
                 f"(marker name={BG_MARKER_NAME}, alt={BG_MARKER_ALT})"
             )
+    if remove_background or apply_background:
+        timer.mark("background")
 
     prs.save(pptx_path)
+    timer.mark("save")
+    timings = timer.report()
+    if state is not None:
+        state["postprocess_timings"] = timings
     return pptx_path
 
 
@@ -0,0 +1,392 @@
+"""
+PPT 파이프라인 실행 trace (노드별 시간 / Gemini 호출 / 토큰·비용 / 캐시 hit).
+
+- run_ppt_generation 이 start_run_trace() 로 trace 를 만들고 state["trace_id"] 에 id 를 넣는다
+- build_graph 의 노드는 traced_node() 로 감싸서 노드 시작/종료/예외를 기록
+  (Gamma 렌더를 스케줄러 future 로 기다리는 경우는 trace_future_node() 가 같은 형식의 span 을 남긴다)
+- generate_content_with_retry 등 LLM 호출은 record_llm_call() 로 현재 노드 아래에 기록
+  (현재 노드는 contextvar 로 전달. 노드 안에서 스레드 풀을 쓰면 bind_context() 로 감싸서 넘긴다)
+- 노드가 끝날 때마다 output/traces/<run_id>.trace.json 을 갱신 → 멈춘 실행도 어느 노드에 있는지 확인 가능
+- 끝나면 최종 덱 옆(<deck>.trace.json)으로 옮기고, PPT_TRACE_OTEL=1 이면 OpenTelemetry span 으로도 내보낸다
+  (opentelemetry-api 가 설치돼 있고 provider/exporter 는 앱에서 설정한 경우에만 실제 전송)
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from opentelemetry import trace as otel_trace
+except Exception:
+    otel_trace = None
+
+PPT_TRACE_ENABLED = os.environ.get("PPT_TRACE_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+PPT_TRACE_OTEL = os.environ.get("PPT_TRACE_OTEL", "0").strip().lower() in ("1", "true", "yes")
+
+# 1M 토큰당 USD (입력/출력). LLM_PRICE_PER_1M_TOKENS='{"gemini-2.5-flash": {"input": 0.3, "output": 2.5}}' 로 덮어쓰기
+DEFAULT_PRICE_PER_1M_TOKENS: Dict[str, Dict[str, float]] = {
+    "gemini-2.5-flash-image": {"input": 0.30, "output": 30.0},
+    "gemini-2.5-flash": {"input": 0.30, "output": 2.50},
+    "gemini-2.5-pro": {"input": 1.25, "output": 10.0},
+}
+
+
+def _load_price_table() -> Dict[str, Dict[str, float]]:
+    table = dict(DEFAULT_PRICE_PER_1M_TOKENS)
+    raw = (os.environ.get("LLM_PRICE_PER_1M_TOKENS") or "").strip()
+    if raw:
+        try:
+            table.update(json.loads(raw))
+        except Exception as e:
+            print(f"[WARN] LLM_PRICE_PER_1M_TOKENS 파싱 실패, 기본 단가 사용: {e}")
+    return table
+
+
+PRICE_PER_1M_TOKENS = _load_price_table()
+
+
+def estimate_cost_usd(model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    name = str(model or "").split("/")[-1]
+    # 가장 긴 prefix 매칭 (gemini-2.5-flash-image 가 gemini-2.5-flash 보다 우선)
+    for key in sorted(PRICE_PER_1M_TOKENS, key=len, reverse=True):
+        if name.startswith(key):
+            price = PRICE_PER_1M_TOKENS[key]
+            cost = input_tokens * float(price.get("input", 0)) + output_tokens * float(price.get("output", 0))
+            return round(cost / 1_000_000, 6)
+    return None
+
+
+def content_chars(contents: Any) -> int:
+    """프롬프트 크기 (문자 수). str / Part / list 모두 대략 계산"""
+    if contents is None:
+        return 0
+    if isinstance(contents, str):
+        return len(contents)
+    if isinstance(contents, (list, tuple)):
+        return sum(content_chars(x) for x in contents)
+    text = getattr(contents, "text", None)
+    if isinstance(text, str):
+        return len(text)
+    parts = getattr(contents, "parts", None)
+    if parts:
+        return content_chars(list(parts))
+    return 0
+
+
+def usage_of(resp: Any) -> Dict[str, int]:
+    """응답 usage_metadata → 토큰 수 (없으면 빈 dict)"""
+    usage = getattr(resp, "usage_metadata", None)
+    if usage is None:
+        return {}
+    out: Dict[str, int] = {}
+    for key, attr in (
+        ("input_tokens", "prompt_token_count"),
+        ("output_tokens", "candidates_token_count"),
+        ("thinking_tokens", "thoughts_token_count"),
+        ("cached_tokens", "cached_content_token_count"),
+        ("total_tokens", "total_token_count"),
+    ):
+        v = getattr(usage, attr, None)
+        if isinstance(v, int):
+            out[key] = v
+    return out
+
+
+def response_chars(resp: Any) -> int:
+    try:
+        text = getattr(resp, "text", None)
+    except Exception:
+        return 0  # 이미지 응답 등
+    return len(text) if isinstance(text, str) else 0
+
+
+# =========================================================
+# Trace
+# =========================================================
+class RunTrace:
+    def __init__(self, run_id: str, output_dir: str, meta: Optional[Dict[str, Any]] = None):
+        self.run_id = run_id
+        self.meta = dict(meta or {})
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: List[Dict[str, Any]] = []
+        self.running: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.path = os.path.join(output_dir or "output", "traces", f"{run_id}.trace.json")
+
+    def add_span(self, span: Dict[str, Any]) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def node_started(self, name: str) -> None:
+        with self._lock:
+            self.running[name] = time.time()
+
+    def node_finished(self, name: str) -> None:
+        with self._lock:
+            self.running.pop(name, None)
+
+    def _summary(self, spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+        nodes: Dict[str, Dict[str, Any]] = {}
+        llm_total = {"calls": 0, "attempts": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+        for s in spans:
+            if s["kind"] == "node":
+                n = nodes.setdefault(s["name"], {"wall_sec": 0.0, "llm_calls": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0})
+                n["wall_sec"] = round(n["wall_sec"] + s["duration_sec"], 3)
+            elif s["kind"] == "llm":
+                n = nodes.setdefault(s.get("node") or "-", {"wall_sec": 0.0, "llm_calls": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0})
+                n["llm_calls"] += 1
+                llm_total["calls"] += 1
+                llm_total["attempts"] += int(s.get("attempts") or 0)
+                for key in ("input_tokens", "output_tokens"):
+                    n[key] += int(s.get(key) or 0)
+                    llm_total[key] += int(s.get(key) or 0)
+                cost = s.get("cost_usd") or 0.0
+                n["cost_usd"] = round(n["cost_usd"] + cost, 6)
+                llm_total["cost_usd"] = round(llm_total["cost_usd"] + cost, 6)
+        return {"nodes": nodes, "llm": llm_total}
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+            running = dict(self.running)
+            counters = dict(self.counters)
+        return {
+            "run_id": self.run_id,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+            "elapsed_sec": round(time.perf_counter() - self._t0, 3),
+            "meta": self.meta,
+            "running_nodes": {k: datetime.fromtimestamp(v).isoformat(timespec="seconds") for k, v in running.items()},
+            "counters": counters,
+            "summary": self._summary(spans),
+            "spans": spans,
+        }
+
+    def write(self, path: Optional[str] = None) -> str:
+        path = path or self.path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+    def export_otel(self) -> int:
+        """노드/LLM span 을 OpenTelemetry tracer 로 재생 (노드 → LLM 호출 계층). 보낸 span 수 반환"""
+        if otel_trace is None:
+            print("[WARN] PPT_TRACE_OTEL=1 이지만 opentelemetry 패키지가 없습니다.")
+            return 0
+        tracer = otel_trace.get_tracer("ppt_maker")
+
+        def ns(t: float) -> int:
+            return int(t * 1_000_000_000)
+
+        def attrs(span: Dict[str, Any]) -> Dict[str, Any]:
+            return {
+                f"ppt.{k}": v
+                for k, v in span.items()
+                if k not in ("name", "kind", "start_unix", "duration_sec") and isinstance(v, (str, bool, int, float))
+            }
+
+        data = self.to_dict()
+        root = tracer.start_span("ppt_run", start_time=ns(self.started_at), attributes={"ppt.run_id": self.run_id})
+        root_ctx = otel_trace.set_span_in_context(root)
+        node_ctx: Dict[str, Any] = {}
+        sent = 1
+        spans = sorted(data["spans"], key=lambda s: (s["kind"] != "node", s["start_unix"]))
+        for s in spans:
+            parent = root_ctx if s["kind"] == "node" else node_ctx.get(s.get("node") or "", root_ctx)
+            span = tracer.start_span(s["name"], context=parent, start_time=ns(s["start_unix"]), attributes=attrs(s))
+            if s["kind"] == "node":
+                node_ctx[s["name"]] = otel_trace.set_span_in_context(span)
+            span.end(end_time=ns(s["start_unix"] + s["duration_sec"]))
+            sent += 1
+        root.end(end_time=ns(self.started_at + data["elapsed_sec"]))
+        return sent
+
+
+_traces: Dict[str, RunTrace] = {}
+_traces_lock = threading.Lock()
+# (trace, 노드 이름) — 노드 실행 중에만 설정
+_current: contextvars.ContextVar[Optional[Tuple[RunTrace, str]]] = contextvars.ContextVar("ppt_run_trace", default=None)
+
+
+def start_run_trace(output_dir: str = "", **meta: Any) -> Optional[RunTrace]:
+    if not PPT_TRACE_ENABLED:
+        return None
+    run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    trace = RunTrace(run_id, output_dir, meta)
+    with _traces_lock:
+        _traces[run_id] = trace
+    return trace
+
+
+def get_run_trace(trace_id: str) -> Optional[RunTrace]:
+    with _traces_lock:
+        return _traces.get(str(trace_id or ""))
+
+
+def finish_run_trace(trace: Optional[RunTrace], final_state: Optional[Dict[str, Any]] = None, error: str = "") -> str:
+    """trace 를 최종 덱 옆에 저장하고 registry 에서 제거. 저장 경로 반환"""
+    if trace is None:
+        return ""
+    with _traces_lock:
+        _traces.pop(trace.run_id, None)
+    if error:
+        trace.meta["error"] = error
+
+    deck_path = str((final_state or {}).get("final_ppt_path") or "").strip()
+    path = trace.path
+    try:
+        if deck_path:
+            path = trace.write(f"{os.path.splitext(deck_path)[0]}.trace.json")
+            if os.path.exists(trace.path):
+                os.remove(trace.path)
+        else:
+            trace.write()
+    except OSError as e:
+        print(f"[WARN] trace 저장 실패: {e}")
+        return ""
+
+    summary = trace.to_dict()["summary"]
+    print("[TRACE] node wall(s): " + ", ".join(f"{k}={v['wall_sec']}" for k, v in summary["nodes"].items() if v["wall_sec"]))
+    llm = summary["llm"]
+    print(
+        f"[TRACE] LLM calls={llm['calls']} attempts={llm['attempts']} "
+        f"tokens in/out={llm['input_tokens']}/{llm['output_tokens']} cost≈${llm['cost_usd']:.4f} -> {path}"
+    )
+    if PPT_TRACE_OTEL:
+        try:
+            trace.export_otel()
+        except Exception as e:
+            print(f"[WARN] OpenTelemetry export 실패: {e}")
+    return path
+
+
+# =========================================================
+# 기록 API (trace 가 없으면 아무것도 하지 않음)
+# =========================================================
+def traced_node(name: str, fn: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """LangGraph 노드 래퍼: state["trace_id"] 의 trace 에 노드 시간/예외 기록"""
+
+    def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+        trace = get_run_trace(state.get("trace_id") or "")
+        if trace is None:
+            return fn(state)
+
+        token = _current.set((trace, name))
+        trace.node_started(name)
+        try:
+            trace.write()
+        except OSError:
+            pass
+        start_unix, t0 = time.time(), time.perf_counter()
+        span: Dict[str, Any] = {"kind": "node", "name": name, "start_unix": start_unix, "status": "ok"}
+        try:
+            result = fn(state)
+            timings = (result or {}).get("postprocess_timings") if isinstance(result, dict) else None
+            if timings:
+                span["pass_timings"] = timings
+            return result
+        except BaseException as e:
+            span["status"] = "error"
+            span["error"] = f"{type(e).__name__}: {e}"[:500]
+            raise
+        finally:
+            span["duration_sec"] = round(time.perf_counter() - t0, 3)
+            trace.add_span(span)
+            trace.node_finished(name)
+            _current.reset(token)
+            try:
+                trace.write()
+            except OSError:
+                pass
+
+    wrapper.__name__ = getattr(fn, "__name__", name)
+    return wrapper
+
+
+def trace_future_node(state: Dict[str, Any], name: str, future: Any) -> None:
+    """스레드 밖(Gamma 스케줄러 루프 등)에서 끝나는 노드: 지금 시작하고 future 완료 시 노드 span 기록.
+    완료 콜백은 스케줄러 루프에서 돌기 때문에 파일은 쓰지 않는다 (다음 노드가 trace.write())"""
+    trace = get_run_trace(state.get("trace_id") or "")
+    if trace is None:
+        return
+    trace.node_started(name)
+    start_unix, t0 = time.time(), time.perf_counter()
+
+    def _done(f: Any) -> None:
+        span: Dict[str, Any] = {"kind": "node", "name": name, "start_unix": start_unix, "status": "ok"}
+        error = "cancelled" if f.cancelled() else f.exception()
+        if error is not None:
+            span["status"] = "error"
+            span["error"] = (error if isinstance(error, str) else f"{type(error).__name__}: {error}")[:500]
+        span["duration_sec"] = round(time.perf_counter() - t0, 3)
+        trace.add_span(span)
+        trace.node_finished(name)
+
+    future.add_done_callback(_done)
+
+
+def bind_context(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """현재 노드 context 를 스레드 풀 작업에도 전달 (ThreadPoolExecutor 는 contextvar 를 복사하지 않음)"""
+    ctx = contextvars.copy_context()
+
+    def run(*args: Any, **kwargs: Any) -> Any:
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def record_llm_call(
+    *,
+    model: str,
+    start_unix: float,
+    duration_sec: float,
+    name: str = "gemini.generate_content",
+    prompt: Any = None,
+    resp: Any = None,
+    **extra: Any,
+) -> None:
+    current = _current.get()
+    if current is None:
+        return
+    trace, node = current
+    span: Dict[str, Any] = {
+        "kind": "llm",
+        "name": name,
+        "node": node,
+        "model": model,
+        "start_unix": start_unix,
+        "duration_sec": round(duration_sec, 3),
+        "prompt_chars": content_chars(prompt),
+        "response_chars": response_chars(resp) if resp is not None else 0,
+        **usage_of(resp),
+        **extra,
+    }
+    cost = estimate_cost_usd(model, int(span.get("input_tokens") or 0), int(span.get("output_tokens") or 0) + int(span.get("thinking_tokens") or 0))
+    if cost is not None and (span.get("input_tokens") or span.get("output_tokens")):
+        span["cost_usd"] = cost
+    trace.add_span(span)
+
+
+def count(key: str, n: int = 1) -> None:
+    """현재 노드의 trace 카운터 증가 (캐시 hit/miss 등). 노드 이름이 붙은 키로도 함께 센다"""
+    current = _current.get()
+    if current is None:
+        return
+    trace, node = current
+    trace.count(key, n)
+    trace.count(f"{node}.{key}", n)
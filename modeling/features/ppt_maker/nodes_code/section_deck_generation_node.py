@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import json
+import os
 import re
-from typing import Any, Dict, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
 
 from google import genai
 from google.genai import types
 
-from .llm_utils import generate_content_with_retry, get_gemini_client
+from .llm_utils import gemini_cooldown, generate_content_with_retry, get_gemini_client
+from .run_trace import bind_context
+
+# 섹션/분할 단위 Gemini 호출 동시 실행 수 (1 이면 순차). state["gemini_concurrency"] 가 우선
+GEMINI_SECTION_CONCURRENCY = int(os.environ.get("GEMINI_SECTION_CONCURRENCY", "4"))
 
 
 # -----------------------------
@@ -565,6 +572,61 @@ def _repair_slides(
     return [s for s in slides if not s.get("_drop_slide")]
 
 
+# -----------------------------
+# Chunk generation (동시 실행 단위)
+# -----------------------------
+def _generate_chunk_slides(
+    client: genai.Client,
+    state: Dict[str, Any],
+    prompt_for_section: str,
+    sec_title: str,
+    idx: int,
+    total: int,
+    chunk_text: str,
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """분할 1개 → (raw, 정리된 slides). order 는 조립 단계에서 다시 매긴다"""
+    model = state.get("gemini_model") or "gemini-2.5-flash"
+    chunk_header = f"[섹션: {sec_title}] [분할 {idx}/{total}]\n"
+    input_text = chunk_header + chunk_text
+    resp = generate_content_with_retry(
+        client,
+        model=model,
+        contents=[prompt_for_section, input_text],
+        config=types.GenerateContentConfig(
+            max_output_tokens=int(state.get("gemini_max_output_tokens") or 8192),
+            temperature=float(state.get("gemini_temperature") or 0.4),
+        ),
+        max_retries=int(state.get("gemini_max_retries") or 5),
+    )
+
+    raw = (getattr(resp, "text", None) or "").strip()
+    print("[DEBUG][gemini] raw_len:", len(raw), "section:", repr(sec_title), "chunk:", idx)
+    if not raw:
+        return "", []
+
+    slides = _parse_slides_from_text(raw, default_section=sec_title, start_order=1)
+    slides = _repair_slides(slides, client=client, model=model)
+    if not slides:
+        slides = _fallback_slide_from_raw(raw, default_section=sec_title, order=1)
+        slides = _repair_slides(slides, client=client, model=model)
+    return raw, slides
+
+
+def _run_in_order(fn: Callable[..., Any], jobs: List[Tuple[Any, ...]], concurrency: int) -> List[Any]:
+    """jobs 를 최대 concurrency 개씩 동시에 실행하고 결과를 jobs 순서대로 반환 (첫 예외는 그대로 raise)"""
+    if concurrency <= 1 or len(jobs) <= 1:
+        return [fn(*job) for job in jobs]
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(jobs)), thread_name_prefix="section-gen") as pool:
+        futures = [pool.submit(bind_context(fn), *job) for job in jobs]
+        try:
+            return [f.result() for f in futures]
+        except BaseException:
+            for f in futures:
+                f.cancel()
+            raise
+
+
 # -----------------------------
 # Node
 # -----------------------------
@@ -584,6 +646,8 @@ def section_deck_generation_node(state: Dict[str, Any]) -> Dict[str, Any]:
     deck_title = (state.get("deck_title") or "").strip()
     order_cursor = 1
 
+    # 1) 섹션별 프롬프트/분할 준비 (LLM 호출 없음)
+    plans: List[Dict[str, Any]] = []
     for s in sections:
         sec_title = re.sub(r"\s+", " ", (s.get("title") or "")).strip()  # ✅ 핵심: strip
         sec_text = (s.get("text") or "").strip()
@@ -609,7 +673,7 @@ def section_deck_generation_node(state: Dict[str, Any]) -> Dict[str, Any]:
         # 기관 소개는 DB 미연동 상태에서도 1장 고정 유지
         if sec_title == "기관 소개":
             one_slide = {
-                "order": order_cursor,
+                "order": 0,  # 조립 단계에서 부여
                 "section": "기관 소개",
                 "slide_title": "기관 소개 및 수행역량",
                 "key_message": "기관 정보 연동 대기",
@@ -627,12 +691,7 @@ def section_deck_generation_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 "DIAGRAM_SPEC_KO": "",
                 "CHART_SPEC_KO": "",
             }
-            section_decks[sec_title] = {
-                "section": sec_title,
-                "deck_title": deck_title or "발표자료",
-                "slides": [one_slide],
-            }
-            order_cursor += 1
+            plans.append({"kind": "fixed", "section": sec_title, "slide": one_slide})
             continue
 
         # Q&A는 여기서 만들지 않음(merge에서 강제 추가)
@@ -719,42 +778,49 @@ def section_deck_generation_node(state: Dict[str, Any]) -> Dict[str, Any]:
         prompt_for_section = f"{prompt}\n\n{common_rules}\n\n{section_rules}".strip()
         print("[DEBUG][gemini] section:", repr(sec_title), "chunks:", len(sec_chunks), "src_len:", len(sec_text))
 
-        section_slides: List[Dict[str, Any]] = []
-        for idx, chunk_text in enumerate(sec_chunks, 1):
-            chunk_header = f"[섹션: {sec_title}] [분할 {idx}/{len(sec_chunks)}]\n"
-            input_text = chunk_header + chunk_text
-            resp = generate_content_with_retry(
-                client,
-                model=state.get("gemini_model") or "gemini-2.5-flash",
-                contents=[prompt_for_section, input_text],
-                config=types.GenerateContentConfig(
-                    max_output_tokens=int(state.get("gemini_max_output_tokens") or 8192),
-                    temperature=float(state.get("gemini_temperature") or 0.4),
-                ),
-                max_retries=int(state.get("gemini_max_retries") or 5),
-            )
+        plans.append({"kind": "llm", "section": sec_title, "prompt": prompt_for_section, "chunks": sec_chunks})
+
+    # 2) 모든 (섹션, 분할) 호출을 동시에 실행 (결과는 입력 순서대로)
+    jobs: List[Tuple[Any, ...]] = []
+    for plan_idx, plan in enumerate(plans):
+        if plan["kind"] != "llm":
+            continue
+        for idx, chunk_text in enumerate(plan["chunks"], 1):
+            jobs.append((plan_idx, client, state, plan["prompt"], plan["section"], idx, len(plan["chunks"]), chunk_text))
+
+    concurrency = int(state.get("gemini_concurrency") or GEMINI_SECTION_CONCURRENCY)
+    started = time.perf_counter()
+    trips_before = gemini_cooldown.trips
+    outputs = _run_in_order(_generate_chunk_slides, [job[1:] for job in jobs], concurrency)
+    print(
+        f"[DEBUG][gemini] section calls: {len(jobs)} (concurrency={max(1, concurrency)}) "
+        f"{time.perf_counter() - started:.1f}s, rate-limit cooldowns: {gemini_cooldown.trips - trips_before}"
+    )
+    chunk_outputs: Dict[int, List[Tuple[str, List[Dict[str, Any]]]]] = {}
+    for job, out in zip(jobs, outputs):
+        chunk_outputs.setdefault(job[0], []).append(out)
+
+    # 3) 원래 섹션 순서대로 조립 (deck_title / order_cursor 는 순차 실행과 동일하게 결정)
+    for plan_idx, plan in enumerate(plans):
+        sec_title = plan["section"]
+        if plan["kind"] == "fixed":
+            one_slide = dict(plan["slide"], order=order_cursor)
+            section_decks[sec_title] = {
+                "section": sec_title,
+                "deck_title": deck_title or "발표자료",
+                "slides": [one_slide],
+            }
+            order_cursor += 1
+            continue
 
-            raw = (getattr(resp, "text", None) or "").strip()
-            print("[DEBUG][gemini] raw_len:", len(raw), "section:", repr(sec_title), "chunk:", idx)
+        section_slides: List[Dict[str, Any]] = []
+        for raw, slides in chunk_outputs.get(plan_idx, []):
             if not raw:
                 continue
 
             if not deck_title:
                 deck_title = _parse_deck_title(raw).strip()
 
-            slides = _parse_slides_from_text(raw, default_section=sec_title, start_order=order_cursor + len(section_slides))
-            slides = _repair_slides(
-                slides,
-                client=client,
-                model=state.get("gemini_model") or "gemini-2.5-flash",
-            )
-            if not slides:
-                slides = _fallback_slide_from_raw(raw, default_section=sec_title, order=order_cursor + len(section_slides))
-                slides = _repair_slides(
-                    slides,
-                    client=client,
-                    model=state.get("gemini_model") or "gemini-2.5-flash",
-                )
             if slides:
                 section_slides.extend(slides)
 
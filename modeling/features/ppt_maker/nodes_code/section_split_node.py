@@ -236,6 +236,8 @@ def _gemini_reclassify_ambiguous(
 
     try:
         from google import genai
+
+        from .llm_utils import generate_content_with_retry
     except Exception:
         print("[WARN][section_split] google.genai not available; skip Gemini reclassify")
         return {}
@@ -263,7 +265,7 @@ def _gemini_reclassify_ambiguous(
     )
 
     try:
-        resp = client.models.generate_content(model=model, contents=prompt)
+        resp = generate_content_with_retry(client, model=model, contents=prompt, max_retries=2)
         raw = getattr(resp, "text", "") or ""
         data = json.loads(_extract_json_block(raw))
         out: Dict[int, str] = {}
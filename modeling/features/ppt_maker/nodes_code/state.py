@@ -37,6 +37,7 @@ class GraphState(TypedDict, total=False):
     gemini_temperature: float
     gemini_max_output_tokens: int
     gemini_max_retries: int
+    gemini_concurrency: int
     gemini_image_model: str
 
     # Gamma options/results
@@ -50,12 +51,22 @@ class GraphState(TypedDict, total=False):
     # Final result
     final_ppt_path: str
 
+    # Postprocess results (postprocess_diagrams.py)
+    # generated_diagram_images[slide idx] = 삽입한 이미지 경로, postprocess_timings[단계] = 초
+    generated_diagram_images: Dict[str, str]
+    postprocess_timings: Dict[str, float]
+
+    # Run trace (run_trace.py): 노드/LLM 호출 기록 id, 저장 경로
+    trace_id: str
+    trace_path: str
+
     # Optional postprocess options
     font_name: str
     force_rewrite_agenda: bool
     save_checkpoint: bool
     enable_gemini_diagram_images: bool
     gemini_image_max_count: int
+    gemini_image_concurrency: int
     gemini_cover_image_only: bool
     min_slide_count: int
     postprocess_rewrite_cover: bool
@@ -73,12 +73,13 @@ def extract_text_from_pptx(pptx_path: str) -> str:
         return None
 
 
-def main(pptx_path: str = None):
+def main(pptx_path: str = None, output_path: str = None):
     """
     Step 4: PPT 발표 대본 및 Q&A 생성 메인 함수
     
     Args:
         pptx_path: PPT 파일 경로 (선택적, 없으면 기본 경로 사용)
+        output_path: 결과 JSON 경로 (선택적, 없으면 data/report/script_flow.json)
     
     Returns:
         dict: 생성된 스크립트 데이터 또는 None
@@ -128,9 +129,11 @@ def main(pptx_path: str = None):
     
     # 4. 결과 저장
     if json_data:
-        output_folder = project_root / "data" / "report"
-        output_folder.mkdir(parents=True, exist_ok=True)
-        output_path = output_folder / "script_flow.json"
+        if output_path:
+            output_path = Path(output_path)
+        else:
+            output_path = project_root / "data" / "report" / "script_flow.json"
+        output_path.parent.mkdir(parents=True, exist_ok=True)
         
         with open(output_path, "w", encoding="utf-8") as f:
             json.dump(json_data, f, ensure_ascii=False, indent=2)
@@ -30,13 +30,15 @@ def generate_script_and_qna(ppt_text: str) -> dict:
         print("[오류] GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
         return None
     
+    from utils.llm_gateway import llm_gateway
     client = genai.Client(api_key=api_key)
     
     # 프롬프트 구성
     prompt = f""" 아래 PPT 텍스트 데이터의 맥락을 깊이 있게 분석하여 실전 발표용 리포트를 생성하세요. [PPT 내용]{ppt_text} [생성 가이드라인] 1. 분석 단계: 각 슬라이드의 데이터(수치, 기술명 등)를 철저히 분석할 것 2. 구성 단계: 서론-본론-결론의 논리적 완결성을 갖춘 대본을 작성할 것 3. Q&A 단계: 질문 5개 이상을 도출하되, 실제 R&D 심사장에서 나올 법한 날카로운 질문을 포함할 것 4. 최종 제약: 반드시 JSON 형식만 출력하고, 다른 설명 문구는 생략할 것 [JSON 구조 준수] {{   "slides": [     {{"page": 1, "title": "제목", "script": "내용"}}   ],   "qna": [     {{"question": "질문", "answer": "답변", "tips": "유의사항"}}   ] }} """
     
     try:
-        response = client.models.generate_content(
+        response = llm_gateway.generate_content(
+            client,
             model=GEMINI_MODEL_NAME,
             contents=prompt,
             config=types.GenerateContentConfig(
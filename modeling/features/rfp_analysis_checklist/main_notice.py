@@ -10,11 +10,12 @@ import os
 import json
 import re
 import platform
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from google import genai
-import mysql.connector
 import chromadb
-from sentence_transformers import SentenceTransformer
 
 # .env 파일 로드
 load_dotenv()
@@ -25,6 +26,7 @@ load_dotenv()
 CHROMA_DB_DIR = os.environ.get("LAW_CHROMA_DB_DIR", r"C:/chroma_law")
 COLLECTION_NAME = os.environ.get("LAW_COLLECTION_NAME", "law_regulations")
 EMBED_MODEL_NAME = os.environ.get("LAW_EMBED_MODEL_NAME", "intfloat/multilingual-e5-base")
+LAW_COLLECTION_KEY = f"law:{os.environ.get('LAW_CHROMA_HOST','chroma_law')}:{os.environ.get('LAW_CHROMA_PORT','8000')}/{COLLECTION_NAME}"
 
 # 전역 캐시
 _chroma_client = None
@@ -33,21 +35,37 @@ _embed_model = None
 # =========================================================
 # ChromaDB 초기화
 # =========================================================
+def _connect_law_chroma():
+    """ChromaDB 법령 컬렉션 (클라이언트는 한 번만 생성)"""
+    global _chroma_client
+    if _chroma_client is None:
+        _chroma_client = chromadb.HttpClient(host=os.environ.get("LAW_CHROMA_HOST","chroma_law"), port=int(os.environ.get("LAW_CHROMA_PORT","8000")))
+    return _chroma_client.get_collection(name=COLLECTION_NAME)
+
+def _fetch_law_collection_version() -> str:
+    """컬렉션을 다시 조회해 버전 확인 (재적재/재빌드됐으면 새 컬렉션으로 교체)"""
+    global _chroma_collection
+    from utils.retrieval_backend import open_collection
+    from utils.retrieval_cache import collection_version_of
+    _chroma_collection = open_collection("law", _connect_law_chroma)
+    return collection_version_of(_chroma_collection)
+
 def init_law_search():
     """ChromaDB 및 임베딩 모델 초기화 (전역 캐싱)"""
-    global _chroma_client, _chroma_collection, _embed_model
+    global _chroma_collection, _embed_model
     
     if _chroma_collection is not None and _embed_model is not None:
         return _chroma_collection, _embed_model
     
     print("ChromaDB 초기화 중...")
     
-    # ChromaDB 클라이언트
-    _chroma_client = chromadb.HttpClient(host=os.environ.get("LAW_CHROMA_HOST","chroma_law"), port=int(os.environ.get("LAW_CHROMA_PORT","8000")))
-    _chroma_collection = _chroma_client.get_collection(name=COLLECTION_NAME)
+    # 검색 백엔드 (LAW_RETRIEVAL_BACKEND=local 이면 프로세스 내 인덱스, 기본은 ChromaDB)
+    from utils.retrieval_backend import open_collection
+    _chroma_collection = open_collection("law", _connect_law_chroma)
     
-    # 임베딩 모델
-    _embed_model = SentenceTransformer(EMBED_MODEL_NAME)
+    # 임베딩 모델 (Step 2 전략 검색과 같은 인스턴스 공유)
+    from utils.embedding_models import get_embedding_model
+    _embed_model = get_embedding_model(EMBED_MODEL_NAME)
     
     print(f"✓ ChromaDB 로드 완료 (문서 수: {_chroma_collection.count()}개)")
     
@@ -104,25 +122,53 @@ def search_law_regulations(
             }
         ]
     """
-    collection, model = init_law_search()
-    
-    # 쿼리 임베딩 생성
-    query_embedding = model.encode([f"query: {query_text}"]).tolist()
+    return search_law_regulations_batch([query_text], top_k=top_k, score_threshold=score_threshold)[0]
+
+def search_law_regulations_batch(
+    query_texts: list[str],
+    top_k: int = 5,
+    score_threshold: float = 0.5
+) -> list[list[dict]]:
+    """
+    여러 쿼리를 한 번에 검색 (임베딩 1회 배치 + 컬렉션 조회 1회)
     
-    # ChromaDB 검색
-    results = collection.query(
-        query_embeddings=query_embedding,
+    Returns:
+        query_texts 순서대로 search_law_regulations 와 같은 형식의 결과 리스트
+    """
+    if not query_texts:
+        return []
+
+    from utils.retrieval_backend import collection_key
+    from utils.retrieval_cache import collection_version, embed_queries, query_collection
+
+    _, model = init_law_search()
+    cache_key = collection_key("law", LAW_COLLECTION_KEY)
+    
+    # 쿼리 임베딩 생성 (같은 법령명은 임베딩 캐시 재사용, 나머지는 한 번의 encode 배치)
+    queries = [f"query: {q}" for q in query_texts]
+    query_embeddings = embed_queries(EMBED_MODEL_NAME, model, queries)
+    
+    # ChromaDB 검색 (결과 캐시 → miss 인 쿼리만 한 번에 조회, 컬렉션이 바뀌면 자동 무효화)
+    version = collection_version(cache_key, _fetch_law_collection_version)
+    results = query_collection(
+        _chroma_collection,
+        cache_key,
+        version,
+        queries,
+        query_embeddings,
         n_results=top_k,
-        include=["metadatas", "documents", "distances"]
     )
     
-    # 결과 정리
+    return [_law_results_of(results, qi, score_threshold) for qi in range(len(queries))]
+
+def _law_results_of(results: dict, qi: int, score_threshold: float) -> list[dict]:
+    """query 결과의 qi 번째 쿼리를 법령 조항 dict 리스트로 정리"""
     law_results = []
     
-    for i in range(len(results['ids'][0])):
-        meta = results['metadatas'][0][i] or {}
-        doc = results['documents'][0][i]
-        distance = results['distances'][0][i]
+    for i in range(len(results['ids'][qi])):
+        meta = results['metadatas'][qi][i] or {}
+        doc = results['documents'][qi][i]
+        distance = results['distances'][qi][i]
         score = 1 - distance  # 거리를 유사도로 변환
         
         # 임계값 필터링
@@ -163,13 +209,8 @@ def search_for_eligibility(requirement_text: str) -> list[dict]:
     
     # 2. 법령명이 있으면 법령별로 검색
     if law_names:
-        for law_name in law_names[:5]:  # 최대 5개 법령
-            # 법령명으로 검색
-            results = search_law_regulations(
-                query_text=law_name,
-                top_k=2,  # 법령당 2개 조항
-                score_threshold=0.6
-            )
+        # 법령명으로 검색 (최대 5개 법령, 법령당 2개 조항)
+        for results in search_law_regulations_batch(law_names[:5], top_k=2, score_threshold=0.6):
             all_results.extend(results)
     
     # 3. 법령명이 없으면 텍스트 전체로 검색
@@ -186,14 +227,9 @@ def search_for_eligibility(requirement_text: str) -> list[dict]:
 # DB 연결
 # =========================================================
 def get_db_conn():
-    """MySQL 커넥션 생성"""
-    return mysql.connector.connect(
-        host=os.environ["DB_HOST"],
-        port=int(os.environ.get("DB_PORT", "3306")),
-        user=os.environ["DB_USER"],
-        password=os.environ["DB_PASSWORD"],
-        database=os.environ["DB_NAME"],
-    )
+    """MySQL 커넥션 (공용 커넥션 풀에서 빌림, close() 시 반납)"""
+    from utils.db_pool import get_connection
+    return get_connection()
 
 # =========================================================
 # DB에서 사업보고서 섹션 JSON 조회
@@ -547,6 +583,42 @@ def analysis_prompt(
 주의: JSON 응답만 출력하고, ```json 같은 코드 블록은 사용하지 마라.
 """.strip()
 
+# =========================================================
+# 자격요건 판정 입력 준비 (사업보고서 / 법령 조항)
+# =========================================================
+def load_company_business_report(company_id: int | None = None) -> dict:
+    """company_id 의 사업보고서 섹션 조회 (None 이면 DEFAULT_COMPANY_ID)"""
+    if company_id is None:
+        company_id = get_default_company_id()
+        if company_id is None:
+            raise RuntimeError("company_id를 찾을 수 없습니다.")
+
+    print(f"DB에서 사업보고서 조회 중... (company_id: {company_id})")
+    business_report_sections = load_business_report_from_db(company_id)
+    print(f"✓ 사업보고서 로드 완료 (섹션 수: {len(business_report_sections)}개)")
+    return business_report_sections
+
+def retrieve_law_articles(announcement_chunks: list[dict]) -> list[dict]:
+    """공고문에서 법령명을 뽑아 관련 조항 검색 (최대 5개 법령, 한 번의 배치 검색)"""
+    print("관련 법령 조항 검색 중...")
+    
+    # 모든 공고문 청크를 합쳐서 법령 검색
+    full_announcement_text = "\n".join([chunk['text'] for chunk in announcement_chunks])
+    
+    # 법령명 추출
+    law_names = extract_law_names(full_announcement_text)
+    print(f"✓ 추출된 법령명: {law_names}")
+    
+    # 법령 조항 검색
+    law_articles = []
+    if law_names:
+        for results in search_law_regulations_batch(law_names[:5], top_k=2, score_threshold=0.6):
+            law_articles.extend(results)
+        print(f"✓ 검색된 법령 조항: {len(law_articles)}개")
+    else:
+        print("  법령명을 찾을 수 없어 법령 검색을 건너뜁니다.")
+    return law_articles
+
 # =========================================================
 # Gemini 호출 - 자격요건 자동 판정
 # =========================================================
@@ -556,6 +628,8 @@ def eligibility_judgment(
     model: str = "gemini-2.5-flash",
     temperature: float = 0.2,
     company_id: int | None = None,
+    business_report_sections: dict | None = None,
+    law_articles: list[dict] | None = None,
 ) -> dict:
     """
     공고문 자격요건을 분석하여 자동 판정 결과 반환
@@ -566,6 +640,8 @@ def eligibility_judgment(
         model: Gemini 모델명
         temperature: 생성 온도
         company_id: 기업 ID
+        business_report_sections: 미리 조회한 사업보고서 (없으면 DB에서 조회)
+        law_articles: 미리 검색한 법령 조항 (없으면 여기서 검색)
     
     Returns:
         dict: JSON 형식의 자격요건 자동 판정 결과
@@ -574,38 +650,16 @@ def eligibility_judgment(
     if not api_key:
         raise RuntimeError("환경변수 GEMINI_API_KEY가 설정되어 있지 않습니다.")
 
-    # company_id 설정
-    if company_id is None:
-        company_id = get_default_company_id()
-        if company_id is None:
-            raise RuntimeError("company_id를 찾을 수 없습니다.")
-
     # DB에서 사업보고서 섹션 JSON 조회
-    print(f"DB에서 사업보고서 조회 중... (company_id: {company_id})")
-    business_report_sections = load_business_report_from_db(company_id)
-    print(f"✓ 사업보고서 로드 완료 (섹션 수: {len(business_report_sections)}개)")
+    if business_report_sections is None:
+        business_report_sections = load_company_business_report(company_id)
 
     # ChromaDB에서 관련 법령 조항 검색
-    print("관련 법령 조항 검색 중...")
-    
-    # 모든 공고문 청크를 합쳐서 법령 검색
-    full_announcement_text = "\n".join([chunk['text'] for chunk in announcement_chunks])
-    
-    # 법령명 추출
-    law_names = extract_law_names(full_announcement_text)
-    print(f"✓ 추출된 법령명: {law_names}")
-    
-    # 법령 조항 검색
-    law_articles = []
-    if law_names:
-        for law_name in law_names[:5]:  # 최대 5개 법령
-            results = search_law_regulations(law_name, top_k=2, score_threshold=0.6)
-            law_articles.extend(results)
-        print(f"✓ 검색된 법령 조항: {len(law_articles)}개")
-    else:
-        print("  법령명을 찾을 수 없어 법령 검색을 건너뜁니다.")
+    if law_articles is None:
+        law_articles = retrieve_law_articles(announcement_chunks)
 
     # 프롬프트 생성
+    from utils.llm_gateway import llm_gateway
     client = genai.Client(api_key=api_key)
     prompt = eligibility_prompt(
         announcement_chunks,
@@ -615,7 +669,8 @@ def eligibility_judgment(
     )
 
     print("\n자격요건 자동 판정 중...")
-    response = client.models.generate_content(
+    response = llm_gateway.generate_content(
+        client,
         model=model,
         contents=prompt,
         config=genai.types.GenerateContentConfig(
@@ -671,16 +726,40 @@ def run_notice_step1(notice_id: int, company_id: int = 1) -> dict:
     elif title:
         source = title
 
-    checklist_json = eligibility_judgment(
-        announcement_chunks=announcement_chunks,
-        source=source,
-        company_id=company_id,
-    )
-    analysis_json = deep_analysis(
-        announcement_chunks=announcement_chunks,
-        rfp_chunks=None,
-        source=source,
-    )
+    # 의존 관계
+    #   business_report ─┐
+    #   law_retrieval ───┴→ eligibility (LLM)
+    #   deep_analysis (LLM, 독립)
+    # eligibility 를 제외한 세 갈래를 동시에 시작하므로 전체 시간 ≈ max(준비 + 판정, 심층 분석)
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="step1") as pool:
+        analysis_future = pool.submit(
+            _timed, timings, "deep_analysis", deep_analysis,
+            announcement_chunks=announcement_chunks,
+            rfp_chunks=None,
+            source=source,
+        )
+        report_future = pool.submit(_timed, timings, "business_report", load_company_business_report, company_id)
+        law_future = pool.submit(_timed, timings, "law_retrieval", retrieve_law_articles, announcement_chunks)
+
+        try:
+            checklist_json = _timed(
+                timings, "eligibility", eligibility_judgment,
+                announcement_chunks=announcement_chunks,
+                source=source,
+                company_id=company_id,
+                business_report_sections=report_future.result(),
+                law_articles=law_future.result(),
+            )
+            analysis_json = analysis_future.result()
+        except BaseException:
+            # 아직 시작하지 않은 갈래는 취소 (실행 중인 LLM 호출은 끝날 때까지 기다린다)
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    timings["total"] = round(time.perf_counter() - started, 3)
+    print("[Step 1] 단계별 시간(s): " + ", ".join(f"{k}={v}" for k, v in timings.items()))
+    _record_step1_timings(timings)
 
     saved = save_step1_results(
         notice_id=notice_id,
@@ -690,6 +769,37 @@ def run_notice_step1(notice_id: int, company_id: int = 1) -> dict:
 
     return {"checklist": checklist_json, "analysis": analysis_json, "saved": saved}
 
+def _timed(timings: dict, name: str, fn, *args, **kwargs):
+    """fn 실행 시간을 timings[name] 에 기록 (실패해도 기록)"""
+    t0 = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        timings[name] = round(time.perf_counter() - t0, 3)
+
+# 단계별 시간은 응답/저장 결과에 넣지 않고 /api/metrics 의 step1 으로만 노출 (프로세스 단위 누적)
+_step1_stats_lock = threading.Lock()
+_step1_stats: dict = {"runs": 0, "last": {}, "sum_sec": {}, "max_sec": {}}
+
+def _record_step1_timings(timings: dict) -> None:
+    with _step1_stats_lock:
+        _step1_stats["runs"] += 1
+        _step1_stats["last"] = dict(timings)
+        for name, sec in timings.items():
+            _step1_stats["sum_sec"][name] = _step1_stats["sum_sec"].get(name, 0.0) + sec
+            _step1_stats["max_sec"][name] = max(_step1_stats["max_sec"].get(name, 0.0), sec)
+
+def step1_timing_stats() -> dict:
+    """Step 1 단계별 시간: 실행 횟수, 마지막 실행, 평균/최대 (초)"""
+    with _step1_stats_lock:
+        runs = _step1_stats["runs"]
+        return {
+            "runs": runs,
+            "last_sec": dict(_step1_stats["last"]),
+            "avg_sec": {k: round(v / runs, 3) for k, v in _step1_stats["sum_sec"].items()} if runs else {},
+            "max_sec": dict(_step1_stats["max_sec"]),
+        }
+
 # =========================================================
 # Gemini 호출 - 심층 분석
 # =========================================================
@@ -717,11 +827,13 @@ def deep_analysis(
     if not api_key:
         raise RuntimeError("환경변수 GEMINI_API_KEY가 설정되어 있지 않습니다.")
     
+    from utils.llm_gateway import llm_gateway
     client = genai.Client(api_key=api_key)
     prompt = analysis_prompt(announcement_chunks, rfp_chunks, source)
     
     print("공고문 심층 분석 중...")
-    response = client.models.generate_content(
+    response = llm_gateway.generate_content(
+        client,
         model=model,
         contents=prompt,
         config=genai.types.GenerateContentConfig(
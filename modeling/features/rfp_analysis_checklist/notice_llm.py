@@ -10,12 +10,9 @@ import os
 import json
 import re
 import platform
-from urllib.parse import urlparse
 from dotenv import load_dotenv
 from google import genai
-import mysql.connector
 import chromadb
-from sentence_transformers import SentenceTransformer
 
 # .env 파일 로드
 load_dotenv()
@@ -26,6 +23,7 @@ load_dotenv()
 CHROMA_DB_DIR = os.environ.get("LAW_CHROMA_DB_DIR", r"C:/chroma_law")
 COLLECTION_NAME = os.environ.get("LAW_COLLECTION_NAME", "law_regulations")
 EMBED_MODEL_NAME = os.environ.get("LAW_EMBED_MODEL_NAME", "intfloat/multilingual-e5-base")
+LAW_COLLECTION_KEY = f"law:{CHROMA_DB_DIR}/{COLLECTION_NAME}"
 
 # 전역 캐시
 _chroma_client = None
@@ -34,21 +32,37 @@ _embed_model = None
 # =========================================================
 # ChromaDB 초기화
 # =========================================================
+def _connect_law_chroma():
+    """ChromaDB 법령 컬렉션 (클라이언트는 한 번만 생성)"""
+    global _chroma_client
+    if _chroma_client is None:
+        _chroma_client = chromadb.PersistentClient(path=CHROMA_DB_DIR)
+    return _chroma_client.get_collection(name=COLLECTION_NAME)
+
+def _fetch_law_collection_version() -> str:
+    """컬렉션을 다시 조회해 버전 확인 (재적재/재빌드됐으면 새 컬렉션으로 교체)"""
+    global _chroma_collection
+    from utils.retrieval_backend import open_collection
+    from utils.retrieval_cache import collection_version_of
+    _chroma_collection = open_collection("law", _connect_law_chroma)
+    return collection_version_of(_chroma_collection)
+
 def init_law_search():
     """ChromaDB 및 임베딩 모델 초기화 (전역 캐싱)"""
-    global _chroma_client, _chroma_collection, _embed_model
+    global _chroma_collection, _embed_model
     
     if _chroma_collection is not None and _embed_model is not None:
         return _chroma_collection, _embed_model
     
     print("ChromaDB 초기화 중...")
     
-    # ChromaDB 클라이언트
-    _chroma_client = chromadb.PersistentClient(path=CHROMA_DB_DIR)
-    _chroma_collection = _chroma_client.get_collection(name=COLLECTION_NAME)
+    # 검색 백엔드 (LAW_RETRIEVAL_BACKEND=local 이면 프로세스 내 인덱스, 기본은 ChromaDB)
+    from utils.retrieval_backend import open_collection
+    _chroma_collection = open_collection("law", _connect_law_chroma)
     
-    # 임베딩 모델
-    _embed_model = SentenceTransformer(EMBED_MODEL_NAME)
+    # 임베딩 모델 (Step 2 전략 검색과 같은 인스턴스 공유)
+    from utils.embedding_models import get_embedding_model
+    _embed_model = get_embedding_model(EMBED_MODEL_NAME)
     
     print(f"✓ ChromaDB 로드 완료 (문서 수: {_chroma_collection.count()}개)")
     
@@ -105,16 +119,25 @@ def search_law_regulations(
             }
         ]
     """
-    collection, model = init_law_search()
-    
-    # 쿼리 임베딩 생성
-    query_embedding = model.encode([f"query: {query_text}"]).tolist()
-    
-    # ChromaDB 검색
-    results = collection.query(
-        query_embeddings=query_embedding,
+    from utils.retrieval_backend import collection_key
+    from utils.retrieval_cache import collection_version, embed_queries, query_collection
+
+    _, model = init_law_search()
+    cache_key = collection_key("law", LAW_COLLECTION_KEY)
+    
+    # 쿼리 임베딩 생성 (같은 법령명은 임베딩 캐시 재사용)
+    query = f"query: {query_text}"
+    query_embedding = embed_queries(EMBED_MODEL_NAME, model, [query])
+    
+    # ChromaDB 검색 (결과 캐시 → miss 일 때만 조회, 컬렉션이 바뀌면 자동 무효화)
+    version = collection_version(cache_key, _fetch_law_collection_version)
+    results = query_collection(
+        _chroma_collection,
+        cache_key,
+        version,
+        [query],
+        query_embedding,
         n_results=top_k,
-        include=["metadatas", "documents", "distances"]
     )
     
     # 결과 정리
@@ -187,32 +210,9 @@ def search_for_eligibility(requirement_text: str) -> list[dict]:
 # DB 연결
 # =========================================================
 def get_db_conn():
-    """MySQL 커넥션 생성"""
-    # DB_URL / DB_USERNAME / DB_PASSWORD 우선 지원
-    db_url = (os.environ.get("DB_URL") or "").strip()
-    db_user = (os.environ.get("DB_USERNAME") or os.environ.get("DB_USER") or "").strip()
-    db_pw = os.environ.get("DB_PASSWORD") or ""
-    if db_url.lower().startswith("jdbc:"):
-        db_url = db_url[5:]
-    if db_url:
-        parsed = urlparse(db_url)
-        if parsed.hostname:
-            db_name = (parsed.path or "/").lstrip("/") or os.environ.get("DB_NAME") or ""
-            return mysql.connector.connect(
-                host=parsed.hostname,
-                port=int(parsed.port or 3306),
-                user=db_user or (parsed.username or ""),
-                password=db_pw or (parsed.password or ""),
-                database=db_name,
-            )
-
-    return mysql.connector.connect(
-        host=os.environ["DB_HOST"],
-        port=int(os.environ.get("DB_PORT", "3306")),
-        user=os.environ["DB_USER"],
-        password=os.environ["DB_PASSWORD"],
-        database=os.environ["DB_NAME"],
-    )
+    """MySQL 커넥션 (공용 커넥션 풀에서 빌림, close() 시 반납)"""
+    from utils.db_pool import get_connection
+    return get_connection()
 # =========================================================
 # DB에서 사업보고서 섹션 JSON 조회
 # =========================================================
@@ -624,6 +624,7 @@ def eligibility_judgment(
         print("  법령명을 찾을 수 없어 법령 검색을 건너뜁니다.")
 
     # 프롬프트 생성
+    from utils.llm_gateway import llm_gateway
     client = genai.Client(api_key=api_key)
     prompt = eligibility_prompt(
         announcement_chunks,
@@ -633,7 +634,8 @@ def eligibility_judgment(
     )
 
     print("\n자격요건 자동 판정 중...")
-    response = client.models.generate_content(
+    response = llm_gateway.generate_content(
+        client,
         model=model,
         contents=prompt,
         config=genai.types.GenerateContentConfig(
@@ -689,11 +691,13 @@ def deep_analysis(
     if not api_key:
         raise RuntimeError("환경변수 GEMINI_API_KEY가 설정되어 있지 않습니다.")
     
+    from utils.llm_gateway import llm_gateway
     client = genai.Client(api_key=api_key)
     prompt = analysis_prompt(announcement_chunks, rfp_chunks, source)
     
     print("공고문 심층 분석 중...")
-    response = client.models.generate_content(
+    response = llm_gateway.generate_content(
+        client,
         model=model,
         contents=prompt,
         config=genai.types.GenerateContentConfig(
@@ -823,8 +827,10 @@ def extract_org_profile(company_id: int, model: str = "gemini-2.5-flash", temper
     company_profile = load_company_profile_from_db(company_id)
     prompt = org_profile_prompt(company_profile)
 
+    from utils.llm_gateway import llm_gateway
     client = genai.Client(api_key=api_key)
-    response = client.models.generate_content(
+    response = llm_gateway.generate_content(
+        client,
         model=model,
         contents=prompt,
         config=genai.types.GenerateContentConfig(
@@ -54,6 +54,7 @@ def summarize_report(new_project_info: dict, track_a: list, track_b: list) -> di
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key: return {"error": "No API Key"}
 
+    from utils.llm_gateway import llm_gateway
     client = genai.Client(api_key=api_key)
     
     # Context 텍스트 구성
@@ -105,7 +106,8 @@ def summarize_report(new_project_info: dict, track_a: list, track_b: list) -> di
     """
 
     try:
-        response = client.models.generate_content(
+        response = llm_gateway.generate_content(
+            client,
             model=GEMINI_MODEL_NAME,
             contents=prompt,
             config=types.GenerateContentConfig(
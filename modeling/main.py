@@ -1,20 +1,40 @@
 # main.py (정리된 버전)
 import os
+import json
+import time
 import uuid
-import requests
+import shutil
 import chromadb
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
 from features.rnd_search.main_search import main as run_search
 from features.ppt_script.main_script import main as run_script_gen
+from features.rfp_analysis_checklist.main_notice import step1_timing_stats
 
 load_dotenv()
 
-from utils.document_parsing import parse_docx_to_blocks, extract_text_from_pdf
+from utils.document_parsing import parse_docx_to_blocks, extract_text_from_pdf, iter_text_from_pdf
+from utils.analysis_jobs import (
+    build_step3_result,
+    run_step1_job,
+    run_step2_job,
+    run_step3_job,
+    run_step4_job,
+    save_script_to_spring,
+    start_step3_job,
+)
+from utils.db_pool import close_db_pool, db_pool_stats
+from utils.embedding_models import embedding_model_stats, warmup_embedding_models
+from utils.parse_cache import parse_cache
+from utils.pdf_parallel import shutdown_pdf_pool
+from utils.retrieval_cache import invalidate as invalidate_retrieval_cache, retrieval_cache_stats
+from utils.llm_gateway import llm_gateway_stats
+from utils.job_queue import JobQueue, JobStore, STATUS_FAILED, STATUS_SUCCEEDED, step_pool_config
+from features.ppt_maker.nodes_code.gamma_client import close_gamma_scheduler, gamma_scheduler_stats
 
 app = FastAPI()
 
@@ -106,7 +126,7 @@ async def parse_notice(file: UploadFile = File(...)):
         elif ext == ".docx":
             result = {
                 "file_type": "docx",
-                "content": parse_docx_to_blocks(tmp_path, "tmp")
+                "content": parse_docx_to_blocks(tmp_path, "tmp", save_media=False)
             }
         else:
             return JSONResponse(status_code=400, content={"error": f"Unsupported extension: {ext}"})
@@ -122,6 +142,74 @@ async def parse_notice(file: UploadFile = File(...)):
         if os.path.exists(tmp_path):
             os.remove(tmp_path)
 
+# ============================================
+# 파일 파싱 (스트리밍): 페이지가 추출되는 대로 NDJSON 한 줄씩 전송
+#   {"type":"meta",...} → {"type":"page",...}* → {"type":"end",...} (실패 시 {"type":"error",...})
+# ============================================
+PARSE_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _ndjson(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _stream_parse_records(tmp_path: str, filename: str, ext: str):
+    started = time.perf_counter()
+    page_count = 0
+    try:
+        if ext == ".pdf":
+            yield _ndjson({"type": "meta", "file_type": "pdf", "filename": filename})
+            for page in iter_text_from_pdf(tmp_path):
+                page_count += 1
+                yield _ndjson({"type": "page", **page})
+        else:
+            yield _ndjson({"type": "meta", "file_type": "docx", "filename": filename})
+            yield _ndjson({"type": "content", "content": parse_docx_to_blocks(tmp_path, "tmp", save_media=False)})
+
+        elapsed = round(time.perf_counter() - started, 2)
+        print(f"PARSE STREAM SUCCESS: {filename} ({page_count}p, {elapsed}s)")
+        yield _ndjson({"type": "end", "pages": page_count, "elapsed_sec": elapsed})
+
+    except Exception as e:
+        print(f"❌ PARSE STREAM FAILED: {filename} - {str(e)}")
+        yield _ndjson({"type": "error", "error": str(e), "pages": page_count})
+
+    finally:
+        # 클라이언트가 중간에 끊어도 generator close 시 임시 파일 정리
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@app.post("/parse/stream")
+async def parse_notice_stream(file: UploadFile = File(...)):
+    print(f"PARSE STREAM CALLED: {file.filename}")
+
+    ext = os.path.splitext(file.filename)[1].lower()
+    if ext not in (".pdf", ".docx"):
+        return JSONResponse(status_code=400, content={"error": f"Unsupported extension: {ext}"})
+
+    os.makedirs("tmp", exist_ok=True)
+    tmp_path = os.path.join("tmp", f"{uuid.uuid4().hex}{ext}")
+
+    # 업로드 전체를 메모리에 올리지 않고 청크 단위로 기록
+    try:
+        with open(tmp_path, "wb") as f:
+            while True:
+                chunk = await file.read(PARSE_UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        print(f"❌ PARSE STREAM FAILED: {file.filename} - {str(e)}")
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+    return StreamingResponse(
+        _stream_parse_records(tmp_path, file.filename, ext),
+        media_type="application/x-ndjson",
+    )
+
 # ============================================
 # 헬스체크
 # ============================================
@@ -129,6 +217,40 @@ async def parse_notice(file: UploadFile = File(...)):
 def health_check():
     return {"status": "ok", "message": "FastAPI is running"}
 
+# ============================================
+# 임베딩 모델 warm-up / 런타임 메트릭
+# ============================================
+@app.on_event("startup")
+def _warmup_embedding_models():
+    # EMBED_WARMUP=0 이면 첫 요청 때 로드 (로컬 개발용)
+    if os.getenv("EMBED_WARMUP", "1").strip().lower() in ("0", "false", "no"):
+        print("[Embedding] warm-up 생략 (EMBED_WARMUP=0)")
+        return
+    warmup_embedding_models()
+
+
+@app.get("/api/metrics")
+def get_metrics():
+    return {
+        "status": "success",
+        "data": {
+            "embedding_models": embedding_model_stats(),
+            "parse_cache": parse_cache.stats(),
+            "retrieval_cache": retrieval_cache_stats(),
+            "db_pool": db_pool_stats(),
+            "gamma": gamma_scheduler_stats(),
+            "llm": llm_gateway_stats(),
+            "step1": step1_timing_stats(),
+        },
+    }
+
+
+@app.post("/api/cache/invalidate")
+def invalidate_cache(collection_key: str = None):
+    # 벡터 DB 재적재 직후 호출 (collection_key 생략 시 검색 결과 캐시 전체)
+    dropped = invalidate_retrieval_cache(collection_key)
+    return {"status": "success", "dropped": dropped}
+
 # ============================================
 # 파싱 지원 형식 조회
 # ============================================
@@ -241,49 +363,7 @@ async def api_run_step3(
             render_mode=render_mode,
             gamma_timeout_sec=gamma_timeout_sec,
         )
-        if not isinstance(final_state, dict) or not final_state:
-            raise RuntimeError("run_ppt_generation returned empty result")
-
-        deck_json = final_state.get("deck_json") or {}
-        slides = deck_json.get("slides") if isinstance(deck_json, dict) else []
-        total_slides = len(slides) if isinstance(slides, list) else 0
-        if total_slides == 0:
-            try:
-                total_slides = int(final_state.get("total_slides") or 0)
-            except Exception:
-                total_slides = 0
-
-        deck_title = ""
-        if isinstance(deck_json, dict):
-            deck_title = str(deck_json.get("deck_title") or "").strip()
-        if not deck_title:
-            deck_title = str(final_state.get("deck_title") or "").strip()
-
-        def _pick_first_non_empty(*values):
-            for value in values:
-                if isinstance(value, str) and value.strip():
-                    return value.strip()
-            return ""
-
-        pptx_path = _pick_first_non_empty(
-            final_state.get("final_ppt_path"),
-            final_state.get("gamma_ppt_path"),
-            final_state.get("pptx_path"),
-        )
-        if not pptx_path:
-            raise RuntimeError("PPT generation failed: final pptx_path is empty")
-        print(f"  pptx_path={pptx_path}")
-
-        pptx_filename = os.path.basename(pptx_path)
-        download_url = f"/download/pptx/{pptx_filename}"
-
-        result = {
-            "deck_title": deck_title,
-            "total_slides": total_slides,
-            "pptx_path": pptx_path,
-            "pptx_filename": pptx_filename,
-            "download_url": download_url,
-        }
+        result = build_step3_result(final_state)
 
         return JSONResponse({"status": "success", "data": result})
 
@@ -318,30 +398,8 @@ async def api_run_step4(
         result = run_script_gen(pptx_path=tmp_path)
 
         if result:
-            # Spring Boot로 저장 요청(너가 원하면 여기만 남겨도 됨)
-            if notice_id and token:
-                try:
-                    spring_url = "http://localhost:8080/api/scripts/save"
-                    headers = {"Authorization": f"Bearer {token}"}
-                    payload = {
-                        "noticeId": notice_id,
-                        "slides": result.get("slides", []),
-                        "qna": result.get("qna", [])
-                    }
-
-                    spring_response = requests.post(
-                        spring_url,
-                        json=payload,
-                        headers=headers,
-                        timeout=10
-                    )
-
-                    if spring_response.status_code == 200:
-                        print("[Step 4] DB 저장 성공")
-                    else:
-                        print(f"[Step 4] DB 저장 실패: {spring_response.status_code}")
-                except Exception as e:
-                    print(f"[Step 4] Spring Boot 연동 오류: {str(e)}")
+            # Spring Boot로 저장 요청
+            save_script_to_spring(notice_id, token, result)
 
             return JSONResponse(content={"status": "success", "data": result}, status_code=200)
 
@@ -355,6 +413,123 @@ async def api_run_step4(
         if os.path.exists(tmp_path):
             os.remove(tmp_path)
 
+# ============================================
+# 비동기 작업 큐: Step 1~4 (submit → job_id → 상태/결과 조회)
+# ============================================
+JOB_UPLOAD_DIR = os.path.join("tmp", "jobs")
+
+job_queue = JobQueue(JobStore())
+job_queue.register("step1", run_step1_job, **step_pool_config("step1", default_workers=2))
+job_queue.register("step2", run_step2_job, **step_pool_config("step2", default_workers=2))
+# thread 실행이면 Gamma 렌더 대기 동안 워커를 반납하는 핸들러 사용 (process 는 future 를 넘길 수 없어 기존처럼 대기)
+step3_pool = step_pool_config("step3", default_workers=1)
+job_queue.register("step3", start_step3_job if step3_pool["executor"] == "thread" else run_step3_job, **step3_pool)
+job_queue.register("step4", run_step4_job, **step_pool_config("step4", default_workers=2))
+
+
+@app.on_event("startup")
+def _start_job_queue():
+    job_queue.start()
+
+
+@app.on_event("shutdown")
+def _stop_job_queue():
+    job_queue.shutdown(wait=False)
+    shutdown_pdf_pool()
+    close_db_pool()
+    close_gamma_scheduler()
+
+
+def _save_job_upload(file: UploadFile, job_id: str, ext: str) -> str:
+    os.makedirs(JOB_UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(JOB_UPLOAD_DIR, f"{job_id}{ext}")
+    with open(path, "wb") as f:
+        shutil.copyfileobj(file.file, f, length=1024 * 1024)
+    return path
+
+
+def _accepted(job_id: str):
+    return JSONResponse(
+        status_code=202,
+        content={"status": "accepted", "data": job_queue.status(job_id)},
+    )
+
+
+@app.post("/api/jobs/step1")
+def submit_step1_job(req: Step1Request):
+    job_id = job_queue.submit("step1", {"notice_id": req.notice_id, "company_id": req.company_id})
+    print(f"[Step 1] 작업 등록: job_id={job_id}, notice_id={req.notice_id}")
+    return _accepted(job_id)
+
+
+@app.post("/api/jobs/step2")
+def submit_step2_job(req: Step2Request):
+    job_id = job_queue.submit(
+        "step2",
+        {"notice_id": req.notice_id, "notice_text": req.notice_text, "ministry_name": req.ministry_name},
+    )
+    print(f"[Step 2] 작업 등록: job_id={job_id}, notice_id={req.notice_id}")
+    return _accepted(job_id)
+
+
+@app.post("/api/jobs/step3")
+def submit_step3_job(
+    file: UploadFile = File(...),
+    notice_id: int = Form(None),
+):
+    job_id = uuid.uuid4().hex
+    ext = os.path.splitext(file.filename)[1].lower()
+    file_path = _save_job_upload(file, job_id, ext)
+    payload = {
+        "file_path": file_path,
+        "notice_id": notice_id,
+        "render_mode": (os.getenv("PPT_RENDER_MODE", "gamma") or "gamma").strip().lower(),
+        "gamma_timeout_sec": int(os.getenv("PPT_GAMMA_TIMEOUT_SEC", "900")),
+    }
+    job_queue.submit("step3", payload, job_id=job_id)
+    print(f"[Step 3] 작업 등록: job_id={job_id}, file={file.filename}, notice_id={notice_id}")
+    return _accepted(job_id)
+
+
+@app.post("/api/jobs/step4")
+def submit_step4_job(
+    file: UploadFile = File(...),
+    notice_id: int = None,
+    token: str = None
+):
+    job_id = uuid.uuid4().hex
+    file_path = _save_job_upload(file, job_id, ".pptx")
+    payload = {"file_path": file_path, "notice_id": notice_id}
+    # token 은 jobs.sqlite3 에 남지 않도록 메모리로만 넘긴다
+    job_queue.submit("step4", payload, job_id=job_id, secrets={"token": token} if token else None)
+    print(f"[Step 4] 작업 등록: job_id={job_id}, file={file.filename}, notice_id={notice_id}")
+    return _accepted(job_id)
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job_status(job_id: str):
+    status = job_queue.status(job_id)
+    if not status:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return {"status": "success", "data": status}
+
+
+@app.get("/api/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    job = job_queue.result(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if job["status"] == STATUS_SUCCEEDED:
+        return JSONResponse(content={"status": "success", "data": job["result"]}, status_code=200)
+    if job["status"] == STATUS_FAILED:
+        return JSONResponse(status_code=500, content={"status": "error", "message": job["error"]})
+    return JSONResponse(status_code=202, content={"status": job["status"], "data": job_queue.status(job_id)})
+
+
+@app.get("/api/jobs")
+def get_job_stats():
+    return {"status": "success", "data": job_queue.stats()}
+
 # ============================================
 # 서버 실행
 # ============================================
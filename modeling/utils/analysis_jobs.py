@@ -0,0 +1,180 @@
+# utils/analysis_jobs.py
+"""
+Step 1~4 작업 핸들러
+
+main.py의 동기 엔드포인트와 비동기 작업 큐(utils/job_queue.py)가 같은 로직을 쓰도록
+단계별 실행 함수를 모아둔다. process pool에서도 실행되므로 모두 모듈 최상위 함수이고,
+무거운 feature 모듈은 함수 안에서 import 한다.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional
+
+import requests
+
+SPRING_SCRIPT_SAVE_URL = "http://localhost:8080/api/scripts/save"
+
+
+def _remove_quietly(path: Optional[str]) -> None:
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# =========================================================
+# Step 3 / Step 4 공통 결과 가공
+# =========================================================
+def build_step3_result(final_state: Any) -> Dict[str, Any]:
+    """run_ppt_generation 최종 state → API 응답 data"""
+    if not isinstance(final_state, dict) or not final_state:
+        raise RuntimeError("run_ppt_generation returned empty result")
+
+    deck_json = final_state.get("deck_json") or {}
+    slides = deck_json.get("slides") if isinstance(deck_json, dict) else []
+    total_slides = len(slides) if isinstance(slides, list) else 0
+    if total_slides == 0:
+        try:
+            total_slides = int(final_state.get("total_slides") or 0)
+        except Exception:
+            total_slides = 0
+
+    deck_title = ""
+    if isinstance(deck_json, dict):
+        deck_title = str(deck_json.get("deck_title") or "").strip()
+    if not deck_title:
+        deck_title = str(final_state.get("deck_title") or "").strip()
+
+    def _pick_first_non_empty(*values):
+        for value in values:
+            if isinstance(value, str) and value.strip():
+                return value.strip()
+        return ""
+
+    pptx_path = _pick_first_non_empty(
+        final_state.get("final_ppt_path"),
+        final_state.get("gamma_ppt_path"),
+        final_state.get("pptx_path"),
+    )
+    if not pptx_path:
+        raise RuntimeError("PPT generation failed: final pptx_path is empty")
+    print(f"  pptx_path={pptx_path}")
+
+    pptx_filename = os.path.basename(pptx_path)
+    return {
+        "deck_title": deck_title,
+        "total_slides": total_slides,
+        "pptx_path": pptx_path,
+        "pptx_filename": pptx_filename,
+        "download_url": f"/download/pptx/{pptx_filename}",
+    }
+
+
+def save_script_to_spring(notice_id: Optional[int], token: Optional[str], result: Dict[str, Any]) -> None:
+    """Step 4 결과를 Spring Boot에 저장 요청 (notice_id/token 둘 다 있을 때만)"""
+    if not (notice_id and token):
+        return
+    try:
+        headers = {"Authorization": f"Bearer {token}"}
+        payload = {
+            "noticeId": notice_id,
+            "slides": result.get("slides", []),
+            "qna": result.get("qna", []),
+        }
+        spring_response = requests.post(SPRING_SCRIPT_SAVE_URL, json=payload, headers=headers, timeout=10)
+        if spring_response.status_code == 200:
+            print("[Step 4] DB 저장 성공")
+        else:
+            print(f"[Step 4] DB 저장 실패: {spring_response.status_code}")
+    except Exception as e:
+        print(f"[Step 4] Spring Boot 연동 오류: {str(e)}")
+
+
+# =========================================================
+# 작업 핸들러 (payload: dict → result: dict)
+# =========================================================
+def run_step1_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from features.rfp_analysis_checklist.main_notice import run_notice_step1
+
+    return run_notice_step1(
+        notice_id=int(payload["notice_id"]),
+        company_id=int(payload.get("company_id") or 1),
+    )
+
+
+def run_step2_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from features.rnd_search.main_search import main as run_search
+
+    return run_search(
+        notice_id=payload.get("notice_id"),
+        notice_text=payload.get("notice_text"),
+        ministry_name=payload.get("ministry_name"),
+    )
+
+
+def _step3_kwargs(payload: Dict[str, Any]) -> Dict[str, Any]:
+    file_path = payload["file_path"]
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"업로드 파일이 없습니다: {file_path}")
+    return {
+        "source_path": file_path,
+        "notice_id": str(payload.get("notice_id") or ""),
+        "output_dir": "output",
+        "render_mode": payload.get("render_mode") or "gamma",
+        "gamma_timeout_sec": int(payload.get("gamma_timeout_sec") or 900),
+    }
+
+
+def run_step3_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from features.ppt_maker.main_ppt import run_ppt_generation
+
+    try:
+        final_state = run_ppt_generation(**_step3_kwargs(payload))
+        return build_step3_result(final_state)
+    finally:
+        _remove_quietly(payload["file_path"])
+
+
+def start_step3_job(payload: Dict[str, Any]) -> Any:
+    """
+    run_step3_job 과 같은 결과를 내지만, Gamma 렌더를 기다리는 동안 워커를 반납한다 (JobQueue executor=thread 전용).
+    Gamma 생성/폴링/다운로드는 공용 스케줄러 루프에서 돌고, 끝나면 job_queue 가 후처리를 이어서 실행한다.
+    """
+    from features.ppt_maker.main_ppt import begin_ppt_generation
+    from utils.job_queue import Parked
+
+    file_path = payload["file_path"]
+    try:
+        pending = begin_ppt_generation(**_step3_kwargs(payload), park_gamma=True)
+    except BaseException:
+        _remove_quietly(file_path)
+        raise
+
+    def _finish(_future: Any = None) -> Dict[str, Any]:
+        try:
+            return build_step3_result(pending.finish())
+        finally:
+            _remove_quietly(file_path)
+
+    if pending.gamma_future is None:
+        return _finish()
+    return Parked(pending.gamma_future, _finish)
+
+
+def run_step4_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from features.ppt_script.main_script import main as run_script_gen
+
+    file_path = payload["file_path"]
+    try:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"업로드 파일이 없습니다: {file_path}")
+        result = run_script_gen(pptx_path=file_path)
+        if not result:
+            raise RuntimeError("스크립트 생성 실패")
+        save_script_to_spring(payload.get("notice_id"), payload.get("token"), result)
+        return result
+    finally:
+        _remove_quietly(file_path)
@@ -0,0 +1,126 @@
+# utils/bbox_index.py
+"""
+PDF 페이지 좌표 판정 (NumPy 벡터화)
+
+- words_outside_boxes: 단어 중심점이 표 bbox 안에 있는 단어를 제외 (기존 단어별 is_inside_bbox 루프와 동일 결과)
+- filter_overlapping_tables: 다른 표를 포함하는 바깥 표 제거 (허용오차 1pt, 기존 이중 루프와 동일 결과)
+
+document_parsing.py / parsing.py 두 파서가 같이 쓴다.
+작은 입력은 NumPy 배열 생성 비용이 더 크므로 파이썬 루프로 처리한다.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# words × boxes 가 이 값보다 작으면 파이썬 루프가 더 빠르다
+VECTORIZE_MIN_PAIRS = 256
+
+
+def _is_inside_any(word: Dict[str, Any], bboxes: Sequence[Sequence[float]]) -> bool:
+    w_cx, w_cy = (word["x0"] + word["x1"]) / 2, (word["top"] + word["bottom"]) / 2
+    for b in bboxes:
+        if (b[0] <= w_cx <= b[2]) and (b[1] <= w_cy <= b[3]):
+            return True
+    return False
+
+
+def inside_mask(words: Sequence[Dict[str, Any]], bboxes: Sequence[Sequence[float]]) -> np.ndarray:
+    """단어별로 어느 bbox 안에든 중심점이 들어가면 True 인 bool 배열"""
+    if not words or not bboxes:
+        return np.zeros(len(words), dtype=bool)
+
+    coords = np.array([(w["x0"], w["x1"], w["top"], w["bottom"]) for w in words], dtype=np.float64)
+    cx = (coords[:, 0] + coords[:, 1]) / 2
+    cy = (coords[:, 2] + coords[:, 3]) / 2
+    boxes = np.asarray(bboxes, dtype=np.float64)
+
+    # (words, 1) vs (1, boxes) 브로드캐스트
+    inside = (
+        (boxes[None, :, 0] <= cx[:, None]) & (cx[:, None] <= boxes[None, :, 2]) &
+        (boxes[None, :, 1] <= cy[:, None]) & (cy[:, None] <= boxes[None, :, 3])
+    )
+    return inside.any(axis=1)
+
+
+def words_outside_boxes(words: Sequence[Dict[str, Any]], bboxes: Sequence[Sequence[float]]) -> List[Dict[str, Any]]:
+    """원래 순서를 유지한 채 bbox 밖 단어만 반환"""
+    if not bboxes:
+        return list(words)
+    if len(words) * len(bboxes) < VECTORIZE_MIN_PAIRS:
+        return [w for w in words if not _is_inside_any(w, bboxes)]
+
+    mask = inside_mask(words, bboxes)
+    return [w for w, inside in zip(words, mask.tolist()) if not inside]
+
+
+def filter_overlapping_tables(tables: Sequence[Any]) -> List[Any]:
+    """다른 표 bbox 를 (허용오차 1pt 로) 포함하는 표를 제거. tables 는 .bbox 를 가진 객체"""
+    if not tables:
+        return []
+    if len(tables) == 1:
+        return list(tables)
+
+    b = np.asarray([t.bbox for t in tables], dtype=np.float64)
+    # contains[i, j]: i 가 j 를 포함
+    contains = (
+        (b[:, None, 0] <= b[None, :, 0] + 1) &
+        (b[:, None, 1] <= b[None, :, 1] + 1) &
+        (b[:, None, 2] >= b[None, :, 2] - 1) &
+        (b[:, None, 3] >= b[None, :, 3] - 1)
+    )
+    np.fill_diagonal(contains, False)
+    remove = contains.any(axis=1).tolist()
+    return [t for t, r in zip(tables, remove) if not r]
+
+
+# =========================================================
+# 마이크로 벤치마크: python -m utils.bbox_index
+# =========================================================
+if __name__ == "__main__":
+    import random
+    import time
+    from types import SimpleNamespace
+
+    def _legacy_filter(tables):
+        indices_to_remove = set()
+        for i, outer in enumerate(tables):
+            for j, inner in enumerate(tables):
+                if i == j: continue
+                if (outer.bbox[0] <= inner.bbox[0] + 1 and outer.bbox[1] <= inner.bbox[1] + 1 and
+                    outer.bbox[2] >= inner.bbox[2] - 1 and outer.bbox[3] >= inner.bbox[3] - 1):
+                    indices_to_remove.add(i); break
+        return [t for i, t in enumerate(tables) if i not in indices_to_remove]
+
+    def _bench(fn, repeat=20):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            out = fn()
+        return (time.perf_counter() - started) / repeat * 1000, out
+
+    random.seed(0)
+    # 예산표가 많은 페이지: 단어 3,000개, 표 40개 (일부는 중첩)
+    words = []
+    for _ in range(3000):
+        x0, top = random.uniform(0, 560), random.uniform(0, 800)
+        words.append({"x0": x0, "x1": x0 + random.uniform(5, 40), "top": top, "bottom": top + 9, "text": "w"})
+    tables = []
+    for _ in range(40):
+        x0, top = random.uniform(0, 400), random.uniform(0, 700)
+        tables.append(SimpleNamespace(bbox=(x0, top, x0 + random.uniform(40, 160), top + random.uniform(20, 100))))
+    for t in tables[:10]:
+        x0, top, x1, bottom = t.bbox
+        tables.append(SimpleNamespace(bbox=(x0 + 2, top + 2, x1 - 2, bottom - 2)))
+    bboxes = [t.bbox for t in tables]
+
+    legacy_ms, legacy_words = _bench(lambda: [w for w in words if not _is_inside_any(w, bboxes)])
+    vector_ms, vector_words = _bench(lambda: words_outside_boxes(words, bboxes))
+    assert legacy_words == vector_words
+    print(f"words_outside_boxes     : legacy {legacy_ms:8.2f} ms | numpy {vector_ms:8.2f} ms | x{legacy_ms / vector_ms:.1f}")
+
+    legacy_ms, legacy_tables = _bench(lambda: _legacy_filter(tables))
+    vector_ms, vector_tables = _bench(lambda: filter_overlapping_tables(tables))
+    assert legacy_tables == vector_tables
+    print(f"filter_overlapping_tables: legacy {legacy_ms:8.2f} ms | numpy {vector_ms:8.2f} ms | x{legacy_ms / vector_ms:.1f}")
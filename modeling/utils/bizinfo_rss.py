@@ -0,0 +1,225 @@
+# utils/bizinfo_rss.py
+"""
+기업마당(bizinfo) RSS 페이지 수집
+
+- fetch_page        : 한 페이지 요청 + XML 파싱 → (raw_count, tot_cnt, 기술 공고 rows)
+- iter_rss_pages    : 1페이지로 totCnt 를 알아낸 뒤 나머지 페이지를 스레드 풀로 동시에 요청.
+                      파싱까지 워커에서 끝내고, 크기 제한 큐로 DB writer 에 넘긴다
+                      (writer 가 느리면 큐가 차서 워커가 기다림 = back-pressure).
+                      페이지는 완료된 순서대로 나온다.
+
+document_api.ingest_to_db 와 benchmarks/bench_rss_fetch.py 가 같이 쓴다.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import queue
+import threading
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BIZINFO_FETCH_WORKERS = int(os.getenv("BIZINFO_FETCH_WORKERS", "4"))
+BIZINFO_FETCH_QUEUE_SIZE = int(os.getenv("BIZINFO_FETCH_QUEUE_SIZE", "8"))
+
+PageResult = Tuple[int, int, Optional[int], List[Dict[str, str]]]  # (page, raw_count, tot_cnt, rows)
+
+
+def get_text(item, tag):
+    el = item.find(tag)
+    if el is None or el.text is None:
+        return ""
+    return el.text.strip()
+
+
+def build_session(pool_size: int = BIZINFO_FETCH_WORKERS):
+    # 동시 요청 수만큼 keep-alive 커넥션을 유지하도록 어댑터 풀 크기를 맞춘다
+    session = requests.Session()
+    retry = Retry(
+        total=5,
+        connect=5,
+        read=3,
+        backoff_factor=0.7,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": "bizinfo-ingest/1.0"})
+    return session
+
+
+def lcategory_is_tech(lcat):
+    if not lcat:
+        return False
+    parts = [p.strip() for p in lcat.replace("|", "@").split("@")]
+    return "기술" in parts
+
+
+def parse_rss_page(xml_text: str) -> Tuple[int, Optional[int], List[Dict[str, str]]]:
+    root = ET.fromstring(xml_text)
+    channel = root.find("channel")
+    if channel is None:
+        raise ValueError("RSS channel 없음")
+
+    raw_items = channel.findall("item")
+    raw_count = len(raw_items)
+
+    tot_cnt = None
+    rows = []
+
+    for it in raw_items:
+        # totCnt 는 채널 전체 건수이므로 기술 분류가 아닌 항목에서도 읽는다
+        if tot_cnt is None:
+            tc = get_text(it, "totCnt")
+            if tc and tc.isdigit():
+                tot_cnt = int(tc)
+
+        seq = get_text(it, "seq")
+        if not seq:
+            continue
+
+        lcat = get_text(it, "lcategory")
+        if not lcategory_is_tech(lcat):
+            continue
+
+        rows.append({
+            "seq": seq,
+            "title": get_text(it, "title"),
+            "link": get_text(it, "link"),
+            "author": get_text(it, "author"),
+            "exc_instt_nm": get_text(it, "excInsttNm"),
+            "description": get_text(it, "description"),
+            "pub_date": get_text(it, "pubDate"),
+            "reqst_dt": get_text(it, "reqstDt"),
+            "trget_nm": get_text(it, "trgetNm"),
+            "print_flpth_nm": get_text(it, "printFlpthNm"),
+            "print_file_nm": get_text(it, "printFileNm"),
+            "flpth_nm": get_text(it, "flpthNm"),
+            "file_nm": get_text(it, "fileNm"),
+            "hash_tags": get_text(it, "hashtags"),
+        })
+
+    return raw_count, tot_cnt, rows
+
+
+def fetch_page(session, base_url, api_key, page_index=1, page_unit=100):
+    params = {
+        "crtfcKey": api_key,
+        "dataType": "rss",
+        "pageIndex": page_index,
+        "pageUnit": page_unit,
+        "searchCnt": page_unit,
+    }
+
+    r = session.get(base_url, params=params, timeout=(5, 30))
+    r.raise_for_status()
+    return parse_rss_page(r.text)
+
+
+def _iter_pages_serial(session, base_url, api_key, page_unit, max_pages, start_page=1) -> Iterator[PageResult]:
+    page = start_page
+    tot_cnt_seen = None
+    while True:
+        raw_count, tot_cnt, rows = fetch_page(session, base_url, api_key, page_index=page, page_unit=page_unit)
+        if tot_cnt_seen is None and tot_cnt is not None:
+            tot_cnt_seen = tot_cnt
+        if raw_count == 0:
+            return
+        yield page, raw_count, tot_cnt_seen, rows
+        if max_pages is not None and page >= max_pages:
+            return
+        if tot_cnt_seen is not None and page * page_unit >= tot_cnt_seen:
+            return
+        page += 1
+
+
+def iter_rss_pages(
+    session,
+    base_url: str,
+    api_key: str,
+    page_unit: int = 100,
+    max_pages: Optional[int] = None,
+    workers: int = BIZINFO_FETCH_WORKERS,
+    queue_size: int = BIZINFO_FETCH_QUEUE_SIZE,
+) -> Iterator[PageResult]:
+    """(page, raw_count, tot_cnt, rows) 를 yield. 1페이지는 항상 먼저, 나머지는 완료 순서대로"""
+    raw_count, tot_cnt, rows = fetch_page(session, base_url, api_key, page_index=1, page_unit=page_unit)
+    if raw_count == 0:
+        return
+    yield 1, raw_count, tot_cnt, rows
+
+    last_page = math.ceil(tot_cnt / page_unit) if tot_cnt is not None else None
+    if max_pages is not None:
+        last_page = min(last_page, max_pages) if last_page is not None else max_pages
+    if last_page is None or workers <= 1:
+        # totCnt 를 모르면 빈 페이지가 나올 때까지 순차 요청
+        if last_page is None or last_page > 1:
+            yield from _iter_pages_serial(session, base_url, api_key, page_unit, last_page, start_page=2)
+        return
+    if last_page <= 1:
+        return
+
+    pages = iter(range(2, last_page + 1))
+    pages_lock = threading.Lock()
+    results: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=max(1, queue_size))
+    stop = threading.Event()
+
+    def worker() -> None:
+        try:
+            while not stop.is_set():
+                with pages_lock:
+                    page = next(pages, None)
+                if page is None:
+                    return
+                try:
+                    page_raw, page_tot, page_rows = fetch_page(session, base_url, api_key, page_index=page, page_unit=page_unit)
+                    item = ("page", (page, page_raw, page_tot if page_tot is not None else tot_cnt, page_rows))
+                except Exception as e:
+                    item = ("error", (page, e))
+                if not _put(results, item, stop) or item[0] == "error":
+                    return
+        finally:
+            _put(results, ("done", None), stop)
+
+    threads = [threading.Thread(target=worker, name=f"bizinfo-fetch-{i}", daemon=True) for i in range(min(workers, last_page - 1))]
+    for t in threads:
+        t.start()
+
+    finished = 0
+    try:
+        while finished < len(threads):
+            kind, payload = results.get()
+            if kind == "done":
+                finished += 1
+            elif kind == "error":
+                page, err = payload
+                raise RuntimeError(f"RSS {page}페이지 요청 실패: {err}") from err
+            elif payload[1] > 0:
+                yield payload
+    finally:
+        stop.set()
+        # 대기 중인 워커가 put 에서 빠져나오도록 큐를 비운다
+        while any(t.is_alive() for t in threads):
+            try:
+                results.get(timeout=0.2)
+            except queue.Empty:
+                pass
+
+
+def _put(q: "queue.Queue", item, stop: threading.Event) -> bool:
+    """큐가 가득 차면 writer 가 소비할 때까지 대기. 소비자가 중단(stop)하면 False"""
+    while True:
+        try:
+            q.put(item, timeout=0.2)
+            return True
+        except queue.Full:
+            if stop.is_set():
+                return False
@@ -1,56 +1,41 @@
 # modeling/ingest_strategy_jsonl.py
 
-import os
+import argparse
+import hashlib
 import json
+import os
+import time
+
 import chromadb
 from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def main():
-    print("="*60)
-    print("[DB 생성] JSONL 데이터 적재 시스템")
-
-    # 1. 환경 변수에서 경로 가져오기
-    jsonl_path = os.environ.get("STRATEGY_JSONL_PATH")
-    chroma_dir = os.environ.get("CHROMA_DB_DIR")
-    collection_name = os.environ.get("CHROMA_COLLECTION", "strategy_chunks_norm")
-    
-    # 모델 설정 (Main과 동일하게 유지)
-    EMBED_MODEL_NAME = "intfloat/multilingual-e5-base"
-
-    # 경로 검증
-    if not chroma_dir:
-        print("[오류] CHROMA_DB_DIR 환경변수가 설정되지 않았습니다.")
-        return
-    if not jsonl_path or not os.path.exists(jsonl_path):
-        print(f"[오류] JSONL 파일을 찾을 수 없습니다: {jsonl_path}")
-        return
-
-    print(f"[*] 타겟 DB 경로: {chroma_dir}")
-    print(f"[*] 원본 데이터: {jsonl_path}")
-    print(f"[*] 임베딩 모델: {EMBED_MODEL_NAME}")
+# INGEST_* 설정을 .env 에서도 읽도록 load_dotenv 이후에 import
+try:
+    from utils.ingest_pipeline import INGEST_ENCODE_BATCH, INGEST_WRITE_BATCH, run_ingest_pipeline
+except ImportError:  # utils/ 안에서 직접 실행하는 경우
+    from ingest_pipeline import INGEST_ENCODE_BATCH, INGEST_WRITE_BATCH, run_ingest_pipeline
 
-    # 2. DB 연결 (없으면 생성됨)
-    client = chromadb.PersistentClient(path=chroma_dir)
-    collection = client.get_or_create_collection(name=collection_name)
-    
-    # 3. 모델 로딩
-    print("[*] 모델 로딩 중...")
-    model = SentenceTransformer(EMBED_MODEL_NAME)
+# 모델 설정 (Main과 동일하게 유지)
+EMBED_MODEL_NAME = "intfloat/multilingual-e5-base"
+# 이 쓰기 배치 수마다 manifest 를 저장 (중단돼도 여기까지는 다시 임베딩하지 않음)
+CHECKPOINT_EVERY = int(os.environ.get("INGEST_CHECKPOINT_EVERY", "10"))
+# 해시에 넣는 임베딩 방식 버전 (접두어/정규화 방식을 바꾸면 올려서 전체 재임베딩)
+EMBED_RECIPE = f"{EMBED_MODEL_NAME}|passage-prefix|normalized"
 
-    # 4. 데이터 로딩 (JSONL 읽기)
-    docs = []
-    ids = []
-    metas = []
 
-    print("[*] 파일 읽는 중...")
+# =========================================================
+# JSONL 스트리밍 읽기
+# =========================================================
+def iter_chunks(jsonl_path):
+    """JSONL 을 한 줄씩 읽어 (unique_id, text, meta) 를 yield (전체를 메모리에 올리지 않음)"""
     with open(jsonl_path, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if not line: continue
-            
+
             try:
                 item = json.loads(line)
             except json.JSONDecodeError:
@@ -59,64 +44,261 @@ def main():
             # 텍스트 확인
             text = (item.get("chunk_text") or "").strip()
             if not text: continue
-            
+
             # ID 생성 (doc_id + chunk_id 조합)
             chunk_id = item.get("chunk_id")
             doc_id = item.get("doc_id") or ""
             if not chunk_id: continue
-            
+
             unique_id = f"{doc_id}_{chunk_id}" if doc_id else chunk_id
-            
-            ids.append(unique_id)
-            docs.append(text)
-            
+
             # 메타데이터 구성 (검색에 필요한 필드 위주)
-            metas.append({
+            meta = {
                 "doc_id": doc_id,
                 "title": item.get("title_raw", "")[:100], # 너무 길면 자름
                 "year": str(item.get("year", "")),
                 "agency_norm": item.get("agency_norm", ""),
                 "agency_raw": item.get("agency_raw", ""),
-            })
+            }
+            yield unique_id, text, meta
+
+
+def content_hash(text, meta):
+    payload = json.dumps({"text": text, "meta": meta, "recipe": EMBED_RECIPE}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# =========================================================
+# manifest (id → content_hash) / 체크포인트
+# =========================================================
+def default_manifest_path(chroma_dir, collection_name):
+    return os.environ.get("STRATEGY_INGEST_MANIFEST") or os.path.join(
+        chroma_dir, f"{collection_name}.ingest_manifest.json"
+    )
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("recipe") != EMBED_RECIPE:
+        print(f"[*] 임베딩 방식이 바뀌어 manifest 를 무시합니다 ({data.get('recipe')} → {EMBED_RECIPE})")
+        return None
+    return data
+
+
+def save_manifest(path, hashes, ingest_version, complete):
+    # complete=False: 적재 도중 체크포인트 (이후 쓰기가 컬렉션에만 더 있을 수 있음)
+    # 임시 파일에 쓴 뒤 교체 (저장 중 중단돼도 이전 manifest 유지)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "recipe": EMBED_RECIPE,
+                "updated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "complete": complete,
+                "ingest_version": ingest_version,
+                "hashes": hashes,
+            },
+            f,
+        )
+    os.replace(tmp_path, path)
+
+
+def manifest_mismatch(manifest, collection):
+    """
+    manifest 가 컬렉션 실제 상태와 어긋난 이유 (맞으면 "").
+    컬렉션을 지우거나 다른 곳에서 고쳤는데 manifest 만 남아 있으면 '변경 없음'으로 건너뛰어 청크가 빠지므로,
+    - 완료된 적재의 manifest 는 청크 수가 collection.count() 와 같아야 하고
+    - 중단된 적재의 체크포인트는 이후 쓰기가 컬렉션에만 더 있을 수 있으므로 같거나 컬렉션 쪽이 많아야 하며
+    - 기록된 ingest_version 이 컬렉션 metadata 와 같아야 한다 (이 필드가 없는 이전 manifest 는 확인 생략)
+    """
+    expected = len(manifest.get("hashes") or {})
+    count = collection.count()
+    complete = manifest.get("complete", True)
+    if (complete and count != expected) or count < expected:
+        return f"청크 수 불일치 (manifest {expected} / 컬렉션 {count})"
+    if "ingest_version" in manifest and manifest["ingest_version"] != ingest_version_of(collection):
+        return f"ingest_version 불일치 (manifest {manifest['ingest_version']} / 컬렉션 {ingest_version_of(collection)})"
+    return ""
+
+
+def hashes_from_collection(collection, page_size=5000):
+    """컬렉션 metadata 의 content_hash 로 복원 (content_hash 가 없는 청크는 "" → 변경된 것으로 간주, JSONL 에 없으면 삭제)"""
+    hashes = {}
+    total = collection.count()
+    offset = 0
+    while offset < total:
+        page = collection.get(limit=page_size, offset=offset, include=["metadatas"])
+        ids = page.get("ids") or []
+        if not ids:
+            break
+        for cid, meta in zip(ids, page.get("metadatas") or []):
+            hashes[cid] = (meta or {}).get("content_hash") or ""
+        offset += len(ids)
+    return hashes
 
-    if not docs:
-        print("[!] 적재할 데이터가 없습니다.")
+
+def ingest_version_of(collection):
+    return (collection.metadata or {}).get("ingest_version")
+
+
+def bump_ingest_version(collection):
+    """검색 결과 캐시가 바뀐 내용을 알 수 있도록 컬렉션 metadata 의 ingest_version 갱신. 갱신 후 값 반환"""
+    current = collection.metadata or {}
+    if any(k.startswith("hnsw:") for k in current):
+        # hnsw 설정이 들어 있는 컬렉션은 modify 로 metadata 를 바꿀 수 없다 (count 변화로만 감지)
+        return current.get("ingest_version")
+    version = time.strftime("%Y%m%dT%H%M%S")
+    collection.modify(metadata={**current, "ingest_version": version})
+    return version
+
+
+# =========================================================
+# 적재
+# =========================================================
+class LazyEncoder:
+    """변경분이 있을 때만 모델을 로딩 (변경 없는 실행은 모델 로딩 없이 끝남)"""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.model = None
+
+    def __call__(self, texts):
+        if self.model is None:
+            print("[*] 모델 로딩 중...")
+            self.model = SentenceTransformer(self.model_name)
+        return self.model.encode(texts, batch_size=len(texts), normalize_embeddings=True).tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전략 JSONL → ChromaDB 증분 적재")
+    parser.add_argument("--full", action="store_true", help="해시가 같아도 전체 재임베딩 (삭제 판정은 그대로)")
+    parser.add_argument("--dry-run", action="store_true", help="변경/삭제 건수만 계산")
+    parser.add_argument("--no-delete", action="store_true", help="JSONL 에서 사라진 청크를 삭제하지 않음")
+    parser.add_argument("--encode-batch", type=int, default=INGEST_ENCODE_BATCH, help="임베딩 배치 크기")
+    parser.add_argument("--write-batch", type=int, default=INGEST_WRITE_BATCH, help="upsert 배치 크기")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("[DB 생성] JSONL 데이터 적재 시스템 (증분)")
+
+    # 1. 환경 변수에서 경로 가져오기
+    jsonl_path = os.environ.get("STRATEGY_JSONL_PATH")
+    chroma_dir = os.environ.get("CHROMA_DB_DIR")
+    collection_name = os.environ.get("CHROMA_COLLECTION", "strategy_chunks_norm")
+
+    # 경로 검증
+    if not chroma_dir:
+        print("[오류] CHROMA_DB_DIR 환경변수가 설정되지 않았습니다.")
         return
+    if not jsonl_path or not os.path.exists(jsonl_path):
+        print(f"[오류] JSONL 파일을 찾을 수 없습니다: {jsonl_path}")
+        return
+
+    manifest_path = default_manifest_path(chroma_dir, collection_name)
+    print(f"[*] 타겟 DB 경로: {chroma_dir}")
+    print(f"[*] 원본 데이터: {jsonl_path}")
+    print(f"[*] 임베딩 모델: {EMBED_MODEL_NAME}")
+    print(f"[*] manifest: {manifest_path}")
+
+    # 2. DB 연결 (없으면 생성됨)
+    client = chromadb.PersistentClient(path=chroma_dir)
+    collection = client.get_or_create_collection(name=collection_name)
 
-    print(f"[*] 총 {len(docs)}개 데이터 적재 시작 (Batch Size: 64)")
-
-    # 5. 배치 단위로 임베딩 및 적재
-    batch_size = 64
-    total = len(docs)
-    
-    for i in range(0, total, batch_size):
-        batch_docs = docs[i : i + batch_size]
-        batch_ids = ids[i : i + batch_size]
-        batch_metas = metas[i : i + batch_size]
-        
-        # [중요] E5 모델은 문서 임베딩 시 'passage: ' 접두어를 권장함
-        # DB에는 원본 텍스트를 저장하고, 임베딩 벡터 만들 때만 접두어 사용
-        batch_docs_for_embed = ["passage: " + d for d in batch_docs]
-        
-        # 임베딩 생성
-        embeddings = model.encode(batch_docs_for_embed, normalize_embeddings=True).tolist()
-        
-        # ChromaDB에 저장 (Upsert)
-        collection.upsert(
-            ids=batch_ids,
-            documents=batch_docs, # 원본 텍스트
-            metadatas=batch_metas,
-            embeddings=embeddings,
+    # 3. 이전 적재 상태 (manifest → 없으면 컬렉션 metadata)
+    #    manifest 가 컬렉션과 어긋나면 믿지 않고 전체 적재 (사라진 청크 삭제용으로만 컬렉션 id 를 읽음)
+    ingest_version = ingest_version_of(collection)
+    full = args.full
+    manifest = load_manifest(manifest_path)
+    hashes = None
+    if manifest is None:
+        print("[*] manifest 없음: 컬렉션 metadata 의 content_hash 로 복원합니다...")
+    else:
+        reason = manifest_mismatch(manifest, collection)
+        if reason:
+            print(f"[*] manifest 가 컬렉션과 맞지 않아 전체 적재로 전환합니다: {reason}")
+            full = True
+        else:
+            hashes = manifest.get("hashes") or {}
+    if hashes is None:
+        hashes = hashes_from_collection(collection)
+    print(f"[*] 기존 적재 청크: {len(hashes)}개")
+
+    # 4. 스트리밍 비교 + 변경분만 임베딩/적재 (인코딩과 upsert 를 겹쳐 실행)
+    seen = set()
+    stats = {"scanned": 0, "unchanged": 0, "upserted": 0, "deleted": 0}
+    writes_since_checkpoint = 0
+    started = time.perf_counter()
+
+    def changed_items():
+        for unique_id, text, meta in iter_chunks(jsonl_path):
+            stats["scanned"] += 1
+            seen.add(unique_id)
+            h = content_hash(text, meta)
+            if not full and hashes.get(unique_id) == h:
+                stats["unchanged"] += 1
+                continue
+            # [중요] E5 모델은 문서 임베딩 시 'passage: ' 접두어를 권장함
+            # DB에는 원본 텍스트를 저장하고, 임베딩 벡터 만들 때만 접두어 사용
+            # content_hash 도 metadata 에 같이 저장해 manifest 없이도 복원 가능
+            yield unique_id, text, {**meta, "content_hash": h}, "passage: " + text
+
+    def write(ids, documents, metadatas, embeddings):
+        collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def on_written(ids, metadatas):
+        # writer 스레드에서 호출: 쓰기가 끝난 청크만 manifest 에 반영
+        nonlocal writes_since_checkpoint
+        for cid, meta in zip(ids, metadatas):
+            hashes[cid] = meta["content_hash"]
+        stats["upserted"] += len(ids)
+        writes_since_checkpoint += 1
+        if writes_since_checkpoint >= CHECKPOINT_EVERY:
+            save_manifest(manifest_path, hashes, ingest_version, complete=False)
+            writes_since_checkpoint = 0
+            print(f"  - 진행: 스캔 {stats['scanned']} / 적재 {stats['upserted']} / 유지 {stats['unchanged']} (체크포인트 저장)")
+
+    print("[*] 파일 비교 중...")
+    if args.dry_run:
+        stats["upserted"] = sum(1 for _ in changed_items())
+    else:
+        run_ingest_pipeline(
+            changed_items(),
+            LazyEncoder(EMBED_MODEL_NAME),
+            write,
+            encode_batch_size=args.encode_batch,
+            write_batch_size=args.write_batch,
+            on_written=on_written,
+            progress_every=0,  # 진행 로그는 체크포인트 때만
+            label="strategy",
         )
-        
-        # 진행률 표시
-        if (i // batch_size) % 10 == 0:
-             progress = (i + len(batch_docs)) / total * 100
-             print(f"  - 진행률: {i + len(batch_docs)}/{total} ({progress:.1f}%)")
+
+    # 5. JSONL 에서 사라진 청크 삭제
+    removed = [cid for cid in hashes if cid not in seen]
+    if removed and not args.no_delete:
+        if not args.dry_run:
+            for i in range(0, len(removed), 1000):
+                collection.delete(ids=removed[i:i + 1000])
+            for cid in removed:
+                hashes.pop(cid, None)
+        stats["deleted"] = len(removed)
+
+    if args.dry_run:
+        print(f"[dry-run] 스캔 {stats['scanned']} / 적재 예정 {stats['upserted']} / 유지 {stats['unchanged']} / 삭제 예정 {stats['deleted']}")
+        return
+
+    if stats["upserted"] or stats["deleted"]:
+        ingest_version = bump_ingest_version(collection)
+    save_manifest(manifest_path, hashes, ingest_version, complete=True)
 
     print("="*60)
-    print(f"[완료] '{chroma_dir}' 경로에 {total}개 데이터 적재가 끝났습니다.")
+    print(
+        f"[완료] 스캔 {stats['scanned']} / 적재 {stats['upserted']} / 유지 {stats['unchanged']} / "
+        f"삭제 {stats['deleted']} ({time.perf_counter() - started:.1f}s, 컬렉션 {collection.count()}건)"
+    )
     print("이제 main_1.py를 실행하여 검색할 수 있습니다.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
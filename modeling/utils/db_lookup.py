@@ -1,58 +1,11 @@
 # utils/db_lookup.py
 
-import os
-from urllib.parse import urlparse
-
-import pymysql
-from dotenv import load_dotenv
-
-load_dotenv()
-
-
-def _resolve_db_config():
-    """
-    DB_URL / DB_USERNAME / DB_PASSWORD 우선 사용.
-    기존 DB_HOST/DB_PORT/DB_USER/DB_NAME는 폴백으로 지원.
-    """
-    db_url = (os.environ.get("DB_URL") or "").strip()
-    # Accept JDBC style URL as-is from env, e.g. jdbc:mysql://host:3306/db
-    if db_url.lower().startswith("jdbc:"):
-        db_url = db_url[5:]
-    db_username = (os.environ.get("DB_USERNAME") or "").strip()
-    db_password = os.environ.get("DB_PASSWORD", "")
-
-    if db_url:
-        parsed = urlparse(db_url)
-        if parsed.scheme and parsed.hostname:
-            return {
-                "host": parsed.hostname,
-                "port": parsed.port or 3306,
-                "user": db_username or parsed.username or "root",
-                "password": db_password or parsed.password or "",
-                "db": (parsed.path or "/").lstrip("/") or os.environ.get("DB_NAME", "randi_db"),
-            }
-
-    return {
-        "host": os.environ.get("DB_HOST", "127.0.0.1"),
-        "port": int(os.environ.get("DB_PORT", 3306)),
-        "user": os.environ.get("DB_USER", "root"),
-        "password": db_password or os.environ.get("DB_PASSWORD", "rootpw"),
-        "db": os.environ.get("DB_NAME", "randi_db"),
-    }
+from utils.db_pool import get_connection as _get_pooled_connection
 
 
 def get_connection():
-    """환경변수에서 DB 접속 정보를 읽어 MySQL 연결을 반환."""
-    cfg = _resolve_db_config()
-    return pymysql.connect(
-        host=cfg["host"],
-        port=int(cfg["port"]),
-        user=cfg["user"],
-        password=cfg["password"],
-        db=cfg["db"],
-        charset="utf8mb4",
-        cursorclass=pymysql.cursors.DictCursor,
-    )
+    """공용 커넥션 풀에서 커넥션을 빌린다 (DictCursor 기본, close() 시 반납)."""
+    return _get_pooled_connection(dict_cursor=True)
 
 
 def get_notice_info_by_id(notice_id):
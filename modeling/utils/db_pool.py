@@ -0,0 +1,298 @@
+# utils/db_pool.py
+"""
+MySQL 커넥션 풀 (modeling 서비스 공용)
+
+- 드라이버는 pymysql 하나로 통일, 접속 정보 해석도 resolve_db_config() 한 곳에서만
+- 최대 DB_POOL_SIZE 개까지 만들고, 모두 사용 중이면 DB_POOL_TIMEOUT_SEC 동안 반납을 기다린다
+- DB_POOL_PING_AFTER_SEC 이상 놀던 커넥션은 꺼낼 때 ping 으로 확인, DB_POOL_RECYCLE_SEC 지나면 새로 연결
+- 반납 시 rollback 으로 열린 트랜잭션을 정리한다 (REPEATABLE READ 스냅샷이 다음 요청으로 새지 않도록)
+
+사용법은 기존 커넥션과 같다. close() 가 실제 종료 대신 풀 반납이다.
+
+    conn = get_connection()
+    cur = conn.cursor(dictionary=True)   # mysql.connector 와 같은 인자 지원
+    try:
+        ...
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import pymysql
+import pymysql.cursors
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT_SEC = float(os.getenv("DB_POOL_TIMEOUT_SEC", "10"))
+DB_POOL_PING_AFTER_SEC = float(os.getenv("DB_POOL_PING_AFTER_SEC", "30"))
+DB_POOL_RECYCLE_SEC = float(os.getenv("DB_POOL_RECYCLE_SEC", "3600"))
+DB_CONNECT_TIMEOUT_SEC = int(os.getenv("DB_CONNECT_TIMEOUT_SEC", "10"))
+
+
+class DBPoolTimeout(RuntimeError):
+    """풀의 모든 커넥션이 사용 중이고 제한 시간 안에 반납되지 않음"""
+
+
+# =========================================================
+# 접속 정보
+# =========================================================
+def resolve_db_config() -> Dict[str, Any]:
+    """
+    DB_URL / DB_USERNAME / DB_PASSWORD 우선 사용.
+    기존 DB_HOST/DB_PORT/DB_USER/DB_NAME는 폴백으로 지원.
+    호스트/계정/비밀번호가 없으면 기본값으로 접속하지 않고 RuntimeError.
+    """
+    db_url = (os.environ.get("DB_URL") or "").strip()
+    # Accept JDBC style URL as-is from env, e.g. jdbc:mysql://host:3306/db
+    if db_url.lower().startswith("jdbc:"):
+        db_url = db_url[5:]
+    db_username = (os.environ.get("DB_USERNAME") or os.environ.get("DB_USER") or "").strip()
+    db_password = os.environ.get("DB_PASSWORD", "")
+
+    parsed = urlparse(db_url) if db_url else None
+    if parsed is not None and parsed.scheme and parsed.hostname:
+        cfg = {
+            "host": parsed.hostname,
+            "port": parsed.port or 3306,
+            "user": db_username or parsed.username or "",
+            "password": db_password or parsed.password or "",
+            "db": (parsed.path or "/").lstrip("/") or os.environ.get("DB_NAME", "randi_db"),
+        }
+    else:
+        cfg = {
+            "host": (os.environ.get("DB_HOST") or "").strip(),
+            "port": int(os.environ.get("DB_PORT", 3306)),
+            "user": db_username,
+            "password": db_password,
+            "db": os.environ.get("DB_NAME", "randi_db"),
+        }
+
+    missing = [
+        name for name, key in (("DB_HOST (또는 DB_URL)", "host"), ("DB_USER", "user"), ("DB_PASSWORD", "password"))
+        if not cfg[key]
+    ]
+    if missing:
+        raise RuntimeError(f"DB 접속 환경변수가 설정되어 있지 않습니다: {', '.join(missing)}")
+    return cfg
+
+
+# =========================================================
+# 풀에서 빌려준 커넥션
+# =========================================================
+class PooledConnection:
+    """
+    pymysql 커넥션 래퍼. close() = 풀 반납
+    cursor(pymysql.cursors.Cursor) 처럼 pymysql 식으로 커서 클래스를 주거나,
+    cursor(dictionary=True) 처럼 mysql.connector 식으로 DictCursor 를 고를 수 있다
+    """
+
+    def __init__(self, pool: "ConnectionPool", raw, dict_cursor: bool):
+        self._pool = pool
+        self._raw = raw
+        self._dict_cursor = dict_cursor
+
+    def cursor(self, cursor_class=None, *, dictionary: Optional[bool] = None):
+        if self._raw is None:
+            raise RuntimeError("이미 반납된 커넥션입니다")
+        if cursor_class is None:
+            use_dict = self._dict_cursor if dictionary is None else dictionary
+            cursor_class = pymysql.cursors.DictCursor if use_dict else pymysql.cursors.Cursor
+        return self._raw.cursor(cursor_class)
+
+    def commit(self) -> None:
+        self._raw.commit()
+
+    def rollback(self) -> None:
+        self._raw.rollback()
+
+    def close(self) -> None:
+        # 여러 번 호출돼도 한 번만 반납
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._release(raw)
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __getattr__(self, name: str):
+        # 그 밖의 속성(ping, autocommit, ...)은 원래 커넥션으로
+        if self._raw is None:
+            raise RuntimeError("이미 반납된 커넥션입니다")
+        return getattr(self._raw, name)
+
+
+# =========================================================
+# 풀
+# =========================================================
+class ConnectionPool:
+    def __init__(self, max_size: int = DB_POOL_SIZE, timeout_sec: float = DB_POOL_TIMEOUT_SEC):
+        self.max_size = max(1, max_size)
+        self.timeout_sec = timeout_sec
+        self._idle: List[Tuple[Any, float, float]] = []  # (커넥션, 생성 시각, 마지막 반납 시각)
+        self._created_at: Dict[int, float] = {}
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._pid = os.getpid()
+        self.counters = {
+            "acquired": 0,
+            "created": 0,
+            "reused": 0,
+            "waited": 0,
+            "timeouts": 0,
+            "ping_failures": 0,
+            "recycled": 0,
+            "discarded": 0,
+        }
+        self._wait_total_sec = 0.0
+        self._wait_max_sec = 0.0
+
+    def _connect(self):
+        cfg = resolve_db_config()
+        return pymysql.connect(
+            host=cfg["host"],
+            port=int(cfg["port"]),
+            user=cfg["user"],
+            password=cfg["password"],
+            db=cfg["db"],
+            charset="utf8mb4",
+            connect_timeout=DB_CONNECT_TIMEOUT_SEC,
+            autocommit=False,
+        )
+
+    def _check_fork(self) -> None:
+        # fork 된 자식 프로세스는 부모의 소켓을 공유하면 안 되므로 비운다
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._idle.clear()
+            self._created_at.clear()
+            self._in_use = 0
+
+    def _healthy(self, raw, created: float, released: float) -> bool:
+        now = time.monotonic()
+        if now - created > DB_POOL_RECYCLE_SEC:
+            self.counters["recycled"] += 1
+            return False
+        if now - released > DB_POOL_PING_AFTER_SEC:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                self.counters["ping_failures"] += 1
+                return False
+        return True
+
+    def acquire(self, dict_cursor: bool = False) -> PooledConnection:
+        started = time.monotonic()
+        deadline = started + self.timeout_sec
+        waited = False
+        with self._cond:
+            self._check_fork()
+            while not self._idle and self._in_use >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters["timeouts"] += 1
+                    raise DBPoolTimeout(f"DB 커넥션 풀 대기 시간 초과 ({self.timeout_sec}s, size={self.max_size})")
+                waited = True
+                self._cond.wait(remaining)
+            self._in_use += 1
+            item = self._idle.pop() if self._idle else None
+            wait_sec = time.monotonic() - started
+            self.counters["acquired"] += 1
+            if waited:
+                self.counters["waited"] += 1
+            self._wait_total_sec += wait_sec
+            self._wait_max_sec = max(self._wait_max_sec, wait_sec)
+
+        # ping / 연결은 락 밖에서 (느린 네트워크가 다른 스레드를 막지 않도록)
+        try:
+            if item is not None:
+                raw, created, released = item
+                if self._healthy(raw, created, released):
+                    self.counters["reused"] += 1
+                    return PooledConnection(self, raw, dict_cursor)
+                self._close_quietly(raw)
+            raw = self._connect()
+            self._created_at[id(raw)] = time.monotonic()
+            self.counters["created"] += 1
+            return PooledConnection(self, raw, dict_cursor)
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, raw) -> None:
+        reusable = True
+        try:
+            raw.rollback()  # 커밋 안 된 작업/읽기 스냅샷 정리
+        except Exception:
+            reusable = False
+
+        with self._cond:
+            if self._pid != os.getpid():
+                return
+            self._in_use = max(0, self._in_use - 1)
+            created = self._created_at.get(id(raw), time.monotonic())
+            if reusable:
+                self._idle.append((raw, created, time.monotonic()))
+            else:
+                self.counters["discarded"] += 1
+                self._created_at.pop(id(raw), None)
+            self._cond.notify()
+        if not reusable:
+            self._close_quietly(raw)
+
+    def _close_quietly(self, raw) -> None:
+        self._created_at.pop(id(raw), None)
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def close_all(self) -> None:
+        """유휴 커넥션 종료 (서버 종료 시). 사용 중인 커넥션은 반납될 때 다시 풀에 들어간다"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for raw, _, _ in idle:
+            self._close_quietly(raw)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            acquired = self.counters["acquired"]
+            return {
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                **self.counters,
+                "wait_avg_ms": round(self._wait_total_sec / acquired * 1000, 2) if acquired else 0.0,
+                "wait_max_ms": round(self._wait_max_sec * 1000, 2),
+            }
+
+
+db_pool = ConnectionPool()
+
+
+def get_connection(dict_cursor: bool = False) -> PooledConnection:
+    """풀에서 커넥션을 빌린다. dict_cursor=True 면 cursor() 기본값이 DictCursor"""
+    return db_pool.acquire(dict_cursor=dict_cursor)
+
+
+def db_pool_stats() -> Dict[str, Any]:
+    return db_pool.stats()
+
+
+def close_db_pool() -> None:
+    db_pool.close_all()
@@ -0,0 +1,118 @@
+# utils/embedding_models.py
+"""
+임베딩 모델 레지스트리 (프로세스당 모델 1회 로드)
+
+Step 1 법령 검색(main_notice / notice_llm)과 Step 2 전략 검색(vector_db)이
+같은 SentenceTransformer 인스턴스를 공유하도록 모델 이름별로 한 번만 로드한다.
+FastAPI startup 훅에서 warmup_embedding_models()를 호출하면 요청 경로에서 로딩이 빠진다.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+DEFAULT_EMBED_MODEL_NAME = "intfloat/multilingual-e5-base"
+EMBED_DEVICE = os.getenv("EMBED_DEVICE")  # 예: "cpu", "cuda" (미지정 시 라이브러리 기본값)
+
+_models: Dict[str, Any] = {}
+_stats: Dict[str, Dict[str, Any]] = {}
+_registry_lock = threading.Lock()
+_model_locks: Dict[str, threading.Lock] = {}
+
+
+def _current_rss_mb() -> Optional[float]:
+    """현재 프로세스 RSS(MB). /proc 이 없으면 resource 의 최대 RSS로 대체"""
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1)
+    except Exception:
+        return None
+
+
+def default_embedding_model_names() -> List[str]:
+    """서비스에서 사용하는 임베딩 모델 이름 목록 (중복 제거, 순서 유지)"""
+    names = [
+        os.getenv("CHROMA_EMBED_MODEL_NAME", DEFAULT_EMBED_MODEL_NAME),
+        os.getenv("LAW_EMBED_MODEL_NAME", DEFAULT_EMBED_MODEL_NAME),
+    ]
+    extra = os.getenv("EMBED_WARMUP_MODELS", "")
+    names.extend(n.strip() for n in extra.split(",") if n.strip())
+    return list(dict.fromkeys(names))
+
+
+def get_embedding_model(model_name: Optional[str] = None):
+    """모델 이름별 SentenceTransformer 싱글톤. 최초 호출 시에만 로드한다."""
+    name = (model_name or DEFAULT_EMBED_MODEL_NAME).strip()
+
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        lock = _model_locks.setdefault(name, threading.Lock())
+
+    # 같은 모델을 동시에 요청하면 한 스레드만 로드하고 나머지는 기다린다
+    with lock:
+        model = _models.get(name)
+        if model is not None:
+            return model
+
+        from sentence_transformers import SentenceTransformer
+
+        print(f"[Embedding] 모델 로드 시작: {name}")
+        rss_before = _current_rss_mb()
+        started = time.perf_counter()
+        if EMBED_DEVICE:
+            model = SentenceTransformer(name, device=EMBED_DEVICE)
+        else:
+            model = SentenceTransformer(name)
+        load_sec = round(time.perf_counter() - started, 2)
+        rss_after = _current_rss_mb()
+
+        rss_delta = None
+        if rss_before is not None and rss_after is not None:
+            rss_delta = round(rss_after - rss_before, 1)
+
+        _stats[name] = {
+            "model_name": name,
+            "load_sec": load_sec,
+            "loaded_at": time.time(),
+            "rss_before_mb": rss_before,
+            "rss_after_mb": rss_after,
+            "rss_delta_mb": rss_delta,
+            "device": str(getattr(model, "device", EMBED_DEVICE or "")),
+        }
+        _models[name] = model
+        print(f"✓ [Embedding] 모델 로드 완료: {name} ({load_sec}s, RSS {rss_before}MB → {rss_after}MB)")
+        return model
+
+
+def warmup_embedding_models(model_names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """모델을 미리 로드한다. 실패한 모델은 건너뛰고 첫 요청 때 다시 시도된다."""
+    names = model_names or default_embedding_model_names()
+    for name in names:
+        try:
+            get_embedding_model(name)
+        except Exception as e:
+            print(f"[Embedding] warm-up 실패 ({name}): {e}")
+    return embedding_model_stats()
+
+
+def embedding_model_stats() -> Dict[str, Any]:
+    """로드된 모델별 로드 시간/메모리 + 현재 프로세스 RSS"""
+    return {
+        "pid": os.getpid(),
+        "rss_mb": _current_rss_mb(),
+        "loaded": [dict(s) for s in _stats.values()],
+    }
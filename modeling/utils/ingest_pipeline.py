@@ -0,0 +1,170 @@
+# utils/ingest_pipeline.py
+"""
+임베딩 적재 파이프라인 (encode ↔ upsert 겹쳐 실행)
+
+  호출 스레드(encoder) : items 를 encode_batch_size 씩 묶어 임베딩 → 크기 제한 큐에 넣음
+  writer 스레드        : 큐에서 꺼내 write_batch_size 가 차면 write_fn(upsert) 호출
+
+인코딩(CPU/GPU)과 Chroma 쓰기(네트워크/디스크)가 동시에 진행되고,
+writer 가 느리면 큐가 차서 encoder 가 기다린다 (메모리 상한 = queue_size × encode 배치).
+
+db_ingest(전략 JSONL) / law_ingest_parquet(법령) 두 스크립트가 같이 쓴다.
+
+items 원소: (id, document, metadata, embed_text)
+encode_fn(texts) → 임베딩 리스트
+write_fn(ids, documents, metadatas, embeddings) → upsert
+on_written(ids, metadatas) → 쓰기가 끝난 뒤 writer 스레드에서 호출 (manifest 갱신 등)
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+INGEST_ENCODE_BATCH = int(os.getenv("INGEST_ENCODE_BATCH", "64"))
+INGEST_WRITE_BATCH = int(os.getenv("INGEST_WRITE_BATCH", "256"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "4"))
+
+IngestItem = Tuple[str, Optional[str], Optional[Dict[str, Any]], str]
+
+_DONE = object()
+
+
+class _StageTimer:
+    def __init__(self):
+        self.items = 0
+        self.batches = 0
+        self.busy_sec = 0.0
+        self.blocked_sec = 0.0  # encoder: 큐가 가득 차서 대기 / writer: 큐가 비어서 대기
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "busy_sec": round(self.busy_sec, 3),
+            "blocked_sec": round(self.blocked_sec, 3),
+            "items_per_sec": round(self.items / self.busy_sec, 1) if self.busy_sec else 0.0,
+        }
+
+
+def run_ingest_pipeline(
+    items: Iterable[IngestItem],
+    encode_fn: Callable[[List[str]], Sequence[Sequence[float]]],
+    write_fn: Callable[[List[str], List[Optional[str]], List[Optional[Dict[str, Any]]], List[Sequence[float]]], None],
+    encode_batch_size: int = INGEST_ENCODE_BATCH,
+    write_batch_size: int = INGEST_WRITE_BATCH,
+    queue_size: int = INGEST_QUEUE_SIZE,
+    on_written: Optional[Callable[[List[str], List[Optional[Dict[str, Any]]]], None]] = None,
+    progress_every: int = 10,
+    label: str = "ingest",
+) -> Dict[str, Any]:
+    """items 를 모두 임베딩/적재하고 단계별 처리량 통계를 반환"""
+    encode_batch_size = max(1, encode_batch_size)
+    write_batch_size = max(1, write_batch_size)
+    batches: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+    encoder = _StageTimer()
+    writer = _StageTimer()
+    errors: List[BaseException] = []
+    started = time.perf_counter()
+
+    def write(buffer: List[Tuple[IngestItem, Sequence[float]]]) -> None:
+        ids = [item[0] for item, _ in buffer]
+        metas = [item[2] for item, _ in buffer]
+        t0 = time.perf_counter()
+        write_fn(ids, [item[1] for item, _ in buffer], metas, [emb for _, emb in buffer])
+        writer.busy_sec += time.perf_counter() - t0
+        writer.items += len(buffer)
+        writer.batches += 1
+        if on_written is not None:
+            on_written(ids, metas)
+        if progress_every and writer.batches % progress_every == 0:
+            _print_progress(label, encoder, writer, started)
+
+    def writer_loop() -> None:
+        buffer: List[Tuple[IngestItem, Sequence[float]]] = []
+        try:
+            while True:
+                t0 = time.perf_counter()
+                batch = batches.get()
+                writer.blocked_sec += time.perf_counter() - t0
+                if batch is _DONE:
+                    break
+                buffer.extend(batch)
+                while len(buffer) >= write_batch_size:
+                    write(buffer[:write_batch_size])
+                    del buffer[:write_batch_size]
+            if buffer:
+                write(buffer)
+        except BaseException as e:  # noqa: BLE001 - 호출 스레드에서 다시 raise
+            errors.append(e)
+            # encoder 가 put 에서 막히지 않도록 남은 배치를 버린다
+            while True:
+                if batches.get() is _DONE:
+                    break
+
+    thread = threading.Thread(target=writer_loop, name=f"{label}-writer", daemon=True)
+    thread.start()
+
+    def put(batch: Any) -> None:
+        t0 = time.perf_counter()
+        batches.put(batch)
+        encoder.blocked_sec += time.perf_counter() - t0
+
+    pending: List[IngestItem] = []
+    try:
+        for item in items:
+            if errors:
+                break
+            pending.append(item)
+            if len(pending) >= encode_batch_size:
+                put(_encode(encode_fn, pending, encoder))
+                pending = []
+        if pending and not errors:
+            put(_encode(encode_fn, pending, encoder))
+    finally:
+        put(_DONE)
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+    result = {
+        "label": label,
+        "elapsed_sec": round(time.perf_counter() - started, 3),
+        "encode": encoder.stats(),
+        "write": writer.stats(),
+    }
+    wall = result["elapsed_sec"]
+    result["items_per_sec"] = round(writer.items / wall, 1) if wall else 0.0
+    _print_summary(result)
+    return result
+
+
+def _encode(encode_fn, pending: List[IngestItem], timer: _StageTimer) -> List[Tuple[IngestItem, Sequence[float]]]:
+    t0 = time.perf_counter()
+    embeddings = encode_fn([item[3] for item in pending])
+    timer.busy_sec += time.perf_counter() - t0
+    timer.items += len(pending)
+    timer.batches += 1
+    return list(zip(pending, embeddings))
+
+
+def _print_progress(label: str, encoder: _StageTimer, writer: _StageTimer, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    print(
+        f"  - [{label}] encoded={encoder.items} written={writer.items} "
+        f"({writer.items / elapsed:.1f} chunks/s, encode {encoder.stats()['items_per_sec']}/s, "
+        f"write {writer.stats()['items_per_sec']}/s)"
+    )
+
+
+def _print_summary(result: Dict[str, Any]) -> None:
+    enc, wr = result["encode"], result["write"]
+    print(
+        f"[{result['label']}] {wr['items']}건 적재, {result['elapsed_sec']}s ({result['items_per_sec']} chunks/s) | "
+        f"encode {enc['items_per_sec']}/s (busy {enc['busy_sec']}s, 큐 대기 {enc['blocked_sec']}s) | "
+        f"write {wr['items_per_sec']}/s (busy {wr['busy_sec']}s, 입력 대기 {wr['blocked_sec']}s)"
+    )
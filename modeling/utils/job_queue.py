@@ -0,0 +1,393 @@
+# utils/job_queue.py
+"""
+분석 작업(Step 1~4) 비동기 작업 큐
+
+- submit 즉시 job_id를 반환하고, 실제 파이프라인은 단계별 워커 풀에서 실행한다.
+- 단계별로 동시 실행 수(workers)와 실행 방식(thread/process)을 따로 설정한다.
+- 작업 상태/결과는 SQLite(JOB_DB_PATH)에 저장하므로 서버 재시작 후에도 조회된다.
+- 재시작 시 queued/running 상태로 남은 작업은 다시 큐에 넣는다 (JOB_MAX_ATTEMPTS 까지).
+- 인증 토큰 같은 값은 secrets 로 넘겨 메모리에만 두고 SQLite 에는 쓰지 않는다.
+- handler 가 Parked 를 돌려주면 외부 대기(Gamma 렌더 등) 동안 워커를 반납하고, future 완료 시 이어서 실행한다.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join("tmp", "jobs.sqlite3"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))
+JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "72"))
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+
+UNFINISHED_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+
+# =========================================================
+# 저장소 (SQLite)
+# =========================================================
+class JobStore:
+    """작업 메타데이터/결과를 SQLite 한 파일에 저장하는 저장소"""
+
+    def __init__(self, db_path: str = JOB_DB_PATH):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id      TEXT PRIMARY KEY,
+                    step        TEXT NOT NULL,
+                    status      TEXT NOT NULL,
+                    payload     TEXT NOT NULL,
+                    result      TEXT,
+                    error       TEXT,
+                    attempts    INTEGER NOT NULL DEFAULT 0,
+                    created_at  REAL NOT NULL,
+                    started_at  REAL,
+                    finished_at REAL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, step, created_at)")
+            self._conn.commit()
+
+    def _execute(self, sql: str, params: tuple = ()) -> None:
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    def _fetchall(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def create(self, step: str, payload: Dict[str, Any], job_id: Optional[str] = None) -> str:
+        job_id = job_id or uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (job_id, step, status, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, step, STATUS_QUEUED, json.dumps(payload, ensure_ascii=False), time.time()),
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._fetchall("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+        return _row_to_job(rows[0]) if rows else None
+
+    def mark_queued(self, job_id: str) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, started_at = NULL WHERE job_id = ?",
+            (STATUS_QUEUED, job_id),
+        )
+
+    def mark_running(self, job_id: str) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE job_id = ?",
+            (STATUS_RUNNING, time.time(), job_id),
+        )
+
+    def mark_succeeded(self, job_id: str, result: Any) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = NULL, finished_at = ? WHERE job_id = ?",
+            (STATUS_SUCCEEDED, json.dumps(result, ensure_ascii=False, default=str), time.time(), job_id),
+        )
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE job_id = ?",
+            (STATUS_FAILED, error, time.time(), job_id),
+        )
+
+    def list_unfinished(self) -> List[Dict[str, Any]]:
+        rows = self._fetchall(
+            "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+            UNFINISHED_STATUSES,
+        )
+        return [_row_to_job(r) for r in rows]
+
+    def queue_position(self, job: Dict[str, Any]) -> int:
+        """같은 step에서 이 작업보다 먼저 들어온 대기 작업 수 (0 = 다음 차례)"""
+        rows = self._fetchall(
+            "SELECT COUNT(*) AS n FROM jobs WHERE step = ? AND status = ? AND created_at < ?",
+            (job["step"], STATUS_QUEUED, job["created_at"]),
+        )
+        return int(rows[0]["n"]) if rows else 0
+
+    def count_by_status(self) -> Dict[str, Dict[str, int]]:
+        rows = self._fetchall("SELECT step, status, COUNT(*) AS n FROM jobs GROUP BY step, status")
+        out: Dict[str, Dict[str, int]] = {}
+        for r in rows:
+            out.setdefault(r["step"], {})[r["status"]] = int(r["n"])
+        return out
+
+    def prune_finished(self, older_than_sec: float) -> int:
+        cutoff = time.time() - older_than_sec
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at IS NOT NULL AND finished_at < ?",
+                (STATUS_SUCCEEDED, STATUS_FAILED, cutoff),
+            )
+            self._conn.commit()
+            return cur.rowcount or 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    for key in ("payload", "result"):
+        raw = job.get(key)
+        if raw is not None:
+            try:
+                job[key] = json.loads(raw)
+            except (TypeError, ValueError):
+                pass
+    return job
+
+
+# =========================================================
+# 작업 큐 / 워커 풀
+# =========================================================
+@dataclass
+class Parked:
+    """
+    handler 가 외부 대기에 들어갈 때 돌려주는 값 (executor="thread" 전용).
+
+    워커 스레드는 바로 반납되고 작업은 running 상태로 남는다. future 가 끝나면 resume(future) 를
+    같은 step 의 워커 풀에서 실행하고 그 반환값을 결과로 저장한다 (다시 Parked 면 한 번 더 대기).
+    대기 중 서버가 재시작되면 다른 running 작업처럼 _recover() 가 처음부터 다시 실행한다.
+    """
+
+    future: Future
+    resume: Callable[[Future], Any]
+
+
+class JobQueue:
+    """
+    step 이름별로 handler와 워커 풀을 등록해 두고 작업을 실행한다.
+
+    - executor="thread": handler를 워커 스레드에서 직접 실행
+    - executor="process": 워커 스레드가 process pool에 handler를 넘기고 완료를 기다림
+      (handler는 pickle 가능한 모듈 최상위 함수여야 한다)
+
+    어느 쪽이든 워커 스레드 수(workers)가 그 step의 동시 실행 상한이다.
+    (Parked 로 대기 중인 작업은 워커를 잡지 않으므로 이 상한에 들어가지 않는다)
+    """
+
+    def __init__(self, store: JobStore):
+        self.store = store
+        self._specs: Dict[str, Dict[str, Any]] = {}
+        self._threads: Dict[str, ThreadPoolExecutor] = {}
+        self._processes: Dict[str, ProcessPoolExecutor] = {}
+        self._secrets: Dict[str, Dict[str, Any]] = {}
+        self._parked: Dict[str, int] = {}
+        self._started = False
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        step: str,
+        handler: Callable[[Dict[str, Any]], Any],
+        *,
+        executor: str = "thread",
+        workers: int = 1,
+    ) -> None:
+        executor = (executor or "thread").strip().lower()
+        if executor not in {"thread", "process"}:
+            raise ValueError(f"unsupported executor for {step}: {executor}")
+        self._specs[step] = {"handler": handler, "executor": executor, "workers": max(1, int(workers))}
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            for step, spec in self._specs.items():
+                self._threads[step] = ThreadPoolExecutor(
+                    max_workers=spec["workers"],
+                    thread_name_prefix=f"job-{step}",
+                )
+                if spec["executor"] == "process":
+                    self._processes[step] = ProcessPoolExecutor(
+                        max_workers=spec["workers"],
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                print(f"[Jobs] {step}: executor={spec['executor']}, workers={spec['workers']}")
+            self._started = True
+
+        pruned = self.store.prune_finished(JOB_RETENTION_HOURS * 3600)
+        if pruned:
+            print(f"[Jobs] 오래된 완료 작업 {pruned}건 정리")
+        self._recover()
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            for pool in self._threads.values():
+                pool.shutdown(wait=wait, cancel_futures=not wait)
+            for pool in self._processes.values():
+                pool.shutdown(wait=wait, cancel_futures=not wait)
+            self._threads.clear()
+            self._processes.clear()
+            self._started = False
+
+    def submit(
+        self,
+        step: str,
+        payload: Dict[str, Any],
+        job_id: Optional[str] = None,
+        secrets: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        secrets: SQLite 에 저장하지 않을 값 (예: Bearer 토큰).
+        메모리에만 두었다가 실행 시 payload 에 합쳐 handler 에 넘기고 바로 버린다.
+        서버 재시작 후 복구된 작업에는 secrets 가 없다.
+        """
+        if step not in self._specs:
+            raise KeyError(f"unknown job step: {step}")
+        job_id = self.store.create(step, payload, job_id=job_id)
+        if secrets:
+            with self._lock:
+                self._secrets[job_id] = dict(secrets)
+        self._dispatch(job_id, step, payload)
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.store.get(job_id)
+        if not job:
+            return None
+        out = {
+            "job_id": job["job_id"],
+            "step": job["step"],
+            "status": job["status"],
+            "attempts": job["attempts"],
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+        }
+        if job["status"] == STATUS_QUEUED:
+            out["queue_position"] = self.store.queue_position(job)
+        if job["started_at"]:
+            end = job["finished_at"] or time.time()
+            out["elapsed_sec"] = round(end - job["started_at"], 1)
+        if job["status"] == STATUS_FAILED:
+            out["error"] = job["error"]
+        return out
+
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            parked = dict(self._parked)
+        return {
+            "workers": {
+                step: {"executor": spec["executor"], "workers": spec["workers"], "parked": parked.get(step, 0)}
+                for step, spec in self._specs.items()
+            },
+            "jobs": self.store.count_by_status(),
+        }
+
+    # -----------------------------------------------------
+    # 내부 실행 로직
+    # -----------------------------------------------------
+    def _dispatch(self, job_id: str, step: str, payload: Dict[str, Any]) -> None:
+        pool = self._threads.get(step)
+        if pool is None:
+            # start() 이전 submit → 시작 시 _recover()에서 실행된다
+            return
+        pool.submit(self._run, job_id, step, payload)
+
+    def _run(self, job_id: str, step: str, payload: Dict[str, Any]) -> None:
+        spec = self._specs[step]
+        with self._lock:
+            secrets = self._secrets.pop(job_id, None)
+        if secrets:
+            payload = {**payload, **secrets}
+        self.store.mark_running(job_id)
+        print(f"[Jobs] {step} 시작: job_id={job_id}")
+        t0 = time.time()
+        if spec["executor"] == "process":
+            self._execute(job_id, step, t0, lambda: self._processes[step].submit(spec["handler"], payload).result())
+        else:
+            self._execute(job_id, step, t0, lambda: spec["handler"](payload))
+
+    def _execute(self, job_id: str, step: str, t0: float, call: Callable[[], Any]) -> None:
+        try:
+            result = call()
+            if isinstance(result, Parked):
+                self._park(job_id, step, t0, result)
+                return
+            self.store.mark_succeeded(job_id, result)
+            print(f"[Jobs] {step} 완료: job_id={job_id} ({time.time() - t0:.1f}s)")
+        except Exception as e:
+            print(f"[Jobs] {step} 실패: job_id={job_id} - {e}")
+            print(traceback.format_exc())
+            self.store.mark_failed(job_id, str(e) or e.__class__.__name__)
+
+    def _park(self, job_id: str, step: str, t0: float, parked: Parked) -> None:
+        with self._lock:
+            self._parked[step] = self._parked.get(step, 0) + 1
+        print(f"[Jobs] {step} 대기 (워커 반납): job_id={job_id}")
+
+        def _on_done(future: Future) -> None:
+            # future 를 완료시킨 스레드(Gamma 스케줄러 루프 등)에서 불리므로 풀에 넘기기만 한다
+            with self._lock:
+                self._parked[step] -= 1
+                pool = self._threads.get(step)
+            if pool is None:
+                return  # shutdown 됨 → 재시작 시 _recover() 가 다시 실행
+            try:
+                pool.submit(self._execute, job_id, step, t0, lambda: parked.resume(future))
+            except RuntimeError:
+                pass  # 종료 중인 풀
+
+        parked.future.add_done_callback(_on_done)
+
+    def _recover(self) -> None:
+        for job in self.store.list_unfinished():
+            job_id = job["job_id"]
+            step = job["step"]
+            if step not in self._specs:
+                self.store.mark_failed(job_id, f"unknown job step: {step}")
+                continue
+            if int(job.get("attempts") or 0) >= JOB_MAX_ATTEMPTS:
+                self.store.mark_failed(job_id, "재시작 후 재시도 한도 초과")
+                continue
+            if job["status"] == STATUS_RUNNING:
+                self.store.mark_queued(job_id)
+            print(f"[Jobs] 재시작 복구: {step} job_id={job_id}")
+            self._dispatch(job_id, step, job["payload"])
+
+
+# =========================================================
+# 단계별 설정 (환경변수)
+# =========================================================
+def step_pool_config(step: str, *, default_workers: int, default_executor: str = "thread") -> Dict[str, Any]:
+    """
+    JOB_<STEP>_WORKERS / JOB_<STEP>_EXECUTOR 환경변수로 단계별 워커 풀 설정.
+    예: JOB_STEP3_WORKERS=2, JOB_STEP3_EXECUTOR=process
+    """
+    key = step.upper()
+    return {
+        "workers": int(os.getenv(f"JOB_{key}_WORKERS", str(default_workers))),
+        "executor": (os.getenv(f"JOB_{key}_EXECUTOR", default_executor) or default_executor).strip().lower(),
+    }
@@ -1,55 +1,37 @@
 import hashlib
 import os
-import re
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 import chromadb
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 from dotenv import load_dotenv
 from sentence_transformers import SentenceTransformer
 
 
 load_dotenv()
 
+# INGEST_* 설정을 .env 에서도 읽도록 load_dotenv 이후에 import
+try:
+    from utils.ingest_pipeline import INGEST_QUEUE_SIZE, run_ingest_pipeline
+except ImportError:  # utils/ 안에서 직접 실행하는 경우
+    from ingest_pipeline import INGEST_QUEUE_SIZE, run_ingest_pipeline
 
-def s(v) -> str:
-    if pd.isna(v):
-        return ""
-    return str(v).strip()
 
-
-def detect_column(df: pd.DataFrame, candidates) -> Optional[str]:
+def detect_column(df, candidates) -> Optional[str]:
+    # df: DataFrame 또는 컬럼 이름 리스트 (parquet 스키마)
+    columns = getattr(df, "columns", df)
     for name in candidates:
-        if name in df.columns:
+        if name in columns:
             return name
     return None
 
 
-def parse_article_number(text: str) -> str:
-    m = re.search(r"제\s*([0-9]+(?:의[0-9]+)?)\s*조", text or "")
-    return m.group(1) if m else ""
-
-
-def parse_article_title(text: str) -> str:
-    m = re.search(r"제\s*[0-9]+(?:의[0-9]+)?\s*조\s*\(([^)]+)\)", text or "")
-    return m.group(1).strip() if m else ""
-
-
-def split_chunks(text: str, size: int = 800, overlap: int = 120):
-    text = (text or "").strip()
-    if not text:
-        return []
-
-    out = []
-    i = 0
-    n = len(text)
-    while i < n:
-        j = min(i + size, n)
-        out.append(text[i:j])
-        if j == n:
-            break
-        i = max(0, j - overlap)
-    return out
+ARTICLE_NUMBER_RE = r"제\s*([0-9]+(?:의[0-9]+)?)\s*조"
+ARTICLE_TITLE_RE = r"제\s*[0-9]+(?:의[0-9]+)?\s*조\s*\(([^)]+)\)"
+CHUNK_SIZE = 800
+CHUNK_OVERLAP = 120
 
 
 def build_full_reference(law_name: str, article_number: str, article_title: str) -> str:
@@ -63,39 +45,124 @@ def build_full_reference(law_name: str, article_number: str, article_title: str)
     return " ".join(parts).strip()
 
 
-def normalize_meta(row, colmap: Dict[str, Optional[str]], text: str) -> Dict[str, str]:
-    def pick(key: str, default: str = "") -> str:
+# =========================================================
+# 컬럼 단위(벡터화) 처리: parquet record batch 하나씩
+# =========================================================
+META_FIELDS = (
+    "law_name", "law_type", "source_file", "regulation_type", "regulation_number",
+    "article_number", "article_title", "full_reference",
+)
+
+
+def text_column(frame: pd.DataFrame, col: str) -> pd.Series:
+    """문자열 컬럼 정리 (NaN/None → "", 앞뒤 공백 제거)"""
+    return frame[col].astype("string").fillna("").str.strip().astype(object)
+
+
+def normalize_meta_frame(frame: pd.DataFrame, colmap: Dict[str, Optional[str]], texts: pd.Series) -> pd.DataFrame:
+    """
+    행 전체의 메타데이터를 한 번에 만든다.
+    컬럼 값이 비어 있으면 article_number/article_title 은 본문에서 정규식으로 찾고 (비어 있는 행에만 str.extract),
+    full_reference 는 "법령명 제N조 조문제목" 으로 조합한다. law_type 기본값은 "unknown".
+    """
+    def pick(key: str, default: str = "") -> pd.Series:
         c = colmap.get(key)
         if c is None:
-            return default
-        return s(row[c]) or default
-
-    law_name = pick("law_name")
-    law_type = pick("law_type", "unknown")
-    source_file = pick("source_file")
-    regulation_type = pick("regulation_type")
-    regulation_number = pick("regulation_number")
-    article_number = pick("article_number")
-    article_title = pick("article_title")
-    full_reference = pick("full_reference")
-
-    if not article_number:
-        article_number = parse_article_number(text)
-    if not article_title:
-        article_title = parse_article_title(text)
-    if not full_reference:
-        full_reference = build_full_reference(law_name, article_number, article_title)
-
-    return {
-        "law_name": law_name,
-        "law_type": law_type,
-        "source_file": source_file,
-        "regulation_type": regulation_type,
-        "regulation_number": regulation_number,
-        "article_number": article_number,
-        "article_title": article_title,
-        "full_reference": full_reference,
-    }
+            return pd.Series(default, index=frame.index, dtype=object)
+        values = text_column(frame, c)
+        return values.where(values != "", default)
+
+    meta = pd.DataFrame({field: pick(field, "unknown" if field == "law_type" else "") for field in META_FIELDS})
+
+    missing = meta["article_number"] == ""
+    if missing.any():
+        meta.loc[missing, "article_number"] = texts[missing].str.extract(ARTICLE_NUMBER_RE, expand=False).fillna("")
+    missing = meta["article_title"] == ""
+    if missing.any():
+        meta.loc[missing, "article_title"] = (
+            texts[missing].str.extract(ARTICLE_TITLE_RE, expand=False).fillna("").str.strip()
+        )
+    missing = meta["full_reference"] == ""
+    if missing.any():
+        sub = meta.loc[missing]
+        meta.loc[missing, "full_reference"] = [
+            build_full_reference(a, b, c)
+            for a, b, c in zip(sub["law_name"], sub["article_number"], sub["article_title"])
+        ]
+    return meta
+
+
+def explode_chunks(texts: np.ndarray, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP):
+    """
+    각 행 본문을 size 글자씩, 앞 청크와 overlap 글자 겹치게 자른다 (빈 본문은 청크 없음).
+    전체 행에 대해 한 번에 계산 → (행 위치, 행 안의 청크 번호, 청크 문자열) 세 컬럼
+    """
+    step = size - overlap
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    counts = np.where(lengths <= size, 1, -(-(lengths - size) // step) + 1)
+    counts[lengths == 0] = 0
+
+    row_pos = np.repeat(np.arange(len(texts)), counts)
+    chunk_no = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    starts = chunk_no * step
+    chunks = [texts[r][a:a + size] for r, a in zip(row_pos.tolist(), starts.tolist())]
+    return row_pos, chunk_no, chunks
+
+
+def parquet_index_spec(parquet: pq.ParquetFile) -> Tuple[List[str], int, int]:
+    """
+    pd.read_parquet 이 복원하는 행 인덱스 (parquet 의 pandas 메타데이터)
+    → (인덱스 컬럼 이름들, RangeIndex start, step).
+    인덱스 컬럼이 있으면 batch.to_pandas() 가 그 값으로 인덱스를 만든다. 없으면 start + step × 행 위치
+    (pandas 메타데이터가 없는 파일은 0, 1, 2, ...).
+    """
+    meta = parquet.schema_arrow.pandas_metadata or {}
+    index_columns = meta.get("index_columns") or []
+    names = [c for c in index_columns if isinstance(c, str)]
+    if names:
+        return names, 0, 1
+    for c in index_columns:
+        if isinstance(c, dict) and c.get("kind") == "range":
+            return [], int(c.get("start", 0)), int(c.get("step", 1))
+    return [], 0, 1
+
+
+def iter_parquet_items(parquet_path: str, colmap: Dict[str, Optional[str]], read_rows: int):
+    """
+    parquet 를 read_rows 행씩 읽어 (id, document, metadata, embed_text) 를 yield.
+    한 번에 메모리에 올라가는 것은 record batch 하나 분량뿐이다.
+    id 는 기존 pd.read_parquet(...).iterrows() 경로와 같다 (저장된 pandas 인덱스 값 기준, parquet_index_spec).
+    """
+    parquet = pq.ParquetFile(parquet_path)
+    index_columns, start, step = parquet_index_spec(parquet)
+    columns = sorted({c for c in colmap.values() if c} | set(index_columns))
+    offset = 0
+    for batch in parquet.iter_batches(batch_size=read_rows, columns=columns):
+        frame = batch.to_pandas()
+        if not index_columns:
+            frame.index = pd.RangeIndex(start + offset * step, start + (offset + len(frame)) * step, step)
+        offset += len(frame)
+
+        texts = text_column(frame, colmap["text"])  # type: ignore[arg-type]
+        keep = texts != ""
+        if not keep.any():
+            continue
+        frame, texts = frame[keep], texts[keep]
+
+        meta = normalize_meta_frame(frame, colmap, texts)
+        metas = meta.to_dict("records")
+        row_ids = list(frame.index)  # iterrows 가 돌려주는 인덱스 값 그대로 (문자열/튜플 포함)
+        law_names = meta["law_name"].to_numpy()
+        law_types = meta["law_type"].to_numpy()
+        sources = meta["source_file"].to_numpy()
+        articles = meta["article_number"].to_numpy()
+
+        row_pos, chunk_no, chunks = explode_chunks(texts.to_numpy())
+        for r, j, chunk in zip(row_pos.tolist(), chunk_no.tolist(), chunks):
+            uid_seed = f"{law_names[r]}|{sources[r]}|{articles[r]}|{row_ids[r]}|{j}|{chunk[:120]}"
+            uid = hashlib.sha1(uid_seed.encode("utf-8")).hexdigest()[:24]
+            doc = f"passage: {law_names[r]} {law_types[r]}: {chunk}".strip()
+            yield uid, doc, metas[r], doc
 
 
 def main():
@@ -106,30 +173,34 @@ def main():
     model_name = os.environ.get("LAW_EMBED_MODEL_NAME", "intfloat/multilingual-e5-base")
     recreate = os.environ.get("LAW_RECREATE", "false").lower() in {"1", "true", "yes", "y"}
     batch_size = int(os.environ.get("LAW_BATCH_SIZE", "64"))
+    read_rows = int(os.environ.get("LAW_READ_BATCH_ROWS", "2048"))
+    write_batch_size = int(os.environ.get("LAW_WRITE_BATCH_SIZE", str(batch_size * 4)))
 
     print("=" * 60)
     print("[LAW INGEST] parquet -> chroma")
     print(f"parquet: {parquet_path}")
     print(f"chroma : {host}:{port}, collection={collection_name}")
     print(f"model  : {model_name}")
-    print(f"recreate={recreate}, batch_size={batch_size}")
+    print(f"recreate={recreate}, batch_size={batch_size}, write_batch_size={write_batch_size}")
 
     if not os.path.exists(parquet_path):
         raise FileNotFoundError(parquet_path)
 
-    df = pd.read_parquet(parquet_path)
-    print(f"rows={len(df)}, columns={list(df.columns)}")
+    # 전체를 DataFrame 으로 읽지 않고 스키마만 확인 (본문은 record batch 단위로 스트리밍)
+    parquet = pq.ParquetFile(parquet_path)
+    column_names = parquet.schema_arrow.names
+    print(f"rows={parquet.metadata.num_rows}, columns={column_names}")
 
     colmap = {
-        "text": detect_column(df, ["chunk_text", "content", "text", "document", "body", "raw_text"]),
-        "law_name": detect_column(df, ["law_name", "law", "law_title"]),
-        "law_type": detect_column(df, ["law_type", "doc_type", "type"]),
-        "source_file": detect_column(df, ["source_file", "file_name", "filename", "pdf_name"]),
-        "regulation_type": detect_column(df, ["regulation_type", "reg_type"]),
-        "regulation_number": detect_column(df, ["regulation_number", "reg_number", "law_number"]),
-        "article_number": detect_column(df, ["article_number", "article_no", "article"]),
-        "article_title": detect_column(df, ["article_title", "article_name", "article_subject"]),
-        "full_reference": detect_column(df, ["full_reference", "reference"]),
+        "text": detect_column(column_names, ["chunk_text", "content", "text", "document", "body", "raw_text"]),
+        "law_name": detect_column(column_names, ["law_name", "law", "law_title"]),
+        "law_type": detect_column(column_names, ["law_type", "doc_type", "type"]),
+        "source_file": detect_column(column_names, ["source_file", "file_name", "filename", "pdf_name"]),
+        "regulation_type": detect_column(column_names, ["regulation_type", "reg_type"]),
+        "regulation_number": detect_column(column_names, ["regulation_number", "reg_number", "law_number"]),
+        "article_number": detect_column(column_names, ["article_number", "article_no", "article"]),
+        "article_title": detect_column(column_names, ["article_title", "article_name", "article_subject"]),
+        "full_reference": detect_column(column_names, ["full_reference", "reference"]),
     }
     if colmap["text"] is None:
         raise RuntimeError("text column missing")
@@ -147,39 +218,24 @@ def main():
 
     model = SentenceTransformer(model_name)
 
-    ids = []
-    docs = []
-    metas = []
-    total_added = 0
-
-    for i, row in df.iterrows():
-        text = s(row[colmap["text"]])  # type: ignore[index]
-        if not text:
-            continue
-
-        meta = normalize_meta(row, colmap, text)
-        chunk_list = split_chunks(text)
-
-        for j, chunk in enumerate(chunk_list):
-            uid_seed = f"{meta['law_name']}|{meta['source_file']}|{meta['article_number']}|{i}|{j}|{chunk[:120]}"
-            uid = hashlib.sha1(uid_seed.encode("utf-8")).hexdigest()[:24]
-            doc = f"passage: {meta['law_name']} {meta['law_type']}: {chunk}".strip()
-
-            ids.append(uid)
-            docs.append(doc)
-            metas.append(meta)
-
-            if len(ids) >= batch_size:
-                emb = model.encode(docs, normalize_embeddings=True).tolist()
-                col.upsert(ids=ids, documents=docs, metadatas=metas, embeddings=emb)
-                total_added += len(ids)
-                print(f"upserted={total_added}")
-                ids, docs, metas = [], [], []
-
-    if ids:
-        emb = model.encode(docs, normalize_embeddings=True).tolist()
-        col.upsert(ids=ids, documents=docs, metadatas=metas, embeddings=emb)
-        total_added += len(ids)
+    def encode(texts):
+        return model.encode(texts, batch_size=len(texts), normalize_embeddings=True).tolist()
+
+    def write(ids, docs, metas, embeddings):
+        col.upsert(ids=ids, documents=docs, metadatas=metas, embeddings=embeddings)
+
+    # 인코딩과 upsert 를 겹쳐 실행 (encoder=현재 스레드, writer=백그라운드 스레드)
+    result = run_ingest_pipeline(
+        iter_parquet_items(parquet_path, colmap, read_rows),
+        encode,
+        write,
+        encode_batch_size=batch_size,
+        write_batch_size=write_batch_size,
+        queue_size=INGEST_QUEUE_SIZE,
+        progress_every=1,
+        label="law",
+    )
+    total_added = result["write"]["items"]
 
     print("=" * 60)
     print(f"done. added={total_added}, final_count={col.count()}")
@@ -0,0 +1,328 @@
+# utils/llm_gateway.py
+"""
+Gemini 호출 게이트웨이 (프로세스 공용)
+
+모든 기능(Step 1~4, PPT 노드)의 generate_content 호출은 llm_gateway.generate_content() 를 거친다.
+- 모델별 token bucket: 분당 요청 수(RPM) / 분당 토큰 수(TPM). 토큰은 프롬프트 길이로 미리 잡고 응답 usage 로 보정 (실패한 시도는 돌려줌)
+- 동시 호출 상한 LLM_MAX_CONCURRENCY (세마포어, 대기 중엔 슬롯을 잡지 않고 backoff)
+- 429 공용 cooldown: 한 호출이 "retry in Xs" / RESOURCE_EXHAUSTED 를 받으면 모든 호출이 그 시간 동안 대기
+- 재시도/backoff 는 여기 한 곳에서 (다른 오류는 해당 호출만 지수 backoff)
+- 대기 시간(cooldown + rate limit + 슬롯) 분포와 모델별 호출/오류/토큰 수는 /api/metrics 의 "llm" 항목
+
+환경변수
+  LLM_MAX_CONCURRENCY     : 프로세스 전체 동시 호출 수 (기본 8)
+  LLM_DEFAULT_RPM / TPM   : 모델별 기본 한도 (0 이면 제한 없음)
+  LLM_MODEL_LIMITS        : 모델별 덮어쓰기 JSON, 예) {"gemini-2.5-flash": {"rpm": 1000, "tpm": 1000000}}
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_DEFAULT_RPM = float(os.getenv("LLM_DEFAULT_RPM", "150"))
+LLM_DEFAULT_TPM = float(os.getenv("LLM_DEFAULT_TPM", "1000000"))
+LLM_MAX_COOLDOWN_SEC = float(os.getenv("LLM_MAX_COOLDOWN_SEC", "120"))
+QUEUE_WAIT_SAMPLES = 512
+
+
+def _load_model_limits() -> Dict[str, Dict[str, float]]:
+    raw = (os.getenv("LLM_MODEL_LIMITS") or "").strip()
+    if not raw:
+        return {}
+    try:
+        limits = json.loads(raw)
+        return {str(k).split("/")[-1]: v for k, v in limits.items() if isinstance(v, dict)}
+    except Exception as e:
+        print(f"[LLM] LLM_MODEL_LIMITS 파싱 실패, 기본 한도 사용: {e}")
+        return {}
+
+
+# =========================================================
+# 오류 분류
+# =========================================================
+def extract_retry_seconds(msg: str) -> Optional[int]:
+    """에러 메시지의 'Please retry in 46.7s' / 'retry in 46s' → 초"""
+    m = re.search(r"retry in\s+(\d+)(?:\.\d+)?s", msg.lower())
+    if m:
+        return int(m.group(1))
+    return None
+
+
+def is_permanent_free_tier_block(msg: str) -> bool:
+    """재시도해도 안 풀리는 0 한도(결제/권한 문제)만 True. 'limit: 5 ... retry in 46s' 같은 일시 한도는 False"""
+    low = msg.lower()
+    return ("limit: 0" in low) or ("quotavalue': '0" in low) or ("quota value: 0" in low)
+
+
+def is_rate_limited(msg: str) -> bool:
+    low = msg.lower()
+    return ("429" in low) or ("resource_exhausted" in low) or ("rate limit" in low)
+
+
+def estimate_tokens(contents: Any, config: Any = None) -> int:
+    """프롬프트 토큰 대략치 (한글 섞인 문서 기준 글자 3개 ≈ 1 토큰)"""
+
+    def chars(x: Any) -> int:
+        if x is None:
+            return 0
+        if isinstance(x, str):
+            return len(x)
+        if isinstance(x, (list, tuple)):
+            return sum(chars(i) for i in x)
+        text = getattr(x, "text", None)
+        if isinstance(text, str):
+            return len(text)
+        return chars(list(getattr(x, "parts", None) or []))
+
+    system = getattr(config, "system_instruction", None) if config is not None else None
+    return (chars(contents) + chars(system)) // 3 + 1
+
+
+# =========================================================
+# 구성 요소
+# =========================================================
+class RateLimitCooldown:
+    """프로세스 공용 rate limit 대기 시각. trip() 으로 늘리고, 호출 전 wait() 로 기다린다"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._until = 0.0
+        self.trips = 0
+
+    def trip(self, seconds: float) -> float:
+        """지금부터 seconds 동안 모든 호출을 멈춤 (이미 더 긴 대기가 걸려 있으면 유지). 실제 남은 대기 반환"""
+        with self._lock:
+            self._until = max(self._until, time.monotonic() + seconds)
+            self.trips += 1
+            return self._until - time.monotonic()
+
+    def remaining(self) -> float:
+        with self._lock:
+            return max(0.0, self._until - time.monotonic())
+
+    def wait(self) -> float:
+        """대기 중이면 풀릴 때까지 sleep. 기다린 시간(초) 반환"""
+        waited = 0.0
+        while True:
+            left = self.remaining()
+            if left <= 0:
+                return waited
+            time.sleep(left)
+            waited += left
+
+
+class TokenBucket:
+    """분당 per_minute 만큼 채워지는 bucket. reserve() 는 먼저 차감하고 기다릴 시간을 돌려준다 (순서대로 줄 세움)"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, n: float) -> float:
+        if self.capacity <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= min(n, self.capacity)
+            return max(0.0, -self._tokens / self.rate)
+
+    def adjust(self, n: float) -> None:
+        """예약량과 실제 사용량 차이 보정 (n>0 이면 더 씀)"""
+        if self.capacity <= 0 or not n:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - n)
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return round(self._tokens, 1)
+
+
+class _ModelState:
+    def __init__(self, rpm: float, tpm: float):
+        self.rpm = TokenBucket(rpm)
+        self.tpm = TokenBucket(tpm)
+        self.queue_waits: Deque[float] = deque(maxlen=QUEUE_WAIT_SAMPLES)
+        self.counters: Dict[str, float] = {
+            "calls": 0, "ok": 0, "errors": 0, "retries": 0, "rate_limited": 0,
+            "input_tokens": 0, "output_tokens": 0, "limiter_wait_sec": 0.0,
+        }
+
+
+def _percentile(xs: list, p: float) -> float:
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round((len(xs) - 1) * p / 100.0)))]
+
+
+# =========================================================
+# 게이트웨이
+# =========================================================
+class LLMGateway:
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, default_rpm: float = LLM_DEFAULT_RPM, default_tpm: float = LLM_DEFAULT_TPM):
+        self.max_concurrency = max(1, max_concurrency)
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.model_limits = _load_model_limits()
+        self.cooldown = RateLimitCooldown()
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._models: Dict[str, _ModelState] = {}
+        self._in_flight = 0
+        self._waiting = 0
+
+    def _model(self, model: str) -> _ModelState:
+        key = str(model or "").split("/")[-1] or "-"
+        with self._lock:
+            state = self._models.get(key)
+            if state is None:
+                limits = self.model_limits.get(key) or {}
+                state = _ModelState(float(limits.get("rpm", self.default_rpm)), float(limits.get("tpm", self.default_tpm)))
+                self._models[key] = state
+            return state
+
+    def _count(self, state: _ModelState, key: str, n: float = 1) -> None:
+        with self._lock:
+            state.counters[key] += n
+
+    def _acquire_slot(self) -> None:
+        with self._lock:
+            self._waiting += 1
+        self._slots.acquire()
+        with self._lock:
+            self._waiting -= 1
+            self._in_flight += 1
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def generate_content(
+        self,
+        client: Any,
+        *,
+        model: str,
+        contents: Any,
+        config: Any = None,
+        max_retries: int = 3,
+        base_sleep_sec: float = 1.5,
+        call_stats: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """client.models.generate_content 를 한도/재시도 아래에서 호출. call_stats 에 시도/대기 시간 기록"""
+        state = self._model(model)
+        est_tokens = estimate_tokens(contents, config)
+        stats = call_stats if call_stats is not None else {}
+        stats.update({"attempts": 0, "backoff_sec": 0.0, "cooldown_wait_sec": 0.0, "queue_wait_sec": 0.0})
+        last_exc: Optional[Exception] = None
+        self._count(state, "calls")
+
+        for attempt in range(max(1, max_retries)):
+            t_enter = time.monotonic()
+            # 다른 스레드가 받은 429 대기 → 모델 한도 → 동시 호출 슬롯 순서로 기다린다
+            stats["cooldown_wait_sec"] += self.cooldown.wait()
+            limiter_wait = max(state.rpm.reserve(1), state.tpm.reserve(est_tokens))
+            if limiter_wait > 0:
+                time.sleep(limiter_wait)
+                self._count(state, "limiter_wait_sec", limiter_wait)
+            self._acquire_slot()
+            queue_wait = time.monotonic() - t_enter
+            stats["queue_wait_sec"] += queue_wait
+            with self._lock:
+                state.queue_waits.append(queue_wait)
+            stats["attempts"] += 1
+            if attempt:
+                self._count(state, "retries")
+
+            try:
+                resp = client.models.generate_content(model=model, contents=contents, config=config)
+            except Exception as e:
+                last_exc = e
+                # 실패한 시도는 토큰을 쓰지 않았으므로 TPM 예약을 돌려준다 (재시도가 이중으로 차감되지 않게)
+                state.tpm.adjust(-est_tokens)
+            else:
+                usage = getattr(resp, "usage_metadata", None)
+                used_in = getattr(usage, "prompt_token_count", None) or 0
+                used_out = getattr(usage, "candidates_token_count", None) or 0
+                if used_in or used_out:
+                    state.tpm.adjust(used_in + used_out - est_tokens)
+                self._count(state, "input_tokens", used_in)
+                self._count(state, "output_tokens", used_out)
+                self._count(state, "ok")
+                return resp
+            finally:
+                self._release_slot()
+
+            msg = str(last_exc)
+            # 정말로 0 한도면 즉시 중단
+            if is_permanent_free_tier_block(msg):
+                self._count(state, "errors")
+                raise RuntimeError(
+                    "Gemini free-tier quota가 0(또는 결제/권한 문제로 영구 차단)입니다. "
+                    "Billing 연결 또는 프로젝트/키를 확인하세요."
+                ) from last_exc
+
+            # retry in 이 있으면 그만큼 공용 cooldown (다음 루프의 cooldown.wait() 에서 모두 대기)
+            retry_sec = extract_retry_seconds(msg)
+            sleep_sec = min(base_sleep_sec * (2 ** attempt), 30.0)
+            if retry_sec is not None or is_rate_limited(msg):
+                self._count(state, "rate_limited")
+                wait = self.cooldown.trip(min(retry_sec + 1, LLM_MAX_COOLDOWN_SEC) if retry_sec is not None else sleep_sec)
+                print(f"[WARN] Gemini rate limit ({model}). shared wait {wait:.1f}s then retry... ({attempt+1}/{max_retries})")
+                continue
+
+            # 그 외 오류는 이 호출만 backoff
+            if attempt + 1 < max_retries:
+                print(f"[WARN] Gemini error ({model}). backoff {sleep_sec:.1f}s then retry... ({attempt+1}/{max_retries}): {msg[:200]}")
+                time.sleep(sleep_sec)
+                stats["backoff_sec"] += sleep_sec
+
+        self._count(state, "errors")
+        raise RuntimeError(f"Gemini 재시도 초과: {last_exc}") from last_exc
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {}
+            for name, state in self._models.items():
+                waits = list(state.queue_waits)
+                models[name] = {
+                    **{k: round(v, 3) if isinstance(v, float) else v for k, v in state.counters.items()},
+                    "rpm_limit": state.rpm.capacity,
+                    "tpm_limit": state.tpm.capacity,
+                    "queue_wait_p50_sec": round(_percentile(waits, 50), 3),
+                    "queue_wait_p95_sec": round(_percentile(waits, 95), 3),
+                    "queue_wait_max_sec": round(max(waits), 3) if waits else 0.0,
+                }
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "cooldown_remaining_sec": round(self.cooldown.remaining(), 1),
+                "cooldown_trips": self.cooldown.trips,
+                "models": models,
+            }
+
+
+llm_gateway = LLMGateway()
+
+
+def llm_gateway_stats() -> Dict[str, Any]:
+    return llm_gateway.stats()
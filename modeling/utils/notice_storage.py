@@ -2,23 +2,15 @@
 from __future__ import annotations
 
 import json
-import os
 import re
 from typing import Any, Dict, List
 
-import mysql.connector
+from utils.db_pool import get_connection
 
 
 def get_db_conn():
-    return mysql.connector.connect(
-        host=os.environ["DB_HOST"],
-        port=int(os.environ.get("DB_PORT", "3306")),
-        user=os.environ["DB_USER"],
-        password=os.environ["DB_PASSWORD"],
-        database=os.environ["DB_NAME"],
-        charset="utf8mb4",
-        use_unicode=True,
-    )
+    # 공용 커넥션 풀 (close() 시 반납)
+    return get_connection()
 
 
 def _strip_html(s: str) -> str:
@@ -0,0 +1,326 @@
+# utils/parse_cache.py
+"""
+문서 파싱 결과 캐시 (content-addressed)
+
+키 = 파서 종류 + 파서 버전 + 파일 바이트 SHA-256.
+같은 첨부파일이 /parse, PPT extract 노드, com_info, scorer 등에서 반복 파싱되는 것을 막는다.
+
+- 메모리 hot tier: 직렬화된 JSON 문자열을 바이트 상한 LRU로 보관
+- 디스크 tier: 키별 JSON 파일, 총 용량 상한을 넘으면 가장 오래 안 쓴 파일부터 삭제 (mtime 기준)
+- 결과는 항상 json.loads 로 새로 만들어 돌려주므로 호출자가 수정해도 캐시가 오염되지 않는다
+
+파일 경로에 따라 달라지는 값(doc_id, source 등)은 호출자가 저장 전에 빼고 반환 후 다시 채운다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR", os.path.join("tmp", "parse_cache"))
+PARSE_CACHE_MAX_MB = float(os.getenv("PARSE_CACHE_MAX_MB", "512"))
+PARSE_CACHE_MEMORY_MB = float(os.getenv("PARSE_CACHE_MEMORY_MB", "64"))
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# parse_fn() 이 None 을 돌려준 파일(잘못된 DOCX 등)을 표시하는 값. None 은 miss 와 구분되지 않아 따로 저장한다
+_NONE_MARKER = {"__parse_cache__": "none"}
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, cache_dir: str, max_disk_bytes: int, max_memory_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None  # 첫 사용 시 디렉터리 스캔
+
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+
+    # ---------------------------------------------------------
+    # 내부: 디스크
+    # ---------------------------------------------------------
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _scan_disk_bytes(self) -> int:
+        total = 0
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    try:
+                        total += os.path.getsize(os.path.join(root, name))
+                    except OSError:
+                        pass
+        return total
+
+    def _ensure_disk_bytes(self) -> int:
+        if self._disk_bytes is None:
+            self._disk_bytes = self._scan_disk_bytes()
+        return self._disk_bytes
+
+    def _evict_disk(self) -> None:
+        if self._ensure_disk_bytes() <= self.max_disk_bytes:
+            return
+
+        entries = []
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _mtime, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.counters["evictions"] += 1
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    # ---------------------------------------------------------
+    # 내부: 메모리
+    # ---------------------------------------------------------
+    def _remember(self, key: str, text: str) -> None:
+        size = len(text)
+        if size > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = text
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes and self._memory:
+            _, dropped = self._memory.popitem(last=False)
+            self._memory_bytes -= len(dropped)
+
+    # ---------------------------------------------------------
+    # 공개 API
+    # ---------------------------------------------------------
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return json.loads(text)
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            value = json.loads(text)
+        except FileNotFoundError:
+            with self._lock:
+                self.counters["misses"] += 1
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[ParseCache] 캐시 파일 손상, 무시: {path} ({e})")
+            with self._lock:
+                self.counters["errors"] += 1
+                self.counters["misses"] += 1
+            return None
+
+        try:
+            os.utime(path, None)  # LRU 갱신
+        except OSError:
+            pass
+        with self._lock:
+            self.counters["disk_hits"] += 1
+            self._remember(key, text)
+        return value
+
+    def _tmp_path(self, key: str) -> str:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return f"{path}.{uuid.uuid4().hex}.tmp"
+
+    def _install(self, key: str, tmp_path: str, text: Optional[str] = None) -> None:
+        """다 쓴 임시 파일을 캐시 파일로 교체하고 용량 집계/정리. text 가 있으면 메모리 tier 에도 넣는다"""
+        path = self._path(key)
+        try:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            new_size = os.path.getsize(path)
+        except OSError as e:
+            print(f"[ParseCache] 저장 실패: {path} ({e})")
+            with self._lock:
+                self.counters["errors"] += 1
+            return
+
+        with self._lock:
+            self.counters["stores"] += 1
+            if text is not None:
+                self._remember(key, text)
+            self._disk_bytes = self._ensure_disk_bytes() - old_size + new_size
+            self._evict_disk()
+
+    def put(self, key: str, value: Any) -> None:
+        text = json.dumps(value, ensure_ascii=False)
+        try:
+            tmp_path = self._tmp_path(key)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+        except OSError as e:
+            print(f"[ParseCache] 저장 실패: {self._path(key)} ({e})")
+            with self._lock:
+                self.counters["errors"] += 1
+            return
+        self._install(key, tmp_path, text)
+
+    def put_iter(self, key: str, items: Iterable[Any]) -> Iterator[Any]:
+        """
+        items 를 그대로 흘려보내면서 항목마다 캐시 파일(JSON 배열)에 이어 쓴다.
+        전체를 메모리에 모으지 않으며, 끝까지 소비된 경우에만 캐시 파일로 교체한다 (중간에 끊기면 버림).
+        메모리 tier 에는 넣지 않는다 (다음 get 에서 디스크 hit 로 올라옴).
+        """
+        f = None
+        tmp_path = ""
+        try:
+            tmp_path = self._tmp_path(key)
+            f = open(tmp_path, "w", encoding="utf-8")
+            f.write("[")
+        except OSError as e:
+            print(f"[ParseCache] 저장 실패: {self._path(key)} ({e})")
+            with self._lock:
+                self.counters["errors"] += 1
+            f = None
+
+        completed = False
+        try:
+            first = True
+            for item in items:
+                if f is not None:
+                    try:
+                        f.write(("" if first else ",") + json.dumps(item, ensure_ascii=False))
+                    except OSError as e:
+                        print(f"[ParseCache] 저장 실패: {self._path(key)} ({e})")
+                        with self._lock:
+                            self.counters["errors"] += 1
+                        f.close()
+                        f = None
+                first = False
+                yield item
+            completed = True
+        finally:
+            if f is not None:
+                try:
+                    if completed:
+                        f.write("]")
+                    f.close()
+                except OSError:
+                    completed = False
+                if completed:
+                    self._install(key, tmp_path)
+            if tmp_path and os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def key_for(self, kind: str, version: str, path: str) -> Optional[str]:
+        """파일을 읽을 수 없으면 None (캐시 우회)"""
+        try:
+            digest = file_sha256(path)
+        except OSError as e:
+            print(f"[ParseCache] 캐시 우회 (해시 실패): {e}")
+            return None
+        return hashlib.sha256(f"{kind}|{version}|{digest}".encode("utf-8")).hexdigest()
+
+    def get_or_parse(self, kind: str, version: str, path: str, parse_fn: Callable[[], Any]) -> Any:
+        key = self.key_for(kind, version, path)
+        if key is None:
+            return parse_fn()
+
+        cached = self.get(key)
+        if cached is not None:
+            return None if cached == _NONE_MARKER else cached
+
+        started = time.perf_counter()
+        value = parse_fn()
+        print(f"[ParseCache] miss: {os.path.basename(path)} ({kind}, {time.perf_counter() - started:.2f}s)")
+        self.put(key, _NONE_MARKER if value is None else value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            return {
+                "enabled": PARSE_CACHE_ENABLED,
+                "cache_dir": self.cache_dir,
+                **self.counters,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._ensure_disk_bytes(),
+                "max_disk_bytes": self.max_disk_bytes,
+            }
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+
+parse_cache = ParseCache(
+    cache_dir=PARSE_CACHE_DIR,
+    max_disk_bytes=int(PARSE_CACHE_MAX_MB * 1024 * 1024),
+    max_memory_bytes=int(PARSE_CACHE_MEMORY_MB * 1024 * 1024),
+)
+
+
+def cached_parse(kind: str, version: str, path: str, parse_fn: Callable[[], Any]) -> Any:
+    """캐시가 꺼져 있거나 캐시 읽기/쓰기가 실패하면 그냥 parse_fn() 결과를 쓴다."""
+    if not PARSE_CACHE_ENABLED:
+        return parse_fn()
+    return parse_cache.get_or_parse(kind, version, path, parse_fn)
+
+
+def cached_iter(kind: str, version: str, path: str, iter_fn: Callable[[], Iterable[Any]]) -> Iterator[Any]:
+    """cached_parse 의 스트리밍 버전: hit 이면 저장된 리스트를, miss 면 iter_fn() 을 흘려보내며 캐시 파일에 이어 쓴다"""
+    key = parse_cache.key_for(kind, version, path) if PARSE_CACHE_ENABLED else None
+    if key is None:
+        yield from iter_fn()
+        return
+
+    cached = parse_cache.get(key)
+    if cached is not None:
+        yield from cached
+        return
+    yield from parse_cache.put_iter(key, iter_fn())
@@ -0,0 +1,435 @@
+# utils/parser_core.py
+"""
+PDF / DOCX 파서 엔진 (단일 구현)
+
+utils/document_parsing.py 와 parsing.py(UniversalParser) 는 같은 알고리즘에 출력 형식만 달랐다.
+차이는 OutputProfile 로 표현하고, 파싱 로직·캐시·페이지 병렬화는 이 모듈 한 곳에서 처리한다.
+
+- NOTICE_PROFILE    : document_parsing 형식 ("texts", [TABLE START]/[TABLE END], 이미지/텍스트박스 포함)
+- UNIVERSAL_PROFILE : parsing.UniversalParser 형식 ("contents", [TABLE], [IMAGE], 문단/표만)
+
+두 프로필 모두 기존 모듈과 바이트 단위로 같은 결과를 낸다.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import time
+import zipfile
+from dataclasses import dataclass
+from functools import partial
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from lxml import etree
+
+try:
+    from utils import bbox_index
+    from utils.parse_cache import cached_iter, cached_parse
+    from utils.pdf_parallel import iter_pdf_pages
+except ImportError:  # utils/ 안에서 직접 실행하는 경우
+    import bbox_index
+    from parse_cache import cached_iter, cached_parse
+    from pdf_parallel import iter_pdf_pages
+
+# 파싱 결과 형식이 바뀌면 올려서 parse cache 를 무효화한다
+PARSER_VERSION = "2"
+
+# 페이지별 소요 시간 훅: on_page(page_index, elapsed_sec). 캐시 hit 페이지는 호출되지 않는다
+PageHook = Callable[[int, float], None]
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """파서 출력 형식 정의"""
+    name: str
+    text_key: str                  # 페이지 dict 의 텍스트 리스트 키
+    table_template: str            # {md} 자리에 마크다운 표
+    image_text: str
+    keep_empty_single_cell: bool   # 1x1 표가 빈 문자열이어도 넣을지
+    sort_words: bool               # extract_words 결과를 (top, x0) 로 정렬할지
+    docx_rich: bool                # DOCX 텍스트박스/이미지까지 추출할지
+    docx_require_document: bool    # word/document.xml 없으면 None 반환 (False 면 예외)
+
+
+NOTICE_PROFILE = OutputProfile(
+    name="document_parsing",
+    text_key="texts",
+    table_template="\n[TABLE START]\n{md}\n[TABLE END]",
+    image_text="\n[IMAGE: 그림/도표/이미지 포함됨]\n",
+    keep_empty_single_cell=True,
+    sort_words=False,
+    docx_rich=True,
+    docx_require_document=False,
+)
+
+UNIVERSAL_PROFILE = OutputProfile(
+    name="parsing",
+    text_key="contents",
+    table_template="[TABLE]\n{md}",
+    image_text="[IMAGE]",
+    keep_empty_single_cell=False,
+    sort_words=True,
+    docx_rich=False,
+    docx_require_document=True,
+)
+
+
+# ==========================================================
+# PDF
+# ==========================================================
+def table_to_markdown(table_data) -> str:
+    if not table_data:
+        return ""
+    lines = []
+    for row in table_data:
+        cleaned = [str(cell).replace("\n", " ").strip() if cell else "" for cell in row]
+        lines.append("| " + " | ".join(cleaned) + " |")
+    return "\n".join(lines)
+
+
+def _group_lines(words: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """top 차이가 5pt 미만인 연속 단어를 한 줄로 묶는다"""
+    lines = []
+    current = [words[0]]
+    for w in words[1:]:
+        if abs(w["top"] - current[-1]["top"]) < 5:
+            current.append(w)
+        else:
+            lines.append(current)
+            current = [w]
+    lines.append(current)
+    return lines
+
+
+def parse_pdf_page(page, page_idx: int, profile: OutputProfile) -> Tuple[Dict[str, Any], float]:
+    """pdfplumber Page 하나 → (페이지 dict, 소요 시간). process pool 워커에서도 호출된다"""
+    started = time.perf_counter()
+
+    tables = bbox_index.filter_overlapping_tables(page.find_tables())
+    table_bboxes = [t.bbox for t in tables]
+    page_contents = []
+
+    # Tables
+    for table in tables:
+        extracted = table.extract()
+        if not extracted:
+            continue
+        if len(extracted) == 1 and len(extracted[0]) == 1:
+            text = str(extracted[0][0]).strip().replace("\n", " ")
+            if text or profile.keep_empty_single_cell:
+                page_contents.append({"top": table.bbox[1], "text": text})
+        else:
+            md = table_to_markdown(extracted)
+            if md:
+                page_contents.append({"top": table.bbox[1], "text": profile.table_template.format(md=md)})
+
+    # Images
+    for img in page.images:
+        if img.get("height", 0) > 10 and img.get("width", 0) > 10:
+            page_contents.append({"top": img.get("top", 0), "text": profile.image_text})
+
+    # Text (표 영역 밖 단어만)
+    words = bbox_index.words_outside_boxes(page.extract_words(), table_bboxes)
+    if words:
+        if profile.sort_words:
+            words.sort(key=itemgetter("top", "x0"))
+        for line in _group_lines(words):
+            merged = " ".join(w["text"] for w in line).strip()
+            if merged:
+                page_contents.append({"top": line[0]["top"], "text": merged})
+
+    page_contents.sort(key=itemgetter("top"))
+    page_data = {"page_index": page_idx, profile.text_key: [c["text"] for c in page_contents]}
+    return page_data, time.perf_counter() - started
+
+
+def _iter_parsed_pages(pdf_path: str, profile: OutputProfile, on_page: Optional[PageHook]) -> Iterator[Dict[str, Any]]:
+    page_fn = partial(parse_pdf_page, profile=profile)
+    for page_data, elapsed in iter_pdf_pages(pdf_path, page_fn):
+        if on_page is not None:
+            on_page(page_data["page_index"], elapsed)
+        yield page_data
+
+
+def iter_pdf(pdf_path: str, profile: OutputProfile, on_page: Optional[PageHook] = None) -> Iterator[Dict[str, Any]]:
+    """페이지 dict 를 순서대로 lazy 하게 yield (캐시 → 병렬 추출 순으로 시도)"""
+    doc_id = os.path.basename(pdf_path)
+    pages = cached_iter(
+        f"{profile.name}.pdf", PARSER_VERSION, pdf_path,
+        lambda: _iter_parsed_pages(pdf_path, profile, on_page),
+    )
+    # doc_id 는 파일 경로 기준이라 캐시에 넣지 않고 매번 붙인다
+    for p in pages:
+        yield {"doc_id": doc_id, "page_index": p["page_index"], profile.text_key: p[profile.text_key]}
+
+
+def parse_pdf(pdf_path: str, profile: OutputProfile, on_page: Optional[PageHook] = None) -> List[Dict[str, Any]]:
+    return list(iter_pdf(pdf_path, profile, on_page=on_page))
+
+
+# ==========================================================
+# DOCX
+# ==========================================================
+# NOTE: "a" 네임스페이스의 "#ddrawingml" 오타는 기존 document_parsing 출력과 같게 유지하기 위해 그대로 둔다.
+#       (고치면 이미지/도형 텍스트박스 블록이 새로 생겨 저장된 파싱 결과와 달라진다)
+NS = {
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "a": "http://schemas.openxmlformats.org/#ddrawingml/2006/main",
+    "wp": "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing",
+    "v": "urn:schemas-microsoft-com:vml",
+    "wps": "http://schemas.microsoft.com/office/word/2010/wordprocessingShape",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+
+
+def read_xml(z: zipfile.ZipFile, path: str) -> etree._Element:
+    return etree.fromstring(z.read(path))
+
+
+def parse_document_rels(z: zipfile.ZipFile) -> Dict[str, str]:
+    rels_path = "word/_rels/document.xml.rels"
+    if rels_path not in z.namelist():
+        return {}
+    root = read_xml(z, rels_path)
+    rid_to_target = {}
+    for rel in root.findall("rel:Relationship", namespaces=NS):
+        rid = rel.get("Id")
+        target = rel.get("Target")
+        if rid and target:
+            rid_to_target[rid] = target
+    return rid_to_target
+
+
+def get_text_from_runs(p_elm: etree._Element) -> str:
+    texts = [t.text for t in p_elm.findall(".//w:t", namespaces=NS) if t.text]
+    return "".join(texts).strip()
+
+
+def extract_image_rids_from_paragraph(p_elm: etree._Element) -> List[str]:
+    rids = []
+    for blip in p_elm.findall(".//a:blip", namespaces=NS):
+        rid = blip.get(f"{{{NS['r']}}}embed")
+        if rid:
+            rids.append(rid)
+    return list(dict.fromkeys(rids))
+
+
+def save_image_by_rid(z, rid, rid_to_target, media_out_dir, index):
+    target = rid_to_target.get(rid)
+    if not target:
+        return None
+    zip_img_path = target if target.startswith("word/") else f"word/{target}"
+    if zip_img_path not in z.namelist():
+        return None
+    img_bytes = z.read(zip_img_path)
+    base_name = os.path.basename(zip_img_path)
+    safe_base = re.sub(r"[^a-zA-Z0-9._-]+", "_", base_name)
+    out_name = f"{index:04d}_{safe_base}"
+    out_path = os.path.join(media_out_dir, out_name)
+    with open(out_path, "wb") as f:
+        f.write(img_bytes)
+    return {"type": "image", "rid": rid, "path_in_docx": zip_img_path, "saved_as": out_path.replace("\\", "/"), "bytes": len(img_bytes)}
+
+
+def extract_textboxes_from_paragraph(p_elm: etree._Element) -> List[str]:
+    results = []
+    vml = [t.text for t in p_elm.findall(".//w:pict//v:textbox//w:t", namespaces=NS) if t.text]
+    if vml:
+        results.append("".join(vml).strip())
+    draw = [t.text for t in p_elm.findall(".//w:drawing//a:t", namespaces=NS) if t.text]
+    if draw:
+        results.append("".join(draw).strip())
+    wps = [t.text for t in p_elm.findall(".//wps:txbx//w:t", namespaces=NS) if t.text]
+    if wps:
+        results.append("".join(wps).strip())
+    return list(dict.fromkeys(s.strip() for s in results if s.strip()))
+
+
+def parse_table(tbl_elm: etree._Element) -> Dict[str, Any]:
+    rows = []
+    for tr in tbl_elm.findall(".//w:tr", namespaces=NS):
+        row_cells = [
+            "".join(t.text for t in tc.findall(".//w:t", namespaces=NS) if t.text).strip()
+            for tc in tr.findall(".//w:tc", namespaces=NS)
+        ]
+        rows.append(row_cells)
+    return {"type": "table", "rows": rows}
+
+
+# iterparse 로 body 직계 자식(p / tbl)만 하나씩 완성된 상태로 받아 처리하고 바로 버린다.
+_W = "{%s}" % NS["w"]
+_W_BODY, _W_P, _W_TBL, _W_T, _W_PICT, _W_DRAWING = (_W + n for n in ("body", "p", "tbl", "t", "pict", "drawing"))
+_V_TEXTBOX = "{%s}textbox" % NS["v"]
+_WPS_TXBX = "{%s}txbx" % NS["wps"]
+_A_T = "{%s}t" % NS["a"]
+_A_BLIP = "{%s}blip" % NS["a"]
+_R_EMBED = "{%s}embed" % NS["r"]
+
+
+def iter_docx_body(z: zipfile.ZipFile) -> Iterator[etree._Element]:
+    """word/document.xml 을 스트리밍으로 읽어 body 직계 자식 요소를 순서대로 yield"""
+    with z.open("word/document.xml") as f:
+        for _event, elem in etree.iterparse(f, events=("end",), huge_tree=True):
+            parent = elem.getparent()
+            if parent is None or parent.tag != _W_BODY:
+                continue
+            yield elem
+            # 처리 끝난 요소와 앞선 형제를 비워 메모리를 일정하게 유지
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+def scan_paragraph(p_elm: etree._Element) -> Tuple[str, List[str], List[str]]:
+    """문단 한 번 순회로 (본문 텍스트, 텍스트박스 목록, 이미지 rId 목록) 추출.
+
+    get_text_from_runs / extract_textboxes_from_paragraph / extract_image_rids_from_paragraph
+    를 각각 호출한 것과 같은 결과.
+    """
+    run_texts: List[str] = []
+    vml: List[str] = []
+    draw: List[str] = []
+    wps: List[str] = []
+    rids: List[str] = []
+
+    # (요소, w:pict 안, w:pict 안의 v:textbox 안, w:drawing 안, wps:txbx 안)
+    stack = [(child, False, False, False, False) for child in reversed(p_elm)]
+    while stack:
+        elem, in_pict, in_vml_tb, in_drawing, in_wps = stack.pop()
+        tag = elem.tag
+        if not isinstance(tag, str):  # 주석/PI
+            continue
+
+        if tag == _W_T:
+            if elem.text:
+                run_texts.append(elem.text)
+                if in_vml_tb:
+                    vml.append(elem.text)
+                if in_wps:
+                    wps.append(elem.text)
+        elif tag == _A_T:
+            if in_drawing and elem.text:
+                draw.append(elem.text)
+        elif tag == _A_BLIP:
+            rid = elem.get(_R_EMBED)
+            if rid:
+                rids.append(rid)
+
+        if len(elem):
+            in_pict = in_pict or tag == _W_PICT
+            in_vml_tb = in_vml_tb or (in_pict and tag == _V_TEXTBOX)
+            in_drawing = in_drawing or tag == _W_DRAWING
+            in_wps = in_wps or tag == _WPS_TXBX
+            stack.extend((child, in_pict, in_vml_tb, in_drawing, in_wps) for child in reversed(elem))
+
+    textboxes = ["".join(parts).strip() for parts in (vml, draw, wps) if parts]
+    textboxes = list(dict.fromkeys(t for t in textboxes if t))
+    return "".join(run_texts).strip(), textboxes, list(dict.fromkeys(rids))
+
+
+def _image_block(rid, rid_to_target, zip_sizes, index) -> Dict[str, Any]:
+    """이미지 메타데이터만 만든다 (바이트는 materialize_docx_images 에서 필요할 때 읽음)"""
+    target = rid_to_target.get(rid)
+    zip_img_path = None
+    if target:
+        zip_img_path = target if target.startswith("word/") else f"word/{target}"
+    if zip_img_path not in zip_sizes:
+        return {"type": "image_ref", "rid": rid, "note": "missing"}
+    safe_base = re.sub(r"[^a-zA-Z0-9._-]+", "_", os.path.basename(zip_img_path))
+    return {
+        "type": "image",
+        "rid": rid,
+        "path_in_docx": zip_img_path,
+        "file_name": f"{index:04d}_{safe_base}",
+        "bytes": zip_sizes[zip_img_path],
+    }
+
+
+def _parse_docx_blocks(docx_path: str, profile: OutputProfile) -> Optional[List[Dict[str, Any]]]:
+    with zipfile.ZipFile(docx_path) as z:
+        zip_sizes = {info.filename: info.file_size for info in z.infolist()}
+        if profile.docx_require_document and "word/document.xml" not in zip_sizes:
+            return None
+
+        rid_to_target = parse_document_rels(z) if profile.docx_rich else {}
+
+        blocks = []
+        img_counter = 0
+        for child in iter_docx_body(z):
+            if child.tag == _W_P:
+                text, textboxes, rids = scan_paragraph(child)
+                if text:
+                    blocks.append({"type": "paragraph", "text": text})
+                if not profile.docx_rich:
+                    continue
+                for tb in textboxes:
+                    blocks.append({"type": "textbox", "text": tb})
+                for rid in rids:
+                    img_counter += 1
+                    blocks.append(_image_block(rid, rid_to_target, zip_sizes, img_counter))
+            elif child.tag == _W_TBL:
+                blocks.append(parse_table(child))
+    return blocks
+
+
+def materialize_docx_images(docx_path: str, blocks: List[Dict[str, Any]], media_out_dir: Optional[str]) -> List[Dict[str, Any]]:
+    """캐시용 이미지 블록을 출력 형식으로 변환.
+
+    media_out_dir 가 있으면 이미지를 그 폴더에 저장하고 saved_as 를 채운다 (기존 형식과 동일).
+    None 이면 디스크에 쓰지 않고 path_in_docx/bytes 만 남긴다 (extract_docx_image 로 나중에 꺼낼 수 있음).
+    """
+    if not any(b.get("type") == "image" for b in blocks):
+        return blocks
+
+    out = []
+    z = zipfile.ZipFile(docx_path) if media_out_dir else None
+    try:
+        for b in blocks:
+            if b.get("type") != "image":
+                out.append(b)
+                continue
+            if z is None:
+                out.append({"type": "image", "rid": b["rid"], "path_in_docx": b["path_in_docx"], "bytes": b["bytes"]})
+                continue
+            out_path = os.path.join(media_out_dir, b["file_name"])
+            if not os.path.exists(out_path):
+                with z.open(b["path_in_docx"]) as src, open(out_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+            out.append({
+                "type": "image",
+                "rid": b["rid"],
+                "path_in_docx": b["path_in_docx"],
+                "saved_as": out_path.replace("\\", "/"),
+                "bytes": b["bytes"],
+            })
+    finally:
+        if z is not None:
+            z.close()
+    return out
+
+
+def extract_docx_image(docx_path: str, path_in_docx: str, out_path: str) -> str:
+    """save_media=False 로 파싱한 이미지 블록을 필요할 때 파일로 꺼낸다"""
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with zipfile.ZipFile(docx_path) as z, z.open(path_in_docx) as src, open(out_path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    return out_path
+
+
+def parse_docx(docx_path: str, profile: OutputProfile, media_out_dir: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """DOCX → {"source", "blocks"}. docx_require_document 프로필은 잘못된 파일이면 None
+
+    media_out_dir 가 None 이면 이미지 파일을 쓰지 않는다.
+    """
+    blocks = cached_parse(
+        f"{profile.name}.docx", PARSER_VERSION, docx_path,
+        lambda: _parse_docx_blocks(docx_path, profile),
+    )
+    if blocks is None:
+        return None
+    blocks = materialize_docx_images(docx_path, blocks, media_out_dir)
+    return {"source": os.path.basename(docx_path), "blocks": blocks}
@@ -0,0 +1,147 @@
+# utils/pdf_parallel.py
+"""
+PDF 페이지 병렬 추출 엔진
+
+페이지 범위를 작은 연속 구간(PDF_PARALLEL_CHUNK_PAGES)으로 나눠 process pool 에 보내고, 워커는 구간마다 문서를 한 번만 연다.
+앞 구간이 끝나는 대로 바로 내보내므로 첫 페이지가 일찍 나오고, 결과는 항상 페이지 순서대로 돌려준다.
+동시에 떠 있는 구간 수는 workers * 2 로 제한한다 (소비가 느려도 결과가 무한히 쌓이지 않게). 페이지 수가 적거나 pool 을 쓸 수 없으면 단일 프로세스로 처리한다.
+
+page_fn(page, page_idx) 는 pickle 가능한 모듈 최상위 함수(또는 functools.partial)여야 하며,
+반환값은 그대로 순서대로 전달된다.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Iterator, List, Optional, Tuple
+
+import pdfplumber
+
+PageFn = Callable[[Any, int], Any]
+
+PDF_PARALLEL_ENABLED = os.getenv("PDF_PARALLEL_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+PDF_PARALLEL_WORKERS = int(os.getenv("PDF_PARALLEL_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "24"))
+PDF_PARALLEL_CHUNK_PAGES = max(1, int(os.getenv("PDF_PARALLEL_CHUNK_PAGES", "4")))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_PARALLEL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def shutdown_pdf_pool() -> None:
+    _reset_pool()
+
+
+def count_pdf_pages(pdf_path: str) -> int:
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def split_page_ranges(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    """[0, page_count) 를 최대 parts 개의 연속 구간으로 균등 분할"""
+    parts = max(1, min(parts, page_count))
+    base, extra = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        end = start + base + (1 if i < extra else 0)
+        if end > start:
+            ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def _parse_page_range(pdf_path: str, start: int, end: int, page_fn: PageFn) -> List[Any]:
+    """워커: 문서를 한 번 열고 [start, end) 페이지를 처리"""
+    out = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_idx in range(start, end):
+            out.append(page_fn(pdf.pages[page_idx], page_idx))
+    return out
+
+
+def iter_pages_serial(pdf_path: str, page_fn: PageFn) -> Iterator[Any]:
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_idx, page in enumerate(pdf.pages):
+            yield page_fn(page, page_idx)
+
+
+def iter_pdf_pages(pdf_path: str, page_fn: PageFn, workers: Optional[int] = None) -> Iterator[Any]:
+    """페이지 결과를 순서대로 yield. 큰 문서는 process pool 로 병렬 처리"""
+    workers = PDF_PARALLEL_WORKERS if workers is None else workers
+    if not PDF_PARALLEL_ENABLED or workers <= 1:
+        yield from iter_pages_serial(pdf_path, page_fn)
+        return
+
+    page_count = count_pdf_pages(pdf_path)
+    if page_count < PDF_PARALLEL_MIN_PAGES:
+        yield from iter_pages_serial(pdf_path, page_fn)
+        return
+
+    # 거의 같은 크기의 작은 구간들 (구간마다 문서를 한 번 여는 비용 vs 첫 페이지 지연)
+    ranges = split_page_ranges(page_count, -(-page_count // PDF_PARALLEL_CHUNK_PAGES))
+    window = max(1, workers) * 2
+    pending: Deque[Future] = deque()
+    next_range = 0
+
+    def _fill(pool: ProcessPoolExecutor) -> None:
+        nonlocal next_range
+        while len(pending) < window and next_range < len(ranges):
+            start, end = ranges[next_range]
+            pending.append(pool.submit(_parse_page_range, pdf_path, start, end, page_fn))
+            next_range += 1
+
+    try:
+        pool = _get_pool()
+        _fill(pool)
+    except (BrokenProcessPool, RuntimeError, OSError) as e:
+        print(f"[PDF] 병렬 추출 불가, 순차 처리로 전환: {e}")
+        _reset_pool()
+        yield from iter_pages_serial(pdf_path, page_fn)
+        return
+
+    print(f"[PDF] 병렬 추출: {os.path.basename(pdf_path)} ({page_count}p, {len(ranges)} 구간)")
+    done = 0
+    try:
+        while pending:
+            pages = pending.popleft().result()
+            _fill(pool)
+            for page in pages:
+                yield page
+            done += len(pages)
+    except (BrokenProcessPool, RuntimeError) as e:
+        # 워커가 죽은 경우(또는 pool 이 내려간 경우): 이미 내보낸 페이지 이후부터 순차 처리
+        print(f"[PDF] 워커 비정상 종료, 남은 페이지 순차 처리: {e}")
+        _reset_pool()
+        yield from _parse_page_range(pdf_path, done, page_count, page_fn)
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def extract_pdf_pages(pdf_path: str, page_fn: PageFn, workers: Optional[int] = None) -> List[Any]:
+    return list(iter_pdf_pages(pdf_path, page_fn, workers=workers))
@@ -0,0 +1,60 @@
+# utils/retrieval_backend.py
+"""
+검색 백엔드 선택 (chroma | local)
+
+검색 호출부(vector_db, 법령 검색)는 "컬렉션" 객체의 다음 인터페이스만 쓴다.
+  - query(query_embeddings=[...], n_results=k, where={...}, include=[...]) → Chroma query 결과 형태
+  - count()
+  - metadata (ingest_version 이 있으면 캐시 버전에 반영)
+
+chroma : 기존 Chroma 서버/로컬 DB (chromadb Collection)
+local  : utils/local_ann.py 의 메모리 매핑 인덱스 (네트워크 없이 프로세스 안에서 검색)
+
+환경변수
+  RETRIEVAL_BACKEND            : 기본 백엔드 (기본 chroma)
+  STRATEGY_RETRIEVAL_BACKEND   : Step 2 전략 검색만 따로 지정
+  LAW_RETRIEVAL_BACKEND        : Step 1 법령 검색만 따로 지정
+  STRATEGY_LOCAL_INDEX_DIR / LAW_LOCAL_INDEX_DIR : local 인덱스 위치 (기본 data/local_index/<target>)
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Callable
+
+BACKENDS = ("chroma", "local")
+
+
+def backend_name(target: str) -> str:
+    name = (os.getenv(f"{target.upper()}_RETRIEVAL_BACKEND") or os.getenv("RETRIEVAL_BACKEND") or "chroma").strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 검색 백엔드: {name} (가능: {', '.join(BACKENDS)})")
+    return name
+
+
+def local_index_dir(target: str) -> str:
+    return os.getenv(f"{target.upper()}_LOCAL_INDEX_DIR") or os.path.join("data", "local_index", target)
+
+
+def collection_key(target: str, chroma_key: str) -> str:
+    """결과 캐시 키. 백엔드가 바뀌면 (근사 검색 등으로) 결과가 달라질 수 있으니 키를 분리한다"""
+    if backend_name(target) == "local":
+        return f"{target}:local:{os.path.abspath(local_index_dir(target))}"
+    return chroma_key
+
+
+def open_collection(target: str, connect_chroma: Callable[[], Any]) -> Any:
+    """target 의 백엔드에 맞는 컬렉션 객체. chroma 면 connect_chroma() 를 그대로 호출한다
+
+    local 인덱스는 경로별로 캐시되며, 다시 빌드되면(manifest 변경) 새로 연다.
+    """
+    if backend_name(target) == "local":
+        from utils.local_ann import open_local_index
+        return open_local_index(local_index_dir(target))
+    return connect_chroma()
+
+
+def describe(target: str, chroma_location: str) -> str:
+    if backend_name(target) == "local":
+        return f"local index {local_index_dir(target)}"
+    return f"ChromaDB {chroma_location}"
@@ -0,0 +1,251 @@
+# utils/retrieval_cache.py
+"""
+검색 캐시 (2단계)
+
+1) 임베딩 캐시 : (모델명, 정규화된 쿼리 텍스트) → 쿼리 임베딩
+2) 결과 캐시   : (컬렉션, 컬렉션 버전, 쿼리, where, top_k, include) → Chroma query 결과 (쿼리 1건분)
+
+같은 공고로 Step 2 를 다시 돌리거나, Step 1 에서 "중소기업기본법" 같은 흔한 법령명을 반복 검색할 때
+인코더 forward 와 Chroma HTTP 호출을 모두 건너뛴다.
+
+- 두 캐시 모두 TTL + 개수 상한 LRU
+- 컬렉션 버전 = count + 컬렉션 metadata 의 ingest_version (있으면).
+  RETRIEVAL_VERSION_CHECK_SEC 마다 한 번만 확인하고, 바뀌면 그 컬렉션의 결과 캐시를 비운다.
+- invalidate() 로 수동 무효화 (재적재 직후 /api/cache/invalidate)
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+RETRIEVAL_CACHE_ENABLED = os.getenv("RETRIEVAL_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+EMBED_CACHE_MAX_ITEMS = int(os.getenv("EMBED_CACHE_MAX_ITEMS", "2048"))
+EMBED_CACHE_TTL_SEC = float(os.getenv("EMBED_CACHE_TTL_SEC", "86400"))
+RESULT_CACHE_MAX_ITEMS = int(os.getenv("RESULT_CACHE_MAX_ITEMS", "4096"))
+RESULT_CACHE_TTL_SEC = float(os.getenv("RESULT_CACHE_TTL_SEC", "3600"))
+RETRIEVAL_VERSION_CHECK_SEC = float(os.getenv("RETRIEVAL_VERSION_CHECK_SEC", "30"))
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """유니코드 NFC + 공백 정리 (공백/줄바꿈만 다른 같은 공고문을 같은 키로)"""
+    return _WS_RE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+class TTLLRUCache:
+    def __init__(self, name: str, max_items: int, ttl_sec: float):
+        self.name = name
+        self.max_items = max_items
+        self.ttl_sec = ttl_sec
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key: Any) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.counters["misses"] += 1
+                return None
+            expires_at, value = item
+            if expires_at < now:
+                del self._data[key]
+                self.counters["expired"] += 1
+                self.counters["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self.counters["hits"] += 1
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_sec, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def drop_where(self, predicate: Callable[[Any], bool]) -> int:
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                "entries": len(self._data),
+                "max_items": self.max_items,
+                "ttl_sec": self.ttl_sec,
+                **self.counters,
+                "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+            }
+
+
+embedding_cache = TTLLRUCache("embedding", EMBED_CACHE_MAX_ITEMS, EMBED_CACHE_TTL_SEC)
+result_cache = TTLLRUCache("result", RESULT_CACHE_MAX_ITEMS, RESULT_CACHE_TTL_SEC)
+
+_versions: Dict[str, Tuple[float, str]] = {}  # collection_key → (확인 시각, 버전)
+_versions_lock = threading.Lock()
+_invalidations = {"version_changes": 0, "manual": 0}
+
+
+# =========================================================
+# 컬렉션 버전
+# =========================================================
+def collection_version_of(collection) -> str:
+    """Chroma collection → "count|ingest_version" """
+    metadata = getattr(collection, "metadata", None) or {}
+    return f"{collection.count()}|{metadata.get('ingest_version', '')}"
+
+
+def collection_version(collection_key: str, fetch_version: Callable[[], str]) -> str:
+    """RETRIEVAL_VERSION_CHECK_SEC 간격으로만 fetch_version() 호출. 버전이 바뀌면 결과 캐시 무효화"""
+    now = time.monotonic()
+    with _versions_lock:
+        cached = _versions.get(collection_key)
+        if cached and now - cached[0] < RETRIEVAL_VERSION_CHECK_SEC:
+            return cached[1]
+
+    try:
+        version = fetch_version()
+    except Exception as e:
+        # 버전 확인 실패 시 이전 버전 유지 (없으면 캐시 사용 안 함)
+        print(f"[RetrievalCache] 버전 확인 실패 ({collection_key}): {e}")
+        return cached[1] if cached else ""
+
+    with _versions_lock:
+        previous = _versions.get(collection_key)
+        _versions[collection_key] = (now, version)
+    if previous and previous[1] != version:
+        dropped = result_cache.drop_where(lambda k: k[0] == collection_key)
+        _invalidations["version_changes"] += 1
+        print(f"[RetrievalCache] {collection_key} 버전 변경 {previous[1]} → {version}, 결과 {dropped}건 무효화")
+    return version
+
+
+def invalidate(collection_key: Optional[str] = None) -> int:
+    """수동 무효화. collection_key 가 없으면 결과 캐시 전체"""
+    _invalidations["manual"] += 1
+    with _versions_lock:
+        if collection_key:
+            _versions.pop(collection_key, None)
+        else:
+            _versions.clear()
+    if collection_key:
+        return result_cache.drop_where(lambda k: k[0] == collection_key)
+    dropped = result_cache.stats()["entries"]
+    result_cache.clear()
+    return dropped
+
+
+# =========================================================
+# 1) 임베딩 캐시
+# =========================================================
+def embed_queries(model_name: str, model, texts: Sequence[str], batch_size: int = 32) -> List[List[float]]:
+    """캐시에 없는 텍스트만 한 번의 model.encode 배치로 계산"""
+    if not RETRIEVAL_CACHE_ENABLED:
+        return model.encode(list(texts), batch_size=batch_size).tolist()
+
+    out: List[Optional[List[float]]] = [None] * len(texts)
+    missing: Dict[str, List[int]] = {}
+    for i, text in enumerate(texts):
+        key = (model_name, normalize_query(text))
+        emb = embedding_cache.get(key)
+        if emb is not None:
+            out[i] = emb
+        else:
+            missing.setdefault(text, []).append(i)
+
+    if missing:
+        miss_texts = list(missing)
+        embeddings = model.encode(miss_texts, batch_size=batch_size).tolist()
+        for text, emb in zip(miss_texts, embeddings):
+            embedding_cache.put((model_name, normalize_query(text)), emb)
+            for i in missing[text]:
+                out[i] = emb
+    return out  # type: ignore[return-value]
+
+
+# =========================================================
+# 2) 결과 캐시
+# =========================================================
+_RESULT_FIELDS = ("ids", "distances", "documents", "metadatas")
+
+
+def query_collection(
+    collection,
+    collection_key: str,
+    version: str,
+    query_texts: Sequence[str],
+    query_embeddings: Sequence[List[float]],
+    n_results: int,
+    where: Optional[Dict[str, Any]] = None,
+    include: Sequence[str] = ("metadatas", "documents", "distances"),
+) -> Dict[str, List[Any]]:
+    """collection.query 와 같은 형태(쿼리별 리스트)를 반환. 캐시 miss 인 쿼리만 한 번에 조회한다.
+
+    version 이 빈 문자열이면(버전 확인 불가) 캐시를 쓰지 않는다.
+    """
+    use_cache = RETRIEVAL_CACHE_ENABLED and bool(version)
+    where_key = json.dumps(where, sort_keys=True, ensure_ascii=False)
+    include_key = ",".join(sorted(include))
+
+    per_query: List[Optional[Dict[str, Any]]] = [None] * len(query_texts)
+    keys = [
+        (collection_key, version, normalize_query(t), where_key, n_results, include_key)
+        for t in query_texts
+    ]
+    if use_cache:
+        for i, key in enumerate(keys):
+            hit = result_cache.get(key)
+            # 호출자가 metadata 등을 수정해도 캐시가 바뀌지 않도록 복사본 사용
+            per_query[i] = copy.deepcopy(hit) if hit is not None else None
+
+    miss_idx = [i for i, r in enumerate(per_query) if r is None]
+    if miss_idx:
+        raw = collection.query(
+            query_embeddings=[query_embeddings[i] for i in miss_idx],
+            n_results=n_results,
+            where=where,
+            include=list(include),
+        )
+        for qi, i in enumerate(miss_idx):
+            single = {f: ([(raw.get(f) or [])[qi]] if raw.get(f) else None) for f in _RESULT_FIELDS}
+            per_query[i] = single
+            if use_cache:
+                result_cache.put(keys[i], single)
+
+    merged: Dict[str, List[Any]] = {}
+    for f in _RESULT_FIELDS:
+        values = [r[f] for r in per_query]  # type: ignore[index]
+        merged[f] = None if any(v is None for v in values) else [v[0] for v in values]
+    return merged
+
+
+def retrieval_cache_stats() -> Dict[str, Any]:
+    with _versions_lock:
+        versions = {k: v for k, (_, v) in _versions.items()}
+    return {
+        "enabled": RETRIEVAL_CACHE_ENABLED,
+        "embedding": embedding_cache.stats(),
+        "result": result_cache.stats(),
+        "collection_versions": versions,
+        "invalidations": dict(_invalidations),
+    }
@@ -17,7 +17,7 @@ if project_root not in sys.path:
 # 이제 modeling 폴더가 기준이 되므로 utils 패키지를 찾을 수 있습니다.
 try:
     from utils.document_parsing import extract_text_from_pdf, parse_docx_to_blocks
-    from utils.vector_db import search_two_tracks
+    from utils.vector_db import search_two_tracks_batch
 except ImportError as e:
     # 혹시나 해서 예외 처리 추가
     print(f"❌ 모듈 로딩 실패: {e}")
@@ -28,8 +28,9 @@ except ImportError as e:
 load_dotenv()
 
 # [설정] 테스트할 문서들이 있는 폴더 경로 (본인 경로에 맞게 수정 필요!)
-TEST_DATA_DIR = r"C:\Users\User\Downloads\df"
+TEST_DATA_DIR = os.getenv("SCORER_TEST_DATA_DIR", r"C:\Users\User\Downloads\df")
 CACHE_FILE = os.path.join(current_dir, "analysis_cache.json") # 캐시 파일 위치도 명확하게
+SEARCH_BATCH_SIZE = 64  # 한 번에 임베딩/검색할 문서 수
 
 def set_korean_font():
     """한글 폰트(맑은 고딕) 강제 설정"""
@@ -63,9 +64,11 @@ def get_all_scores(folder_path):
     print(f"\n[*] 총 {len(files)}개 파일에 대해 분석을 시작합니다 (첫 실행이라 시간이 좀 걸립니다)...")
     
     all_top_scores = []
-    
+    queries = []
+
+    # 1) 파싱: 파일별 전체 텍스트 수집
     for i, file_path in enumerate(files):
-        print(f"[{i+1}/{len(files)}] 분석 중: {os.path.basename(file_path)}")
+        print(f"[{i+1}/{len(files)}] 파싱 중: {os.path.basename(file_path)}")
         
         full_text = ""
         try:
@@ -74,7 +77,7 @@ def get_all_scores(folder_path):
                 for page in parsed:
                     full_text += " ".join(page.get("texts", [])) + "\n"
             elif file_path.endswith(".docx"):
-                parsed = parse_docx_to_blocks(file_path)
+                parsed = parse_docx_to_blocks(file_path, current_dir, save_media=False)
                 full_text = str(parsed)
         except Exception as e:
             print(f"  - 파싱 에러: {e}")
@@ -83,16 +86,22 @@ def get_all_scores(folder_path):
         if len(full_text.strip()) < 100:
             continue
 
+        queries.append({"notice_text": full_text, "ministry_name": "해양수산부"})
+
+    # 2) 검색: 배치 단위로 임베딩 + Chroma 조회
+    for start in range(0, len(queries), SEARCH_BATCH_SIZE):
+        batch = queries[start:start + SEARCH_BATCH_SIZE]
+        print(f"[*] 검색 중: {start + 1}~{start + len(batch)} / {len(queries)}")
         try:
-            results = search_two_tracks(
-                notice_text=full_text,
-                ministry_name="해양수산부", 
+            batch_results = search_two_tracks_batch(
+                batch,
                 top_k_a=5,
                 top_k_b=0,
                 score_threshold=0.0
             )
-            for item in results.get('track_a', []):
-                all_top_scores.append(item['score'])
+            for results in batch_results:
+                for item in results.get('track_a', []):
+                    all_top_scores.append(item['score'])
                 
         except Exception as e:
             print(f"  - 검색 에러: {e}")
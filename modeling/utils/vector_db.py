@@ -5,7 +5,6 @@ from typing import Any, Dict, List
 
 import chromadb
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
 
 load_dotenv()
 
@@ -22,6 +21,10 @@ except ImportError:
     def get_ministry_variants(name: str) -> List[str]:
         return [name] if name else []
 
+from utils.embedding_models import get_embedding_model
+from utils.retrieval_backend import collection_key, describe, open_collection
+from utils.retrieval_cache import collection_version, collection_version_of, embed_queries, query_collection
+
 
 # =========================================================
 # ChromaDB (Strategy / RFP search)
@@ -32,6 +35,34 @@ CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8002"))
 COLLECTION_NAME = os.getenv("CHROMA_COLLECTION", "strategy_chunks_norm")
 EMBED_MODEL_NAME = os.getenv("CHROMA_EMBED_MODEL_NAME", "intfloat/multilingual-e5-base")
 CHROMA_DIR_HINT = os.getenv("CHROMA_DB_DIR", r"C:\chroma_strategy")
+# STRATEGY_RETRIEVAL_BACKEND=local 이면 utils/local_ann 인덱스를 쓰고 키도 분리된다
+COLLECTION_KEY = collection_key("strategy", f"strategy:{CHROMA_HOST}:{CHROMA_PORT}/{COLLECTION_NAME}")
+
+
+_client = None
+_collection = None
+
+
+def _connect_chroma():
+    global _client
+    if _client is None:
+        _client = chromadb.HttpClient(host=CHROMA_HOST, port=CHROMA_PORT)
+    return _client.get_collection(name=COLLECTION_NAME)
+
+
+def _get_collection():
+    """검색 컬렉션을 프로세스당 한 번만 연다 (실패하면 다음 호출 때 재시도)"""
+    global _collection
+    if _collection is None:
+        _collection = open_collection("strategy", _connect_chroma)
+    return _collection
+
+
+def _fetch_collection_version() -> str:
+    # metadata(ingest_version)를 새로 읽기 위해 컬렉션을 다시 조회 (재적재/재빌드됐으면 교체)
+    global _collection
+    _collection = open_collection("strategy", _connect_chroma)
+    return collection_version_of(_collection)
 
 
 def search_two_tracks(
@@ -42,81 +73,123 @@ def search_two_tracks(
     exclude_same_ministry_in_b: bool = True,
     score_threshold: float = 0.0,
 ) -> Dict[str, List[Dict[str, Any]]]:
-    print(f"[*] ChromaDB server: {CHROMA_HOST}:{CHROMA_PORT} (collection={COLLECTION_NAME})")
+    return search_two_tracks_batch(
+        [{"notice_text": notice_text, "ministry_name": ministry_name}],
+        top_k_a=top_k_a,
+        top_k_b=top_k_b,
+        exclude_same_ministry_in_b=exclude_same_ministry_in_b,
+        score_threshold=score_threshold,
+    )[0]
+
+
+def search_two_tracks_batch(
+    queries: List[Dict[str, Any]],
+    top_k_a: int = 5,
+    top_k_b: int = 5,
+    exclude_same_ministry_in_b: bool = True,
+    score_threshold: float = 0.0,
+    encode_batch_size: int = 32,
+) -> List[Dict[str, List[Dict[str, Any]]]]:
+    """
+    여러 공고문을 한 번에 검색 (입력 순서대로 {"track_a", "track_b"} 리스트 반환)
+
+    - 쿼리 임베딩은 model.encode 한 번으로 배치 계산
+    - 같은 부처(변형 이름 집합)끼리 묶어서 Track A / Track B 를 각각 query_embeddings 배치 1회로 조회
+    queries: [{"notice_text": str, "ministry_name": str}, ...]
+    """
+    results: List[Dict[str, List[Dict[str, Any]]]] = [{"track_a": [], "track_b": []} for _ in queries]
+    if not queries:
+        return results
+
+    print(f"[*] Retrieval: {describe('strategy', f'{CHROMA_HOST}:{CHROMA_PORT}')} (collection={COLLECTION_NAME})")
 
     try:
-        client = chromadb.HttpClient(host=CHROMA_HOST, port=CHROMA_PORT)
-        collection = client.get_collection(name=COLLECTION_NAME)
+        _get_collection()
     except Exception as e:
         print(f"[Error] ChromaDB connect failed: {e}")
         print(f"[Hint] Run: chroma run --host {CHROMA_HOST} --port {CHROMA_PORT} --path {CHROMA_DIR_HINT}")
-        return {"track_a": [], "track_b": []}
+        return results
 
     print(f"[*] Embed model: {EMBED_MODEL_NAME}")
-    model = SentenceTransformer(EMBED_MODEL_NAME)
+    model = get_embedding_model(EMBED_MODEL_NAME)
 
-    query_text = "query: " + (notice_text or "")[:2000]
-    query_embedding = model.encode([query_text]).tolist()
+    query_texts = ["query: " + (q.get("notice_text") or "")[:2000] for q in queries]
+    query_embeddings = embed_queries(EMBED_MODEL_NAME, model, query_texts, batch_size=encode_batch_size)
+    version = collection_version(COLLECTION_KEY, _fetch_collection_version)
+    collection = _get_collection()
 
-    target_variants = get_ministry_variants(ministry_name)
-    track_a: List[Dict[str, Any]] = []
-    track_b: List[Dict[str, Any]] = []
+    # 부처 변형 이름 집합별로 입력 인덱스를 묶는다
+    groups: Dict[tuple, List[int]] = {}
+    for idx, q in enumerate(queries):
+        variants = tuple(get_ministry_variants(q.get("ministry_name")))
+        groups.setdefault(variants, []).append(idx)
 
     # --- Track A (same ministry) ---
-    if target_variants:
-        where_a = {"agency_norm": {"$in": target_variants}}
-        try:
-            results_a = collection.query(
-                query_embeddings=query_embedding,
-                n_results=top_k_a,
-                where=where_a,
-                include=["metadatas", "documents", "distances"],
-            )
-            track_a = _pack_results(results_a, score_threshold)
-        except Exception as e:
-            print(f"[Track A Error] {e}")
+    if top_k_a > 0:
+        for variants, idxs in groups.items():
+            if not variants:
+                continue
+            where_a = {"agency_norm": {"$in": list(variants)}}
+            _query_into(collection, version, query_texts, query_embeddings, idxs, top_k_a, where_a, score_threshold, results, "track_a")
 
     # --- Track B (other ministries) ---
-    where_b = None
-    if exclude_same_ministry_in_b and target_variants:
-        where_b = {"agency_norm": {"$nin": target_variants}}
+    if top_k_b > 0:
+        b_groups: Dict[tuple, List[int]] = {}
+        for variants, idxs in groups.items():
+            key = variants if (exclude_same_ministry_in_b and variants) else ()
+            b_groups.setdefault(key, []).extend(idxs)
+        for variants, idxs in b_groups.items():
+            where_b = {"agency_norm": {"$nin": list(variants)}} if variants else None
+            _query_into(collection, version, query_texts, query_embeddings, idxs, top_k_b, where_b, score_threshold, results, "track_b")
+
+    return results
+
 
+def _query_into(collection, version, query_texts, query_embeddings, idxs, top_k, where, threshold, results, track) -> None:
+    """idxs 쿼리들을 (결과 캐시 miss 분만) query_embeddings 배치 한 번으로 조회해 results[idx][track] 에 채운다"""
+    label = "Track A" if track == "track_a" else "Track B"
     try:
-        results_b = collection.query(
-            query_embeddings=query_embedding,
-            n_results=top_k_b,
-            where=where_b,
-            include=["metadatas", "documents", "distances"],
+        raw = query_collection(
+            collection,
+            COLLECTION_KEY,
+            version,
+            [query_texts[i] for i in idxs],
+            [query_embeddings[i] for i in idxs],
+            n_results=top_k,
+            where=where,
         )
-        track_b = _pack_results(results_b, score_threshold)
     except Exception as e:
-        print(f"[Track B Error] {e}")
+        global _collection
+        print(f"[{label} Error] {e}")
+        _collection = None  # 컬렉션 재생성 등에 대비해 다음 호출에서 다시 연결
+        return
 
-    return {"track_a": track_a, "track_b": track_b}
+    for qi, idx in enumerate(idxs):
+        results[idx][track] = _pack_results(raw, threshold, qi)
 
 
-def _pack_results(raw: dict, threshold: float = 0.0) -> List[Dict[str, Any]]:
+def _pack_results(raw: dict, threshold: float = 0.0, qi: int = 0) -> List[Dict[str, Any]]:
     packed: List[Dict[str, Any]] = []
-    if not raw or not raw.get("ids"):
+    if not raw or not raw.get("ids") or len(raw["ids"]) <= qi:
         return []
 
-    count = len(raw["ids"][0])
+    count = len(raw["ids"][qi])
     pattern = re.compile(r"\[paragraph#\d+\]\s*")
 
     for i in range(count):
-        dist = raw["distances"][0][i]
+        dist = raw["distances"][qi][i]
         similarity_score = (1 - dist) * 100
 
         if similarity_score < threshold:
             continue
 
-        raw_text = raw["documents"][0][i]
+        raw_text = raw["documents"][qi][i]
         clean_text = pattern.sub("", raw_text)
 
         packed.append(
             {
-                "id": raw["ids"][0][i],
-                "metadata": raw["metadatas"][0][i],
+                "id": raw["ids"][qi][i],
+                "metadata": raw["metadatas"][qi][i],
                 "document": clean_text.strip(),
                 "distance": dist,
                 "score": round(similarity_score, 1),